@@ -0,0 +1,392 @@
+"""
+Single-Pass Claim Aggregation
+=============================
+
+Builds every claim-derived dashboard section from one scan over claim lines.
+
+Each chunk of claim lines is reduced with two np.bincount kernels:
+- a composite (month, place of service, diagnosis) key, weighted by paid
+  amount and unweighted for claim counts
+- a composite (member, medical/rx) key, weighted by paid amount
+
+MonthlyCostSummary, PlaceOfServiceData, DiagnosisByCost,
+DiagnosisByUtilization, MemberDistribution and HighCostClaimant are then
+read off these small accumulators without touching the claim lines again.
+Accumulators are additive, so chunks from ClaimsSimulator.iter_chunks can be
+folded in one at a time in constant memory.
+
+Top-N selections go through a bounded TopK heap (topk.py), so only O(K)
+state is kept beyond the per-member accumulators.
+"""
+
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from claims_simulator import DEFAULT_CATALOG, DRUGS_INDEX, PLACE_OF_SERVICE_CATEGORIES, ClaimLines
+from cost_projection import PREDICTED_COST_EDGES
+from csv_stream import DEFAULT_CHUNK_SIZE
+from data_template_generator import (
+    CostRange,
+    DiagnosisByCost,
+    DiagnosisByUtilization,
+    HighCostClaimant,
+    MemberDistribution,
+    MockDataGenerator,
+    MonthlyCostSummary,
+    PlaceOfServiceData,
+)
+from icd10_catalog import ICD10Catalog
+from rng_context import RNGContext
+from topk import TopK
+
+
+PLAN_MONTHS = 12
+
+# Lower bound of each CostRange bracket after the first (annual plan payment)
+COST_RANGE_EDGES = np.array([25_000.0, 50_000.0, 100_000.0])
+COST_RANGES: List[CostRange] = list(CostRange)
+
+# Members whose annual total rounds to at least this are claimants
+MIN_CLAIMANT_TOTAL = 0.01
+
+# Chunks with fewer lines than members / ratio update member totals sparsely;
+# below this size a sort of the touched members beats an O(roster) bincount
+SPARSE_MEMBER_RATIO = 32
+
+
+def top_k_indices(scores: np.ndarray, keys: np.ndarray, count: int,
+                  chunk_size: int = DEFAULT_CHUNK_SIZE) -> np.ndarray:
+    """
+    Indexes of the count highest scores, ties broken by key ascending
+
+    Scores are scanned in chunks into a bounded TopK heap. Within a chunk only
+    values at or above both the heap threshold and the chunk's own count-th
+    largest value reach the heap, so almost every row is rejected vectorized.
+
+    Args:
+        scores: Ranking values (e.g. per-member plan payment accumulators)
+        keys: Unique tie-breakers aligned with scores (e.g. member IDs)
+        count: Number of indexes to return
+        chunk_size: Scores examined per vectorized prefilter
+
+    Returns:
+        int64 array of indexes into scores, best first
+    """
+    top: TopK[int] = TopK(count)
+    if count <= 0:
+        return np.empty(0, dtype=np.int64)
+
+    for start in range(0, len(scores), chunk_size):
+        chunk = scores[start:start + chunk_size]
+        floor = top.threshold
+        if len(chunk) > count:
+            kth = np.partition(chunk, len(chunk) - count)[len(chunk) - count]
+            floor = kth if floor is None else max(floor, kth)
+
+        candidates = np.arange(len(chunk)) if floor is None else np.flatnonzero(chunk >= floor)
+        for i in candidates.tolist():
+            top.push(float(chunk[i]), keys[start + i].item(), start + i)
+
+    return np.array(top.items(), dtype=np.int64)
+
+
+def cost_brackets(totals: np.ndarray, edges: np.ndarray = COST_RANGE_EDGES) -> np.ndarray:
+    """
+    Bracket index of each annual plan payment; -1 for members who are not claimants
+
+    Totals are rounded to cents first, so float summation residue (49,999.999...)
+    cannot move a member across an exact boundary; a boundary amount belongs
+    to the bracket it starts.
+
+    Args:
+        totals: Annual plan payment per member
+        edges: Lower bound of each bracket after the first (COST_RANGE_EDGES or
+               PREDICTED_COST_EDGES)
+    """
+    # The extra leading edge puts non-claimants in bin 0, so claimant brackets start at 1
+    bins = np.concatenate(([MIN_CLAIMANT_TOTAL], edges))
+    return np.digitize(np.round(totals, 2), bins) - 1
+
+
+def bracket_totals(totals: np.ndarray, edges: np.ndarray = COST_RANGE_EDGES) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Claimant count and total payment per bracket in one pass over the members
+
+    Returns:
+        (int64 claimants, float64 payments), one entry per bracket (len(edges) + 1)
+    """
+    slot = cost_brackets(totals, edges) + 1
+    size = len(edges) + 2
+    counts = np.bincount(slot, minlength=size)
+    payments = np.bincount(slot, weights=totals, minlength=size)
+    return counts[1:], payments[1:]
+
+
+def member_distribution_rows(claimant_counts: np.ndarray, payments: np.ndarray) -> List[MemberDistribution]:
+    """
+    MemberDistribution rows from per-bracket claimant counts and payments
+
+    Args:
+        claimant_counts: Claimants per CostRange bracket
+        payments: Total plan payment per CostRange bracket
+    """
+    claimant_total = claimant_counts.sum()
+    payment_total = payments.sum()
+
+    return [
+        MemberDistribution(
+            cost_range=cost_range,
+            claimants_percent=float(claimant_counts[i] / claimant_total * 100) if claimant_total else 0.0,
+            payments_percent=float(payments[i] / payment_total * 100) if payment_total > 0 else 0.0
+        )
+        for i, cost_range in enumerate(COST_RANGES)
+    ]
+
+
+@dataclass
+class ClaimAggregates:
+    """
+    Additive per-group totals accumulated from claim lines
+
+    The group cube is small (12 x places of service x diagnoses) regardless
+    of input size; member totals grow with the roster, not the line count.
+    Diagnoses index into catalog, so a full ICD-10 catalog widens the cube
+    (about 130 MB for 70k codes) but not the per-line cost.
+    """
+    paid_cube: np.ndarray           # float64 [month, place_of_service, diagnosis]
+    count_cube: np.ndarray          # int64, same shape as paid_cube
+    member_paid: np.ndarray         # float64 [member, 0 = medical / 1 = rx]
+    member_ids: np.ndarray          # uint64 roster IDs, indexed by member
+    plan_start: np.datetime64       # First day of the plan year
+    member_enrollment: np.ndarray   # Active members per plan month (12 entries)
+    lines: int = 0                  # Claim lines aggregated so far
+    months: int = PLAN_MONTHS       # Plan months covered (rows emitted by monthly_costs)
+    catalog: ICD10Catalog = DEFAULT_CATALOG
+
+    @classmethod
+    def empty(cls, member_ids: np.ndarray, plan_start: np.datetime64,
+              member_enrollment: np.ndarray, catalog: Optional[ICD10Catalog] = None) -> "ClaimAggregates":
+        """Zeroed accumulators for a roster; catalog defaults to DEFAULT_CATALOG"""
+        catalog = DEFAULT_CATALOG if catalog is None else catalog
+        shape = (PLAN_MONTHS, len(PLACE_OF_SERVICE_CATEGORIES), len(catalog))
+        return cls(
+            paid_cube=np.zeros(shape, dtype=np.float64),
+            count_cube=np.zeros(shape, dtype=np.int64),
+            member_paid=np.zeros((len(member_ids), 2), dtype=np.float64),
+            member_ids=member_ids,
+            plan_start=plan_start,
+            member_enrollment=member_enrollment,
+            catalog=catalog
+        )
+
+    def add(self, claim_lines: ClaimLines) -> None:
+        """
+        Folds a chunk of claim lines into the accumulators
+
+        Raises:
+            ValueError: if a service date falls outside the plan year
+        """
+        if not len(claim_lines):
+            return
+
+        months = claim_lines.month_index
+        if months.min() < 0 or months.max() >= PLAN_MONTHS:
+            raise ValueError("Claim line service dates must fall within the plan year")
+
+        _, places, diagnoses = self.paid_cube.shape
+        group = (months * places + claim_lines.place_of_service) * diagnoses + claim_lines.icd10_index
+        self.paid_cube += np.bincount(group, weights=claim_lines.paid_amount,
+                                      minlength=self.paid_cube.size).reshape(self.paid_cube.shape)
+        self.count_cube += np.bincount(group, minlength=self.count_cube.size).reshape(self.count_cube.shape)
+
+        if len(claim_lines) * SPARSE_MEMBER_RATIO < len(self.member_ids):
+            # Sparse chunk (e.g. one appended month): bincount over the touched
+            # members only, so the cost follows the chunk, not the roster
+            touched, inverse = np.unique(claim_lines.member_index, return_inverse=True)
+            member_key = inverse.astype(np.int64) * 2 + claim_lines.is_rx
+            self.member_paid[touched] += np.bincount(member_key, weights=claim_lines.paid_amount,
+                                                     minlength=2 * len(touched)).reshape(-1, 2)
+        else:
+            member_key = claim_lines.member_index.astype(np.int64) * 2 + claim_lines.is_rx
+            self.member_paid += np.bincount(member_key, weights=claim_lines.paid_amount,
+                                            minlength=self.member_paid.size).reshape(self.member_paid.shape)
+        self.lines += len(claim_lines)
+
+    # ------------------------------------------------------------------------
+    # Dashboard sections
+    # ------------------------------------------------------------------------
+
+    @property
+    def member_totals(self) -> np.ndarray:
+        """Annual plan payment (medical + rx) per member"""
+        return self.member_paid.sum(axis=1)
+
+    def monthly_costs(self) -> List[MonthlyCostSummary]:
+        """One MonthlyCostSummary per covered plan month, medical and rx split by place of service"""
+        by_place = self.paid_cube.sum(axis=2)
+        rx = by_place[:, DRUGS_INDEX]
+        medical = by_place.sum(axis=1) - rx
+
+        start_month = self.plan_start.astype('datetime64[M]')
+        summaries = []
+        for i in range(self.months):
+            month_start = (start_month + i).astype('datetime64[D]').item()
+            summaries.append(MonthlyCostSummary(
+                month=month_start.strftime('%B'),
+                year=month_start.year,
+                medical_plan_payment=round(float(medical[i]), 2),
+                rx_plan_payment=round(float(rx[i]), 2),
+                member_enrollment=int(self.member_enrollment[i])
+            ))
+
+        return summaries
+
+    def place_of_service(self) -> List[PlaceOfServiceData]:
+        """Total paid amount and claim count per place of service"""
+        totals = self.paid_cube.sum(axis=(0, 2))
+        counts = self.count_cube.sum(axis=(0, 2))
+
+        return [
+            PlaceOfServiceData(category, round(float(totals[i]), 2), int(counts[i]))
+            for i, category in enumerate(PLACE_OF_SERVICE_CATEGORIES)
+        ]
+
+    def diagnosis_by_cost(self, count: int = 10) -> List[DiagnosisByCost]:
+        """
+        Top diagnoses ranked by total paid amount
+
+        Percentages are relative to the returned top-N total so they sum to 100,
+        matching the template's validation rule.
+        """
+        totals = self.paid_cube.sum(axis=(0, 1))
+        top = top_k_indices(totals, self.catalog.display_codes, count)
+        top_total = totals[top].sum()
+
+        diagnoses = []
+        for idx in top:
+            code, description = self.catalog.entry(idx)
+            diagnoses.append(DiagnosisByCost(
+                diagnosis_code=code,
+                diagnosis_description=description,
+                total_cost=round(float(totals[idx]), 2),
+                percentage=float(totals[idx] / top_total * 100) if top_total > 0 else 0.0
+            ))
+
+        return diagnoses
+
+    def diagnosis_by_utilization(self, count: int = 10) -> List[DiagnosisByUtilization]:
+        """
+        Top diagnoses ranked by claim line count
+
+        Percentages are relative to the returned top-N total so they sum to 100.
+        """
+        counts = self.count_cube.sum(axis=(0, 1))
+        top = top_k_indices(counts, self.catalog.display_codes, count)
+        top_total = counts[top].sum()
+
+        diagnoses = []
+        for idx in top:
+            code, description = self.catalog.entry(idx)
+            diagnoses.append(DiagnosisByUtilization(
+                diagnosis_code=code,
+                diagnosis_description=description,
+                claim_count=int(counts[idx]),
+                percentage=float(counts[idx] / top_total * 100) if top_total > 0 else 0.0
+            ))
+
+        return diagnoses
+
+    def member_distribution(self) -> List[MemberDistribution]:
+        """
+        Share of claimants and of payments in each CostRange bracket
+
+        Claimants are members whose annual plan payment is at least one cent;
+        brackets are assigned on that total (see cost_brackets).
+        """
+        return member_distribution_rows(*bracket_totals(self.member_totals))
+
+    def predicted_range_totals(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Claimants and payments per PredictedCostRange bucket of the current annual total
+
+        Same bucketing as member_distribution, on PREDICTED_COST_EDGES; entries
+        follow PREDICTED_COST_RANGES.
+        """
+        return bracket_totals(self.member_totals, PREDICTED_COST_EDGES)
+
+    def top_members(self, count: int = 10) -> np.ndarray:
+        """Member indexes of the highest total plan payment, ties by member ID"""
+        return top_k_indices(self.member_totals, self.member_ids, count)
+
+    def top_claimants(self, count: int = 10, rng: Optional[RNGContext] = None) -> List[HighCostClaimant]:
+        """
+        Highest-cost members with a mock predicted cost range
+
+        Args:
+            count: Number of claimants to return
+            rng: Random stream for the predicted cost range
+        """
+        return self.claimants(self.top_members(count), rng)
+
+    def claimants(self, members: np.ndarray, rng: Optional[RNGContext] = None) -> List[HighCostClaimant]:
+        """
+        HighCostClaimant rows for the given member indexes, in order
+
+        Predicted cost ranges are projected against the roster's mean
+        claimant cost, so high-cost members regress toward the whole plan.
+        """
+        totals = self.member_totals
+        positive = totals[totals > 0]
+        reference = float(positive.mean()) if len(positive) else None
+        predictions = MockDataGenerator.predict_cost_ranges(totals[members], rng, reference)
+
+        claimants = []
+        for idx, predicted in zip(members, predictions):
+            medical, rx = (float(v) for v in self.member_paid[idx])
+            claimants.append(HighCostClaimant(
+                member_id=f"M{int(self.member_ids[idx])}",
+                medical_payment=round(medical, 2),
+                rx_payment=round(rx, 2),
+                predicted_cost_range=predicted
+            ))
+
+        return claimants
+
+
+def aggregate_chunks(chunks: Iterable[ClaimLines]) -> ClaimAggregates:
+    """
+    Aggregates a stream of claim line chunks drawn against one roster
+
+    Args:
+        chunks: e.g. ClaimsSimulator.iter_chunks(...)
+
+    Raises:
+        ValueError: if the stream is empty
+    """
+    aggregates = None
+    for chunk in chunks:
+        if aggregates is None:
+            aggregates = ClaimAggregates.empty(chunk.member_ids, chunk.plan_start, chunk.member_enrollment,
+                                               chunk.catalog)
+        aggregates.add(chunk)
+
+    if aggregates is None:
+        raise ValueError("No claim line chunks to aggregate")
+    return aggregates
+
+
+def aggregate_claim_lines(claim_lines: ClaimLines, chunk_size: int = DEFAULT_CHUNK_SIZE) -> ClaimAggregates:
+    """
+    Aggregates in-memory claim lines in one pass
+
+    Lines are processed in chunk_size slices so the composite keys and
+    bincount inputs stay cache-sized instead of allocating full-length
+    temporaries for tens of millions of rows.
+    """
+    aggregates = ClaimAggregates.empty(claim_lines.member_ids, claim_lines.plan_start,
+                                       claim_lines.member_enrollment, claim_lines.catalog)
+    for start in range(0, len(claim_lines), chunk_size):
+        aggregates.add(claim_lines.slice(start, start + chunk_size))
+    return aggregates
@@ -0,0 +1,397 @@
+"""
+Generator Benchmark Suite
+=========================
+
+Measures throughput and memory of every MockDataGenerator and
+CSVTemplateGenerator path at row counts from 1e3 to 1e7.
+
+- Each (case, row count) runs in a fresh worker process, so peak RSS is that
+  measurement's own high-water mark rather than the suite's
+- Wall time is the best of --repeat runs; tracemalloc (opt-in, a separate
+  run because tracing slows allocation-heavy code) reports peak Python heap
+- Results are written as JSON; --compare flags throughput or memory
+  regressions against a stored baseline and exits non-zero
+
+Usage:
+    python scripts/benchmark.py --output bench.json
+    python scripts/benchmark.py --cases complete_dashboard_data --scales 1e5,1e6,1e7
+    python scripts/benchmark.py --output new.json --compare bench.json --threshold 0.15
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+import argparse
+import contextlib
+import io
+import json
+import math
+import multiprocessing
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from claims_simulator import CLAIM_LINE_COLUMNS, ClaimsSimulator, claim_line_rows
+from cost_projection import project_cost_ranges
+from csv_stream import ProgressReporter, write_csv_stream
+from data_template_generator import CSVTemplateGenerator, MockDataGenerator
+from er_simulator import ERSimulator, aggregate_er_visits
+from pharmacy_simulator import PharmacySimulator, aggregate_fills
+from rng_context import RNGContext
+
+
+# Bump when the result layout changes
+RESULTS_VERSION = 1
+
+DEFAULT_SCALES = [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7]
+
+# Relative slowdown (or memory growth) tolerated by --compare
+DEFAULT_THRESHOLD = 0.10
+
+# Claim lines per simulated member, as in generate_complete_dashboard_data's defaults
+LINES_PER_MEMBER = 30
+
+# Limit for generators that build one Python object per row
+OBJECT_ROW_LIMIT = 10 ** 6
+
+# Monte Carlo trials per member in the cost_projection case
+PROJECTION_TRIALS = 1000
+
+# Pharmacy fills per simulated member (about one a month)
+FILLS_PER_MEMBER = 12
+
+# ER visits per simulated member; kept high so the roster does not dominate
+VISITS_PER_MEMBER = 5
+
+
+# ============================================================================
+# CASES
+# ============================================================================
+
+def _repeat(generate: Callable[[RNGContext], List[Any]], rows: int, rng: RNGContext) -> int:
+    """Calls a fixed-size generator until at least rows rows are produced"""
+    produced = 0
+    while produced < rows:
+        produced += len(generate(rng))
+    return produced
+
+
+def _monthly_costs(rows: int, rng: RNGContext) -> int:
+    return _repeat(lambda r: MockDataGenerator.generate_monthly_costs(rng=r), rows, rng)
+
+
+def _high_cost_claimants(rows: int, rng: RNGContext) -> int:
+    return len(MockDataGenerator.generate_high_cost_claimants(rows, rng))
+
+
+def _diagnosis_by_cost(rows: int, rng: RNGContext) -> int:
+    return len(MockDataGenerator.generate_diagnosis_by_cost(rows, rng))
+
+
+def _diagnosis_by_utilization(rows: int, rng: RNGContext) -> int:
+    return len(MockDataGenerator.generate_diagnosis_by_utilization(rows, rng))
+
+
+def _drug_classes(rows: int, rng: RNGContext) -> int:
+    return len(MockDataGenerator.generate_drug_classes(rows, rng))
+
+
+def _chronic_condition_compliance(rows: int, rng: RNGContext) -> int:
+    return _repeat(MockDataGenerator.generate_chronic_condition_compliance, rows, rng)
+
+
+def _preventive_screenings(rows: int, rng: RNGContext) -> int:
+    return _repeat(MockDataGenerator.generate_preventive_screenings, rows, rng)
+
+
+def _complete_dashboard_data(rows: int, rng: RNGContext) -> int:
+    """rows = simulated claim lines"""
+    MockDataGenerator.generate_complete_dashboard_data(
+        member_count=max(rows // LINES_PER_MEMBER, 1), claim_line_count=rows, rng=rng
+    )
+    return rows
+
+
+def _csv_templates(rows: int, rng: RNGContext) -> int:
+    """rows = template files written"""
+    written = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        while written < rows:
+            # force: the manifest would otherwise skip every run after the first
+            CSVTemplateGenerator.generate_all_templates(Path(tmp), force=True)
+            written += len(list(Path(tmp).glob('*.csv')))
+    return written
+
+
+def _claim_lines_csv(rows: int, rng: RNGContext, filename: str = 'claims.csv') -> int:
+    """Same pipeline as claims_simulator.write_claim_lines_csv, without progress lines"""
+    simulator = ClaimsSimulator(max(rows // LINES_PER_MEMBER, 1), rng=rng)
+    chunks = (claim_line_rows(chunk) for chunk in simulator.iter_chunks(rows))
+    with tempfile.TemporaryDirectory() as tmp:
+        stats = write_csv_stream(Path(tmp) / filename, CLAIM_LINE_COLUMNS, chunks,
+                                 progress=ProgressReporter(filename, stream=None))
+    return stats.rows
+
+
+def _claim_lines_csv_gzip(rows: int, rng: RNGContext) -> int:
+    """claim_lines_csv compressed on the fly at the default gzip level"""
+    return _claim_lines_csv(rows, rng, 'claims.csv.gz')
+
+
+def _cost_projection(rows: int, rng: RNGContext) -> int:
+    """rows = simulated outcomes (members x PROJECTION_TRIALS)"""
+    members = max(rows // PROJECTION_TRIALS, 1)
+    totals = rng.generator.lognormal(np.log(2_500), 1.4, members)
+    project_cost_ranges(totals, PROJECTION_TRIALS, rng)
+    return members * PROJECTION_TRIALS
+
+
+def _pharmacy_fills(rows: int, rng: RNGContext) -> int:
+    """rows = simulated fills, aggregated into drug classes and monthly rx"""
+    simulator = PharmacySimulator(max(rows // FILLS_PER_MEMBER, 1), rng=rng)
+    return aggregate_fills(simulator.iter_chunks(rows)).fills
+
+
+def _er_visits(rows: int, rng: RNGContext) -> int:
+    """rows = simulated ER visits, counted into categories and top diagnoses"""
+    simulator = ERSimulator(max(rows // VISITS_PER_MEMBER, 1), rng=rng)
+    return aggregate_er_visits(simulator.iter_chunks(rows)).visit_count
+
+
+@dataclass
+class BenchmarkCase:
+    """A generator path driven at a requested row count"""
+    name: str
+    run: Callable[[int, RNGContext], int]   # Returns rows actually produced
+    max_rows: int                           # Larger scales are recorded as skipped
+
+
+CASES: Dict[str, BenchmarkCase] = {case.name: case for case in [
+    BenchmarkCase('monthly_costs', _monthly_costs, OBJECT_ROW_LIMIT),
+    BenchmarkCase('high_cost_claimants', _high_cost_claimants, OBJECT_ROW_LIMIT),
+    BenchmarkCase('diagnosis_by_cost', _diagnosis_by_cost, OBJECT_ROW_LIMIT),
+    BenchmarkCase('diagnosis_by_utilization', _diagnosis_by_utilization, OBJECT_ROW_LIMIT),
+    BenchmarkCase('drug_classes', _drug_classes, OBJECT_ROW_LIMIT),
+    BenchmarkCase('chronic_condition_compliance', _chronic_condition_compliance, OBJECT_ROW_LIMIT),
+    BenchmarkCase('preventive_screenings', _preventive_screenings, OBJECT_ROW_LIMIT),
+    BenchmarkCase('complete_dashboard_data', _complete_dashboard_data, 10 ** 7),
+    BenchmarkCase('csv_templates', _csv_templates, 10 ** 4),
+    BenchmarkCase('claim_lines_csv', _claim_lines_csv, 10 ** 7),
+    BenchmarkCase('claim_lines_csv_gzip', _claim_lines_csv_gzip, 10 ** 7),
+    BenchmarkCase('cost_projection', _cost_projection, 10 ** 9),
+    BenchmarkCase('pharmacy_fills', _pharmacy_fills, 10 ** 8),
+    BenchmarkCase('er_visits', _er_visits, 10 ** 8),
+]}
+
+
+# ============================================================================
+# MEASUREMENT
+# ============================================================================
+
+def _peak_rss_mb() -> Optional[float]:
+    """Process high-water RSS in MB (None where resource is unavailable)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+
+def measure_case(name: str, rows: int, seed: int, repeat: int = 1,
+                 trace_memory: bool = False) -> Dict[str, Any]:
+    """
+    Runs one case at one row count (inside a fresh worker process)
+
+    Every run uses the same seed, so repeats do identical work. Generator
+    console output is discarded.
+
+    Returns:
+        Result entry for the JSON report
+    """
+    case = CASES[name]
+    baseline_rss = _peak_rss_mb()
+    best = math.inf
+    produced = 0
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            started = time.perf_counter()
+            produced = case.run(rows, RNGContext(seed))
+            best = min(best, time.perf_counter() - started)
+        peak_rss = _peak_rss_mb()
+
+        traced_peak = None
+        if trace_memory:
+            tracemalloc.start()
+            try:
+                case.run(rows, RNGContext(seed))
+                traced_peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+            finally:
+                tracemalloc.stop()
+
+    return {
+        'case': name,
+        'rows': rows,
+        'rows_produced': produced,
+        'status': 'ok',
+        'seconds': round(best, 6),
+        'rows_per_second': round(produced / best, 1) if best > 0 else None,
+        'peak_rss_mb': round(peak_rss, 2) if peak_rss is not None else None,
+        'baseline_rss_mb': round(baseline_rss, 2) if baseline_rss is not None else None,
+        'tracemalloc_peak_mb': round(traced_peak, 2) if traced_peak is not None else None,
+    }
+
+
+def run_benchmarks(case_names: List[str], scales: List[int], seed: int = 0, repeat: int = 1,
+                   trace_memory: bool = False) -> Dict[str, Any]:
+    """
+    Runs every case at every scale, each in its own spawned process
+
+    Args:
+        case_names: Keys of CASES
+        scales: Requested row counts
+        seed: Seed shared by all runs
+        repeat: Timed runs per measurement (best is kept)
+        trace_memory: Also record tracemalloc peak (extra untimed run)
+
+    Returns:
+        The JSON report
+    """
+    unknown = [name for name in case_names if name not in CASES]
+    if unknown:
+        raise ValueError(f"Unknown benchmark cases: {', '.join(unknown)} (known: {', '.join(CASES)})")
+
+    context = multiprocessing.get_context('spawn')
+    results = []
+    for name in case_names:
+        for rows in scales:
+            if rows > CASES[name].max_rows:
+                results.append({'case': name, 'rows': rows, 'status': 'skipped'})
+                continue
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                result = executor.submit(measure_case, name, rows, seed, repeat, trace_memory).result()
+            results.append(result)
+            print(f"✓ {name} @ {rows:,}: {result['seconds']:.3f}s "
+                  f"({result['rows_per_second']:,.0f} rows/sec, peak RSS {result['peak_rss_mb']}MB)")
+
+    return {
+        'version': RESULTS_VERSION,
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'seed': seed,
+        'repeat': repeat,
+        'results': results,
+    }
+
+
+# ============================================================================
+# BASELINE COMPARISON
+# ============================================================================
+
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any],
+                    threshold: float = DEFAULT_THRESHOLD) -> List[str]:
+    """
+    Lists regressions of current against baseline
+
+    A measurement regresses when its rows/sec falls more than threshold
+    below the baseline, or its peak RSS / tracemalloc peak grows more than
+    threshold above it. Only (case, rows) pairs measured in both reports
+    are compared.
+
+    Returns:
+        One message per regression (empty when none)
+    """
+    measured = {(r['case'], r['rows']): r for r in baseline['results'] if r['status'] == 'ok'}
+    regressions = []
+
+    for result in current['results']:
+        before = measured.get((result['case'], result['rows']))
+        if result['status'] != 'ok' or before is None:
+            continue
+        label = f"{result['case']} @ {result['rows']:,}"
+
+        if before['rows_per_second'] and result['rows_per_second'] is not None:
+            change = result['rows_per_second'] / before['rows_per_second'] - 1
+            if change < -threshold:
+                regressions.append(f"{label}: throughput {change:+.1%} "
+                                   f"({before['rows_per_second']:,.0f} -> {result['rows_per_second']:,.0f} rows/sec)")
+
+        for metric in ('peak_rss_mb', 'tracemalloc_peak_mb'):
+            if before.get(metric) and result.get(metric) is not None:
+                change = result[metric] / before[metric] - 1
+                if change > threshold:
+                    regressions.append(f"{label}: {metric} {change:+.1%} "
+                                       f"({before[metric]} -> {result[metric]}MB)")
+
+    return regressions
+
+
+def parse_scales(value: str) -> List[int]:
+    """
+    '1e3,1e4,250000' -> [1000, 10000, 250000] (argparse type for --scales)
+
+    Raises:
+        argparse.ArgumentTypeError: if a part is not a positive row count
+    """
+    try:
+        scales = [int(float(part)) for part in value.split(',') if part.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected comma-separated row counts, got {value!r}")
+    if not scales or min(scales) <= 0:
+        raise argparse.ArgumentTypeError(f"row counts must be positive, got {value!r}")
+    return scales
+
+
+def parse_cases(value: str) -> List[str]:
+    """
+    'drug_classes,er_visits' -> ['drug_classes', 'er_visits'] (argparse type for --cases)
+
+    Raises:
+        argparse.ArgumentTypeError: if a name is not a key of CASES
+    """
+    names = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in names if name not in CASES]
+    if unknown or not names:
+        raise argparse.ArgumentTypeError(f"unknown benchmark cases: {', '.join(unknown) or '(none given)'} "
+                                         f"(known: {', '.join(CASES)})")
+    return names
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark generator throughput and memory")
+    parser.add_argument("--cases", type=parse_cases, default=list(CASES), help="Comma-separated case names")
+    parser.add_argument("--scales", type=parse_scales, default=DEFAULT_SCALES,
+                        help="Comma-separated row counts (e.g. 1e3,1e4,1e5)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed shared by all runs")
+    parser.add_argument("--repeat", type=int, default=1, help="Timed runs per measurement (best kept)")
+    parser.add_argument("--tracemalloc", action="store_true", help="Also record tracemalloc peaks")
+    parser.add_argument("--output", type=Path, default=Path("benchmark_results.json"), help="JSON results path")
+    parser.add_argument("--compare", type=Path, default=None, help="Baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Tolerated relative regression (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.cases, args.scales, args.seed, args.repeat, args.tracemalloc)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"✓ Results saved to: {args.output}")
+
+    if args.compare is not None:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            regressions = compare_results(report, json.load(f), args.threshold)
+        if regressions:
+            print(f"✗ {len(regressions)} regressions against {args.compare}")
+            for message in regressions:
+                print(f"  - {message}")
+            sys.exit(1)
+        print(f"✓ No regressions against {args.compare}")
@@ -0,0 +1,513 @@
+"""
+Member-Level Claims Simulator
+=============================
+
+NumPy-backed engine that generates member-level medical claim lines in a
+single batch call. Used by MockDataGenerator to derive dashboard summaries
+from realistic, production-scale data instead of hand-picked rows (see
+aggregation.py for the reduction to dashboard sections).
+
+Each claim line carries:
+- member (index into the simulated roster)
+- service date
+- ICD-10 diagnosis code (index into an ICD10Catalog)
+- place of service
+- paid amount
+"""
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple, TypeVar
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from compression import codec_for_path, require_codec
+from csv_stream import DEFAULT_CHUNK_SIZE, StreamStats, write_csv_stream
+from rng_context import RNGContext, resolve_rng
+from data_template_generator import MockDataGenerator, PlaceOfService
+from icd10_catalog import ICD10Catalog
+from member_ids import MemberIdPermutation, unique_member_ids
+
+
+# ============================================================================
+# SIMULATION PARAMETERS
+# ============================================================================
+
+# Place of service categories in enum order; claim lines store the index
+PLACE_OF_SERVICE_CATEGORIES: List[PlaceOfService] = list(PlaceOfService)
+DRUGS_INDEX = PLACE_OF_SERVICE_CATEGORIES.index(PlaceOfService.DRUGS)
+
+# Relative claim frequency per place of service (same order as the enum)
+PLACE_OF_SERVICE_FREQUENCY = np.array([
+    0.140,   # Outpatient Procedures
+    0.020,   # Hospital Stay (In-Patient)
+    0.400,   # Drugs
+    0.050,   # Immediate Medical Attention
+    0.120,   # Testing
+    0.230,   # Office/Clinic Visit
+    0.010,   # Substance Abuse
+    0.020,   # Mental Health
+    0.005,   # Pregnancy
+    0.005,   # Recovery
+])
+
+# Mean paid amount per claim line for each place of service
+PLACE_OF_SERVICE_MEAN_PAID = np.array([
+    450.0,    # Outpatient Procedures
+    2100.0,   # Hospital Stay (In-Patient)
+    85.0,     # Drugs
+    380.0,    # Immediate Medical Attention
+    95.0,     # Testing
+    42.0,     # Office/Clinic Visit
+    280.0,    # Substance Abuse
+    90.0,     # Mental Health
+    220.0,    # Pregnancy
+    200.0,    # Recovery
+])
+
+# Relative frequency of each code in MockDataGenerator.ICD10_CODES
+ICD10_FREQUENCY = np.array([
+    0.010, 0.008, 0.004, 0.012, 0.020, 0.010, 0.015, 0.060, 0.008,
+    0.025, 0.250, 0.180, 0.090, 0.080, 0.060, 0.018, 0.050, 0.100,
+])
+
+# Diagnoses drawn when no full ICD-10 catalog is supplied (see icd10_catalog.py)
+DEFAULT_CATALOG = ICD10Catalog.from_entries(MockDataGenerator.ICD10_CODES, ICD10_FREQUENCY)
+
+# Log-space spread of individual claim amounts around the category mean
+PAID_AMOUNT_SIGMA = 1.1
+
+# Pareto shape for member risk; lower values concentrate cost in fewer members
+MEMBER_RISK_SHAPE = 1.2
+
+# Probability that a member terminates coverage during the plan year
+ANNUAL_TERMINATION_RATE = 0.12
+
+
+# ============================================================================
+# CLAIM LINE STORAGE
+# ============================================================================
+
+@dataclass
+class ClaimLines:
+    """
+    Member-level medical claim lines stored as parallel NumPy columns
+
+    Categorical fields hold small-integer indexes rather than strings:
+    - icd10_index: index into catalog (DEFAULT_CATALOG unless one is supplied)
+    - place_of_service: index into PLACE_OF_SERVICE_CATEGORIES
+    """
+    member_index: np.ndarray        # int32, index into the simulated roster
+    service_date: np.ndarray        # datetime64[D]
+    icd10_index: np.ndarray         # catalog.index_dtype (int16, int32 for 32k+ codes)
+    place_of_service: np.ndarray    # int8
+    paid_amount: np.ndarray         # float64
+    member_ids: np.ndarray          # uint64 roster IDs, indexed by member_index
+    plan_start: np.datetime64       # First day of the plan year
+    member_enrollment: np.ndarray   # Active members per plan month (12 entries)
+    catalog: ICD10Catalog = DEFAULT_CATALOG
+
+    def __len__(self) -> int:
+        return len(self.paid_amount)
+
+    @property
+    def member_count(self) -> int:
+        return len(self.member_ids)
+
+    def member_id(self, index: int) -> str:
+        """Formatted de-identified ID of a roster member"""
+        return f"M{int(self.member_ids[index])}"
+
+    @property
+    def month_index(self) -> np.ndarray:
+        """Plan month (0-11) of each claim line"""
+        start_month = self.plan_start.astype('datetime64[M]')
+        return (self.service_date.astype('datetime64[M]') - start_month).astype(np.int64)
+
+    @property
+    def is_rx(self) -> np.ndarray:
+        """Boolean mask of prescription drug claim lines"""
+        return self.place_of_service == DRUGS_INDEX
+
+    def slice(self, start: int, stop: int) -> "ClaimLines":
+        """Claim lines [start:stop] as views sharing the roster columns"""
+        return ClaimLines(
+            member_index=self.member_index[start:stop],
+            service_date=self.service_date[start:stop],
+            icd10_index=self.icd10_index[start:stop],
+            place_of_service=self.place_of_service[start:stop],
+            paid_amount=self.paid_amount[start:stop],
+            member_ids=self.member_ids,
+            plan_start=self.plan_start,
+            member_enrollment=self.member_enrollment,
+            catalog=self.catalog
+        )
+
+    def take(self, selection: np.ndarray) -> "ClaimLines":
+        """Claim lines selected by a boolean mask or index array"""
+        return ClaimLines(
+            member_index=self.member_index[selection],
+            service_date=self.service_date[selection],
+            icd10_index=self.icd10_index[selection],
+            place_of_service=self.place_of_service[selection],
+            paid_amount=self.paid_amount[selection],
+            member_ids=self.member_ids,
+            plan_start=self.plan_start,
+            member_enrollment=self.member_enrollment,
+            catalog=self.catalog
+        )
+
+
+# ============================================================================
+# SIMULATOR
+# ============================================================================
+
+@dataclass
+class MemberRoster:
+    """Simulated members shared by every claim line chunk"""
+    member_ids: np.ndarray          # uint64, numeric part of "M<19 digits>" IDs
+    claim_weight: np.ndarray        # Probability a claim line belongs to each member
+    severity: np.ndarray            # Multiplier on each member's claim amounts
+    term_month: np.ndarray          # First plan month not enrolled (12 = full year)
+
+    @property
+    def member_enrollment(self) -> np.ndarray:
+        """Active members per plan month (12 entries)"""
+        terminations = np.cumsum(np.bincount(self.term_month, minlength=13))
+        return len(self.member_ids) - terminations[:12]
+
+
+class ClaimsSimulator:
+    """
+    Generates member-level medical claim lines in vectorized batches
+
+    - Member risk follows a Pareto distribution, so a small share of members
+      drives most of the cost (used for both claim frequency and severity)
+    - Members may terminate mid-year; their claims fall inside enrolled days
+    - Claim amounts are lognormal around a per-place-of-service mean
+    - Diagnoses are drawn from an ICD10Catalog by alias sampling, so a full
+      70k-code catalog costs the same per line as the built-in 18 codes
+    """
+
+    def __init__(self, member_count: int = 1200, plan_start: str = "2024-04-01",
+                 rng: Optional[RNGContext] = None, catalog: Optional[ICD10Catalog] = None):
+        if member_count <= 0:
+            raise ValueError(f"member_count must be positive, got {member_count}")
+
+        self.member_count = member_count
+        self.plan_start = np.datetime64(plan_start, 'D')
+        self.rng = resolve_rng(rng).generator
+        self.catalog = DEFAULT_CATALOG if catalog is None else catalog
+
+        # Day offset of each plan month's first day (13 entries, last = plan end)
+        plan_months = self.plan_start.astype('datetime64[M]') + np.arange(13)
+        self.month_starts = (plan_months.astype('datetime64[D]') - self.plan_start).astype(np.int64)
+
+    def simulate_roster(self) -> MemberRoster:
+        """Draws member IDs, risk and enrollment for the full roster"""
+        rng = self.rng
+        member_ids = unique_member_ids(self.member_count, permutation=MemberIdPermutation.from_generator(rng))
+        risk = rng.pareto(MEMBER_RISK_SHAPE, self.member_count) + 1.0
+
+        # Split risk evenly between how often a member claims and how much;
+        # severity is normalized so the average claim line keeps its category mean
+        root_risk = np.sqrt(risk)
+        claim_weight = root_risk / root_risk.sum()
+        severity = root_risk / np.dot(claim_weight, root_risk)
+
+        # Terminating members leave at a uniformly random plan month (1-11)
+        terminated = rng.random(self.member_count) < ANNUAL_TERMINATION_RATE
+        term_month = np.where(terminated, rng.integers(1, 12, self.member_count), 12)
+
+        return MemberRoster(member_ids, claim_weight, severity, term_month)
+
+    def simulate_lines(self, roster: MemberRoster, line_count: int) -> ClaimLines:
+        """
+        Generates claim lines against an existing roster
+
+        Args:
+            roster: Members drawn by simulate_roster
+            line_count: Number of claim lines to generate
+
+        Returns:
+            ClaimLines with all columns populated
+        """
+        if line_count < 0:
+            raise ValueError(f"line_count must be non-negative, got {line_count}")
+
+        rng = self.rng
+        member_index, service_date = self.draw_members(roster, line_count)
+
+        pos_p = PLACE_OF_SERVICE_FREQUENCY / PLACE_OF_SERVICE_FREQUENCY.sum()
+        place_of_service = rng.choice(len(pos_p), size=line_count, p=pos_p).astype(np.int8)
+
+        icd10_index = self.catalog.alias.sample_generator(line_count, rng).astype(self.catalog.index_dtype)
+
+        # Lognormal noise with unit mean, scaled by category and member severity
+        noise = rng.lognormal(-PAID_AMOUNT_SIGMA ** 2 / 2, PAID_AMOUNT_SIGMA, line_count)
+        paid_amount = np.round(
+            PLACE_OF_SERVICE_MEAN_PAID[place_of_service] * roster.severity[member_index] * noise, 2
+        )
+
+        return ClaimLines(
+            member_index=member_index,
+            service_date=service_date,
+            icd10_index=icd10_index,
+            place_of_service=place_of_service,
+            paid_amount=paid_amount,
+            member_ids=roster.member_ids,
+            plan_start=self.plan_start,
+            member_enrollment=roster.member_enrollment,
+            catalog=self.catalog
+        )
+
+    def draw_members(self, roster: MemberRoster, count: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Members and dates for count events (claim lines, fills, visits)
+
+        Members are drawn by claim_weight, so higher-risk members have more
+        events, and each date falls inside the member's enrolled months.
+
+        Returns:
+            (member_index int32, event date datetime64[D])
+        """
+        enrolled_days = self.month_starts[roster.term_month]
+        member_index = self.rng.choice(self.member_count, size=count, p=roster.claim_weight).astype(np.int32)
+        day_offset = (self.rng.random(count) * enrolled_days[member_index]).astype(np.int64)
+        return member_index, self.plan_start + day_offset
+
+    def simulate(self, line_count: int) -> ClaimLines:
+        """
+        Generates a roster and all of its claim lines in one batch
+
+        Args:
+            line_count: Number of claim lines to generate
+
+        Returns:
+            ClaimLines with all columns populated
+        """
+        return self.simulate_lines(self.simulate_roster(), line_count)
+
+    def iter_chunks(self, line_count: int, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[ClaimLines]:
+        """
+        Generates claim lines in fixed-size chunks over a single roster
+
+        Memory is bounded by the roster plus one chunk, regardless of
+        line_count.
+
+        Args:
+            line_count: Total number of claim lines to generate
+            chunk_size: Maximum claim lines per chunk
+
+        Yields:
+            ClaimLines chunks; the last chunk may be smaller
+        """
+        if chunk_size <= 0:
+            raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+
+        roster = self.simulate_roster()
+        for start in range(0, line_count, chunk_size):
+            yield self.simulate_lines(roster, min(chunk_size, line_count - start))
+
+
+# ============================================================================
+# ROSTER EVENTS
+# ============================================================================
+
+Events = TypeVar("Events")
+
+
+class RosterEventSimulator(ABC):
+    """
+    Base for simulators of member events other than claim lines
+
+    Uses ClaimsSimulator's roster model (see draw_members). Subclasses
+    implement simulate_events for one batch; rosters and chunking are shared.
+    Used by pharmacy_simulator.py and er_simulator.py.
+    """
+
+    def __init__(self, member_count: int = 1200, plan_start: str = "2024-04-01",
+                 rng: Optional[RNGContext] = None):
+        self.claims = ClaimsSimulator(member_count, plan_start, rng)
+        self.plan_start = self.claims.plan_start
+        self.rng = self.claims.rng
+
+    def simulate_roster(self) -> MemberRoster:
+        return self.claims.simulate_roster()
+
+    @abstractmethod
+    def simulate_events(self, roster: MemberRoster, count: int) -> Any:
+        """
+        Generates count events against an existing roster
+
+        Args:
+            roster: Members drawn by simulate_roster (or a ClaimsSimulator's)
+            count: Number of events to generate
+        """
+
+    def iter_chunks(self, count: int, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Any]:
+        """
+        Generates events in fixed-size chunks over a single roster
+
+        Yields:
+            Event chunks; the last chunk may be smaller
+        """
+        if count < 0:
+            raise ValueError(f"count must be non-negative, got {count}")
+        if chunk_size <= 0:
+            raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+
+        roster = self.simulate_roster()
+        for start in range(0, count, chunk_size):
+            yield self.simulate_events(roster, min(chunk_size, count - start))
+
+
+def fold_chunks(aggregates: Any, chunks: Iterable[Any]) -> Any:
+    """Adds each chunk to aggregates (anything with add()) and returns them"""
+    for chunk in chunks:
+        aggregates.add(chunk)
+    return aggregates
+
+
+# ============================================================================
+# STREAMING OUTPUT
+# ============================================================================
+
+CLAIM_LINE_COLUMNS = [
+    'member_id',
+    'service_date',
+    'diagnosis_code',
+    'place_of_service',
+    'paid_amount',
+]
+
+
+def claim_line_rows(claim_lines: ClaimLines) -> List[Tuple[Any, ...]]:
+    """Formats a chunk of claim lines as CSV rows matching CLAIM_LINE_COLUMNS"""
+    codes = claim_lines.catalog.display_codes
+    places = np.array([category.value for category in PLACE_OF_SERVICE_CATEGORIES])
+    member_ids = np.char.add('M', claim_lines.member_ids[claim_lines.member_index].astype(str))
+
+    return list(zip(
+        member_ids.tolist(),
+        claim_lines.service_date.astype(str).tolist(),
+        codes[claim_lines.icd10_index].tolist(),
+        places[claim_lines.place_of_service].tolist(),
+        np.char.mod('%.2f', claim_lines.paid_amount).tolist(),
+    ))
+
+
+def write_claim_lines_csv(output_path: Path, line_count: int, member_count: int = 1200,
+                          rng: Optional[RNGContext] = None,
+                          chunk_size: int = DEFAULT_CHUNK_SIZE,
+                          compression: Optional[str] = None,
+                          level: Optional[int] = None,
+                          catalog: Optional[ICD10Catalog] = None) -> StreamStats:
+    """
+    Streams simulated claim lines to a CSV file in constant memory
+
+    Args:
+        output_path: Destination CSV path
+        line_count: Number of claim lines to write
+        member_count: Size of the simulated roster
+        rng: Random stream for the simulator
+        chunk_size: Claim lines generated and written per chunk
+        compression: "gzip", "zstd", "lz4" or "none"; None infers it from the
+                     suffix of output_path (e.g. "claim_lines.csv.zst")
+        level: Compression level; None for the codec default
+        catalog: Diagnosis codes to draw from; None for DEFAULT_CATALOG
+
+    Returns:
+        StreamStats for the completed write
+    """
+    simulator = ClaimsSimulator(member_count, rng=rng, catalog=catalog)
+    chunks = (claim_line_rows(chunk) for chunk in simulator.iter_chunks(line_count, chunk_size))
+    return write_csv_stream(output_path, CLAIM_LINE_COLUMNS, chunks, compression=compression, level=level)
+
+
+def write_event_chunks_csv(output_path: Path, columns: List[str],
+                           format_rows: Callable[[Events], List[Tuple[Any, ...]]],
+                           chunks: Iterable[Events],
+                           compression: Optional[str] = None,
+                           level: Optional[int] = None,
+                           aggregates: Optional[Any] = None) -> StreamStats:
+    """
+    Streams event chunks to a CSV file in constant memory
+
+    Args:
+        output_path: Destination CSV path
+        columns: Header row
+        format_rows: Formats one chunk as rows matching columns
+        chunks: Event chunks, e.g. RosterEventSimulator.iter_chunks
+        compression: "gzip", "zstd", "lz4" or "none"; None infers it from the suffix
+        level: Compression level; None for the codec default
+        aggregates: Accumulators (anything with add()) to fold each chunk into while writing
+
+    Returns:
+        StreamStats for the completed write
+    """
+    def rows() -> Iterator[List[Tuple[Any, ...]]]:
+        for chunk in chunks:
+            if aggregates is not None:
+                aggregates.add(chunk)
+            yield format_rows(chunk)
+
+    return write_csv_stream(output_path, columns, rows(), compression=compression, level=level)
+
+
+# ============================================================================
+# EVENT CLI
+# ============================================================================
+
+def event_argument_parser(description: str, noun: str, default_count: int = 1_000_000,
+                          default_members: Optional[int] = None,
+                          members_help: str = "Roster size") -> argparse.ArgumentParser:
+    """
+    Argument parser shared by the roster event CLIs
+
+    Adds --<noun> (event count, accepts 5e6), --members, --seed,
+    --chunk-size, --output and --compress.
+    """
+    # Imported here: data_template_generator is only needed for the CLI choices
+    from data_template_generator import COMPRESSION_CHOICES
+
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument(f"--{noun}", type=lambda v: int(float(v)), default=default_count,
+                        help=f"{noun.capitalize()} to simulate")
+    parser.add_argument("--members", type=int, default=default_members, help=members_help)
+    parser.add_argument("--seed", type=int, default=None, help="Seed for reproducible output")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help=f"{noun.capitalize()} per chunk")
+    parser.add_argument("--output", type=Path, default=None, help=f"Also stream the {noun} to this CSV")
+    parser.add_argument("--compress", choices=COMPRESSION_CHOICES, default=None,
+                        help="Compression for --output (default: from its suffix)")
+    return parser
+
+
+def run_event_cli(args: argparse.Namespace, count: int, simulator: RosterEventSimulator, aggregates: Any,
+                  columns: List[str], format_rows: Callable[[Any], List[Tuple[Any, ...]]]) -> float:
+    """
+    Simulates count events into aggregates, streaming them to args.output if set
+
+    Exits with status 2 if the output's codec is unavailable.
+
+    Returns:
+        Elapsed seconds
+    """
+    if args.output is not None:
+        try:
+            require_codec(args.compress or codec_for_path(args.output))
+        except ValueError as e:
+            print(f"✗ {e}")
+            sys.exit(2)
+
+    started = time.perf_counter()
+    chunks = simulator.iter_chunks(count, args.chunk_size)
+    if args.output is not None:
+        write_event_chunks_csv(args.output, columns, format_rows, chunks, args.compress, aggregates=aggregates)
+    else:
+        fold_chunks(aggregates, chunks)
+    return time.perf_counter() - started
@@ -0,0 +1,393 @@
+"""
+Columnar Dashboard Storage
+==========================
+
+Struct-of-arrays representation for CompleteDashboardData sections.
+
+A ColumnarTable stores one typed NumPy array per dataclass field instead of a
+list of dataclass instances:
+- float / int fields: float64 / int64 arrays (plus a validity mask if Optional)
+- Enum fields: int8 codes into the enum's member order (-1 = None)
+- str fields: the most compact of
+    * prefixed integers, e.g. "M5678871894251147653" -> "M" + uint64
+    * dictionary codes, for low-cardinality text (months, diagnosis codes)
+    * fixed-width unicode
+
+ColumnarTable implements the Sequence protocol and materializes dataclass
+instances lazily on access, so existing callers (validate_all, CSV writers,
+loops over sections) work unchanged.
+"""
+
+from abc import ABC, abstractmethod
+from collections.abc import Sequence
+from dataclasses import fields, is_dataclass, replace
+from enum import Enum
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Type, Union, get_args, get_origin
+import re
+
+import numpy as np
+
+
+# Largest digit run that always fits in uint64
+MAX_PREFIXED_DIGITS = 19
+
+_PREFIXED_INT = re.compile(rf'^(\D*)(\d{{1,{MAX_PREFIXED_DIGITS}}})$')
+
+
+# ============================================================================
+# COLUMN TYPES
+# ============================================================================
+
+class Column(ABC):
+    """Base class for one encoded field of a ColumnarTable"""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+    @abstractmethod
+    def get(self, index: int) -> Any:
+        """Decoded Python value at a row"""
+
+    @abstractmethod
+    def take(self, indices: np.ndarray) -> "Column":
+        """New column with the given rows, in order"""
+
+    @property
+    @abstractmethod
+    def nbytes(self) -> int:
+        ...
+
+
+class NumericColumn(Column):
+    """float64/int64 values; Optional fields carry a validity mask"""
+
+    def __init__(self, values: np.ndarray, valid: Optional[np.ndarray] = None):
+        self.values = values
+        self.valid = valid
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def get(self, index: int) -> Any:
+        if self.valid is not None and not self.valid[index]:
+            return None
+        return self.values[index].item()
+
+    def take(self, indices: np.ndarray) -> "NumericColumn":
+        return NumericColumn(self.values[indices], None if self.valid is None else self.valid[indices])
+
+    @property
+    def nbytes(self) -> int:
+        return self.values.nbytes + (0 if self.valid is None else self.valid.nbytes)
+
+
+class EnumColumn(Column):
+    """Small-integer codes into list(enum_type); -1 encodes None"""
+
+    def __init__(self, codes: np.ndarray, enum_type: Type[Enum]):
+        self.codes = codes
+        self.enum_type = enum_type
+        self.members = list(enum_type)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def get(self, index: int) -> Optional[Enum]:
+        code = int(self.codes[index])
+        return None if code < 0 else self.members[code]
+
+    def take(self, indices: np.ndarray) -> "EnumColumn":
+        return EnumColumn(self.codes[indices], self.enum_type)
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes
+
+
+class PrefixedIntColumn(Column):
+    """Strings shaped like prefix + fixed-width digits, stored as uint64"""
+
+    def __init__(self, prefix: str, values: np.ndarray, width: int):
+        self.prefix = prefix
+        self.values = values
+        self.width = width
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def get(self, index: int) -> str:
+        return f"{self.prefix}{int(self.values[index]):0{self.width}d}"
+
+    def take(self, indices: np.ndarray) -> "PrefixedIntColumn":
+        return PrefixedIntColumn(self.prefix, self.values[indices], self.width)
+
+    @property
+    def nbytes(self) -> int:
+        return self.values.nbytes
+
+
+class DictionaryColumn(Column):
+    """Integer codes into a small array of distinct strings"""
+
+    def __init__(self, codes: np.ndarray, dictionary: np.ndarray):
+        self.codes = codes
+        self.dictionary = dictionary
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def get(self, index: int) -> str:
+        return str(self.dictionary[self.codes[index]])
+
+    def take(self, indices: np.ndarray) -> "DictionaryColumn":
+        return DictionaryColumn(self.codes[indices], self.dictionary)
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + self.dictionary.nbytes
+
+
+class FixedStringColumn(Column):
+    """Fixed-width unicode array for high-cardinality free text"""
+
+    def __init__(self, values: np.ndarray):
+        self.values = values
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def get(self, index: int) -> str:
+        return str(self.values[index])
+
+    def take(self, indices: np.ndarray) -> "FixedStringColumn":
+        return FixedStringColumn(self.values[indices])
+
+    @property
+    def nbytes(self) -> int:
+        return self.values.nbytes
+
+
+def smallest_code_dtype(count: int) -> np.dtype:
+    """
+    Smallest signed integer dtype that can index count values (and -1)
+
+    Used for enum and dictionary codes, here and when csv_ingest encodes
+    columns straight from CSV text.
+
+    Args:
+        count: Number of distinct values the codes must address
+    """
+    for dtype in (np.int8, np.int16, np.int32):
+        if count <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+def encode_strings(values: List[str]) -> Column:
+    """Picks the most compact column encoding for a list of strings"""
+    if values:
+        first = _PREFIXED_INT.match(values[0])
+        if first:
+            prefix, width = first.group(1), len(first.group(2))
+            matches = [_PREFIXED_INT.match(v) for v in values]
+            if all(m and m.group(1) == prefix and len(m.group(2)) == width for m in matches):
+                digits = np.array([int(m.group(2)) for m in matches], dtype=np.uint64)
+                return PrefixedIntColumn(prefix, digits, width)
+
+    array = np.array(values, dtype=str)
+    dictionary, codes = np.unique(array, return_inverse=True)
+    if len(dictionary) <= len(array) // 2:
+        return DictionaryColumn(codes.astype(smallest_code_dtype(len(dictionary))), dictionary)
+    return FixedStringColumn(array)
+
+
+def unwrap_optional(field_type: Any) -> Tuple[Any, bool]:
+    """
+    Returns (inner_type, is_optional) for a dataclass field annotation
+
+    Optional[X] gives (X, True); any other annotation is returned unchanged
+    with False.
+    """
+    if get_origin(field_type) is Union:
+        args = [a for a in get_args(field_type) if a is not type(None)]
+        if len(args) == 1:
+            return args[0], True
+    return field_type, False
+
+
+def encode_column(field_type: Any, values: List[Any]) -> Column:
+    """Encodes one dataclass field's values according to its annotation"""
+    inner, optional = unwrap_optional(field_type)
+
+    if isinstance(inner, type) and issubclass(inner, Enum):
+        members = list(inner)
+        lookup = {member: code for code, member in enumerate(members)}
+        codes = np.array([-1 if v is None else lookup[v] for v in values],
+                         dtype=smallest_code_dtype(len(members)))
+        return EnumColumn(codes, inner)
+
+    if inner in (int, float):
+        dtype = np.int64 if inner is int else np.float64
+        if optional:
+            valid = np.array([v is not None for v in values], dtype=bool)
+            filled = np.array([0 if v is None else v for v in values], dtype=dtype)
+            return NumericColumn(filled, valid)
+        return NumericColumn(np.array(values, dtype=dtype))
+
+    if inner is str:
+        return encode_strings(values)
+
+    raise TypeError(f"Unsupported column type: {field_type}")
+
+
+# ============================================================================
+# COLUMNAR TABLE
+# ============================================================================
+
+class ColumnarTable(Sequence):
+    """
+    Struct-of-arrays table for one dashboard dataclass type
+
+    Indexing with an int returns a dataclass instance built on demand;
+    indexing with a slice or index array returns a new ColumnarTable.
+    """
+
+    def __init__(self, record_type: type, columns: Dict[str, Column]):
+        self.record_type = record_type
+        self.columns = columns
+        self.field_names = [f.name for f in fields(record_type)]
+
+        lengths = {len(column) for column in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"Columns of {record_type.__name__} have different lengths: {sorted(lengths)}")
+        self._length = lengths.pop() if lengths else 0
+
+    @classmethod
+    def from_records(cls, record_type: type, records: List[Any]) -> "ColumnarTable":
+        """Encodes a list of dataclass instances"""
+        columns = {}
+        for f in fields(record_type):
+            columns[f.name] = encode_column(f.type, [getattr(r, f.name) for r in records])
+        return cls(record_type, columns)
+
+    @classmethod
+    def from_arrays(cls, record_type: type, **arrays: Union[np.ndarray, Column]) -> "ColumnarTable":
+        """
+        Builds a table directly from NumPy output without creating records
+
+        Numeric fields take numeric arrays, enum fields take integer codes,
+        and str fields take either a Column or an array of strings.
+        """
+        columns = {}
+        for f in fields(record_type):
+            value = arrays[f.name]
+            if isinstance(value, Column):
+                columns[f.name] = value
+                continue
+
+            inner, _ = unwrap_optional(f.type)
+            if isinstance(inner, type) and issubclass(inner, Enum):
+                columns[f.name] = EnumColumn(np.asarray(value, dtype=smallest_code_dtype(len(inner))), inner)
+            elif inner in (int, float):
+                columns[f.name] = NumericColumn(np.asarray(value, dtype=np.int64 if inner is int else np.float64))
+            else:
+                columns[f.name] = encode_strings([str(v) for v in value])
+        return cls(record_type, columns)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.take(np.arange(self._length)[index])
+        if isinstance(index, np.ndarray):
+            return self.take(index)
+
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError(f"{self.record_type.__name__} index {index} out of range")
+        return self.record_type(**{name: self.columns[name].get(index) for name in self.field_names})
+
+    def __iter__(self) -> Iterator[Any]:
+        for i in range(self._length):
+            yield self[i]
+
+    def __repr__(self) -> str:
+        return f"ColumnarTable({self.record_type.__name__}, rows={self._length}, nbytes={self.nbytes:,})"
+
+    def take(self, indices: np.ndarray) -> "ColumnarTable":
+        """New table with the given rows, in order"""
+        indices = np.asarray(indices)
+        return ColumnarTable(self.record_type, {name: col.take(indices) for name, col in self.columns.items()})
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        Raw storage array for a field
+
+        Numeric fields return values, enum and dictionary fields return codes,
+        prefixed strings return their integer part.
+        """
+        col = self.columns[name]
+        if isinstance(col, (EnumColumn, DictionaryColumn)):
+            return col.codes
+        return col.values
+
+    def strings(self, name: str) -> np.ndarray:
+        """Decoded unicode array for a str field, whatever its encoding"""
+        col = self.columns[name]
+        if isinstance(col, DictionaryColumn):
+            return col.dictionary[col.codes]
+        if isinstance(col, FixedStringColumn):
+            return col.values
+        if isinstance(col, PrefixedIntColumn):
+            return np.char.add(col.prefix, np.char.zfill(col.values.astype(str), col.width))
+        raise TypeError(f"Field {name} of {self.record_type.__name__} is not a string column")
+
+    def to_records(self) -> List[Any]:
+        """Materializes every row as a dataclass instance"""
+        return list(self)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(col.nbytes for col in self.columns.values())
+
+
+# ============================================================================
+# DASHBOARD CONVERSION
+# ============================================================================
+
+def section_record_type(field_type: Any) -> Optional[type]:
+    """Element type of a List[X] annotation, if X is a dataclass"""
+    if get_origin(field_type) in (list, List):
+        args = get_args(field_type)
+        if args and is_dataclass(args[0]):
+            return args[0]
+    return None
+
+
+def to_columnar(data: Any) -> Any:
+    """
+    Converts every list section of a CompleteDashboardData to ColumnarTable
+
+    Returns a new CompleteDashboardData; single-object sections (plan info,
+    financial KPIs) are shared with the input.
+    """
+    changes = {}
+    for f in fields(data):
+        record_type = section_record_type(f.type)
+        value = getattr(data, f.name)
+        if record_type is not None and not isinstance(value, ColumnarTable):
+            changes[f.name] = ColumnarTable.from_records(record_type, value)
+    return replace(data, **changes)
+
+
+def to_records(data: Any) -> Any:
+    """Converts every ColumnarTable section back to a list of dataclasses"""
+    changes = {
+        f.name: getattr(data, f.name).to_records()
+        for f in fields(data)
+        if isinstance(getattr(data, f.name), ColumnarTable)
+    }
+    return replace(data, **changes)
@@ -0,0 +1,481 @@
+"""
+Binary Columnar Export
+======================
+
+Writes CompleteDashboardData and claim-level datasets as binary columns
+that downstream consumers open without parsing.
+
+Two on-disk formats:
+- "arrow": Arrow IPC (Feather v2) files, used when pyarrow is installed
+- "npy":   a directory of .npy column files plus a schema.json manifest,
+           needing only NumPy
+
+Reads are memory-mapped: opening a multi-GB dataset maps the files and
+returns immediately, and only the pages of the columns actually touched are
+read from disk. Column encodings match columnar.py (enum codes, dictionary
+strings, prefixed-integer member IDs), so a mapped table is a ColumnarTable
+with no conversion step.
+
+Layout of a dataset directory:
+    dataset.json                 # kind, format, tables, dataset metadata
+    <table>/schema.json          # npy: row count and per-column encoding
+    <table>/<column>.npy
+    <table>.arrow                # arrow: one IPC file per table
+"""
+
+from dataclasses import fields, is_dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+import json
+
+import numpy as np
+
+from claims_simulator import DEFAULT_CATALOG, ClaimLines
+from columnar import (
+    Column,
+    ColumnarTable,
+    DictionaryColumn,
+    EnumColumn,
+    FixedStringColumn,
+    NumericColumn,
+    PrefixedIntColumn,
+    section_record_type,
+    unwrap_optional,
+)
+from data_template_generator import CompleteDashboardData
+from icd10_catalog import ICD10Catalog
+
+
+FORMAT_ARROW = "arrow"
+FORMAT_NPY = "npy"
+FORMATS = (FORMAT_ARROW, FORMAT_NPY)
+
+DATASET_MANIFEST = "dataset.json"
+TABLE_SCHEMA = "schema.json"
+MANIFEST_VERSION = 1
+
+# Claim line columns written per row; roster columns live in a separate table
+CLAIM_LINE_FIELDS = ['member_index', 'service_date', 'icd10_index', 'place_of_service', 'paid_amount']
+
+
+def _pyarrow() -> Optional[Any]:
+    """The pyarrow module if installed, else None"""
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401  (registers pyarrow.ipc)
+    except ImportError:
+        return None
+    return pyarrow
+
+
+def default_format() -> str:
+    """Arrow when pyarrow is installed, otherwise the NumPy directory layout"""
+    return FORMAT_ARROW if _pyarrow() is not None else FORMAT_NPY
+
+
+def _resolve_format(fmt: Optional[str]) -> str:
+    fmt = fmt or default_format()
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}; expected one of {', '.join(FORMATS)}")
+    if fmt == FORMAT_ARROW and _pyarrow() is None:
+        raise ValueError("Arrow output requires pyarrow (pip install pyarrow); use format='npy'")
+    return fmt
+
+
+# ============================================================================
+# COLUMN ENCODING
+# ============================================================================
+
+def _column_spec(name: str, column: Column) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+    """
+    Describes a column and lists the arrays that store it
+
+    Returns:
+        Tuple of (spec for the manifest, {file suffix: array})
+    """
+    if isinstance(column, NumericColumn):
+        arrays = {'': column.values}
+        if column.valid is not None:
+            arrays['.valid'] = column.valid
+        return {'kind': 'numeric'}, arrays
+    if isinstance(column, EnumColumn):
+        return {'kind': 'enum', 'values': [m.value for m in column.members]}, {'': column.codes}
+    if isinstance(column, PrefixedIntColumn):
+        return {'kind': 'prefixed', 'prefix': column.prefix, 'width': column.width}, {'': column.values}
+    if isinstance(column, DictionaryColumn):
+        return {'kind': 'dictionary'}, {'': column.codes, '.dictionary': column.dictionary}
+    if isinstance(column, FixedStringColumn):
+        return {'kind': 'fixed'}, {'': column.values}
+    raise TypeError(f"Unsupported column type for {name}: {type(column).__name__}")
+
+
+def _build_column(spec: Dict[str, Any], arrays: Dict[str, np.ndarray], enum_type: Optional[type]) -> Column:
+    """Rebuilds a Column from its manifest spec and (mapped) arrays"""
+    kind = spec['kind']
+    if kind == 'numeric':
+        return NumericColumn(arrays[''], arrays.get('.valid'))
+    if kind == 'enum':
+        if enum_type is None or [m.value for m in enum_type] != spec['values']:
+            raise ValueError(f"Enum values on disk do not match the schema: {spec['values']}")
+        return EnumColumn(arrays[''], enum_type)
+    if kind == 'prefixed':
+        return PrefixedIntColumn(spec['prefix'], arrays[''], spec['width'])
+    if kind == 'dictionary':
+        return DictionaryColumn(arrays[''], arrays['.dictionary'])
+    if kind == 'fixed':
+        return FixedStringColumn(arrays[''])
+    raise ValueError(f"Unknown column kind: {kind}")
+
+
+def _enum_types(record_type: Optional[type]) -> Dict[str, type]:
+    """Enum annotation of each field of a dataclass (None-safe)"""
+    if record_type is None:
+        return {}
+    return {f.name: unwrap_optional(f.type)[0] for f in fields(record_type)}
+
+
+# ============================================================================
+# TABLE I/O
+# ============================================================================
+
+def _write_npy_table(output_dir: Path, columns: Dict[str, Column]) -> Path:
+    output_dir.mkdir(parents=True, exist_ok=True)
+    rows = len(next(iter(columns.values()))) if columns else 0
+    schema = {'version': MANIFEST_VERSION, 'rows': rows, 'columns': []}
+
+    for name, column in columns.items():
+        spec, arrays = _column_spec(name, column)
+        spec['name'] = name
+        spec['files'] = {}
+        for suffix, array in arrays.items():
+            file_name = f"{name}{suffix}.npy"
+            np.save(output_dir / file_name, np.ascontiguousarray(array), allow_pickle=False)
+            spec['files'][suffix] = file_name
+        spec['dtype'] = str(arrays[''].dtype)
+        schema['columns'].append(spec)
+
+    with open(output_dir / TABLE_SCHEMA, 'w', encoding='utf-8') as f:
+        json.dump(schema, f, indent=2)
+    return output_dir
+
+
+def _read_npy_table(input_dir: Path, record_type: Optional[type]) -> Dict[str, Column]:
+    with open(input_dir / TABLE_SCHEMA, 'r', encoding='utf-8') as f:
+        schema = json.load(f)
+
+    enum_types = _enum_types(record_type)
+    columns = {}
+    for spec in schema['columns']:
+        arrays = {
+            suffix: np.load(input_dir / file_name, mmap_mode='r', allow_pickle=False)
+            for suffix, file_name in spec['files'].items()
+        }
+        columns[spec['name']] = _build_column(spec, arrays, enum_types.get(spec['name']))
+    return columns
+
+
+def _arrow_array(pa: Any, column: Column) -> Tuple[Any, Dict[str, Any]]:
+    """Converts a Column to a pyarrow array plus the spec kept in field metadata"""
+    spec, _ = _column_spec('', column)
+    if spec['kind'] == 'numeric':
+        mask = None if column.valid is None else ~column.valid
+        return pa.array(column.values, mask=mask), spec
+    if spec['kind'] == 'enum':
+        codes = column.codes
+        indices = pa.array(np.where(codes < 0, 0, codes), mask=codes < 0)
+        return pa.DictionaryArray.from_arrays(indices, pa.array(spec['values'], pa.string())), spec
+    if spec['kind'] == 'dictionary':
+        return pa.DictionaryArray.from_arrays(pa.array(column.codes),
+                                              pa.array(column.dictionary.tolist(), pa.string())), spec
+    if spec['kind'] == 'prefixed':
+        return pa.array(column.values), spec
+    return pa.array(column.values.tolist(), pa.string()), spec
+
+
+def _arrow_batch(pa: Any, columns: Dict[str, Column]) -> Any:
+    arrays, schema_fields = [], []
+    for name, column in columns.items():
+        array, spec = _arrow_array(pa, column)
+        arrays.append(array)
+        schema_fields.append(pa.field(name, array.type, metadata={'spec': json.dumps(spec)}))
+    return pa.RecordBatch.from_arrays(arrays, schema=pa.schema(schema_fields))
+
+
+def _write_arrow_table(output_path: Path, batches: Iterable[Dict[str, Column]]) -> Path:
+    """Writes one IPC file; each dict of columns becomes one record batch"""
+    pa = _pyarrow()
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    writer = None
+    try:
+        for columns in batches:
+            batch = _arrow_batch(pa, columns)
+            if writer is None:
+                writer = pa.ipc.new_file(str(output_path), batch.schema)
+            writer.write_batch(batch)
+    finally:
+        if writer is not None:
+            writer.close()
+    return output_path
+
+
+def _read_arrow_table(input_path: Path, record_type: Optional[type]) -> Dict[str, Column]:
+    """
+    Maps an IPC file and wraps its buffers as Columns
+
+    Single-batch files without nulls are zero-copy; files written in several
+    batches are concatenated on read (use the npy layout for streamed data
+    that must open instantly).
+    """
+    pa = _pyarrow()
+    if pa is None:
+        raise ValueError(f"Reading {input_path} requires pyarrow (pip install pyarrow)")
+
+    table = pa.ipc.open_file(pa.memory_map(str(input_path), 'r')).read_all()
+    if any(table.column(i).num_chunks > 1 for i in range(table.num_columns)):
+        table = table.combine_chunks()
+
+    enum_types = _enum_types(record_type)
+    columns = {}
+    for field in table.schema:
+        spec = json.loads(field.metadata[b'spec'])
+        chunked = table.column(field.name)
+        array = chunked.chunk(0) if chunked.num_chunks else pa.array([], field.type)
+
+        if spec['kind'] in ('enum', 'dictionary'):
+            codes = array.indices.fill_null(-1).to_numpy(zero_copy_only=False)
+            dictionary = np.asarray(array.dictionary.to_pylist(), dtype=str)
+            arrays = {'': codes, '.dictionary': dictionary}
+        elif spec['kind'] == 'fixed':
+            arrays = {'': np.asarray(array.to_pylist(), dtype=str)}
+        else:
+            arrays = {'': array.fill_null(0).to_numpy(zero_copy_only=False)}
+            if array.null_count:
+                arrays['.valid'] = ~array.is_null().to_numpy(zero_copy_only=False)
+        columns[field.name] = _build_column(spec, arrays, enum_types.get(field.name))
+    return columns
+
+
+def _table_path(root: Path, name: str, fmt: str) -> Path:
+    return root / (f"{name}.arrow" if fmt == FORMAT_ARROW else name)
+
+
+def write_table(output_path: Path, columns: Dict[str, Column], fmt: str) -> Path:
+    """Writes one table in the given format (file for arrow, directory for npy)"""
+    if fmt == FORMAT_ARROW:
+        return _write_arrow_table(output_path, [columns])
+    return _write_npy_table(output_path, columns)
+
+
+def read_table(input_path: Path, fmt: str, record_type: Optional[type] = None) -> Dict[str, Column]:
+    """Memory-maps one table written by write_table"""
+    if fmt == FORMAT_ARROW:
+        return _read_arrow_table(input_path, record_type)
+    return _read_npy_table(input_path, record_type)
+
+
+def _write_manifest(output_dir: Path, manifest: Dict[str, Any]) -> None:
+    manifest = {'version': MANIFEST_VERSION, **manifest}
+    with open(output_dir / DATASET_MANIFEST, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+
+def read_manifest(input_dir: Path, kind: str) -> Dict[str, Any]:
+    """
+    Loads dataset.json and checks the dataset kind
+
+    Raises:
+        ValueError: if the directory holds a different kind of dataset
+    """
+    with open(Path(input_dir) / DATASET_MANIFEST, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('kind') != kind:
+        raise ValueError(f"{input_dir} holds a {manifest.get('kind')!r} dataset, expected {kind!r}")
+    return manifest
+
+
+# ============================================================================
+# DASHBOARD DATASETS
+# ============================================================================
+
+def write_dashboard(data: CompleteDashboardData, output_dir: Path, fmt: Optional[str] = None) -> Path:
+    """
+    Writes every dashboard section as a binary columnar table
+
+    Single-object sections (plan info, financial KPIs) are stored as
+    one-row tables.
+
+    Args:
+        data: Dashboard data (list or ColumnarTable sections)
+        output_dir: Dataset directory
+        fmt: "arrow" or "npy"; defaults to arrow when pyarrow is installed
+
+    Returns:
+        Path to the dataset manifest
+    """
+    fmt = _resolve_format(fmt)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    tables = {}
+    for section in fields(data):
+        value = getattr(data, section.name)
+        if isinstance(value, ColumnarTable):
+            table = value
+        else:
+            record_type = section_record_type(section.type) or section.type
+            table = ColumnarTable.from_records(record_type, [value] if is_dataclass(value) else value)
+
+        path = write_table(_table_path(output_dir, section.name, fmt), table.columns, fmt)
+        tables[section.name] = {'path': path.name, 'rows': len(table),
+                                'record_type': table.record_type.__name__}
+
+    _write_manifest(output_dir, {'kind': 'dashboard', 'format': fmt, 'tables': tables})
+    return output_dir / DATASET_MANIFEST
+
+
+def read_dashboard(input_dir: Path) -> CompleteDashboardData:
+    """
+    Opens a dataset written by write_dashboard
+
+    List sections come back as memory-mapped ColumnarTables; rows are only
+    materialized when accessed.
+    """
+    input_dir = Path(input_dir)
+    manifest = read_manifest(input_dir, 'dashboard')
+
+    sections = {}
+    for section in fields(CompleteDashboardData):
+        record_type = section_record_type(section.type)
+        entry = manifest['tables'][section.name]
+        columns = read_table(input_dir / entry['path'], manifest['format'], record_type or section.type)
+        table = ColumnarTable(record_type or section.type, columns)
+        sections[section.name] = table if record_type is not None else table[0]
+
+    return CompleteDashboardData(**sections)
+
+
+# ============================================================================
+# CLAIM LINE DATASETS
+# ============================================================================
+
+def _claim_line_columns(claim_lines: ClaimLines) -> Dict[str, Column]:
+    return {name: NumericColumn(getattr(claim_lines, name)) for name in CLAIM_LINE_FIELDS}
+
+
+def write_claim_lines(chunks: Iterable[ClaimLines], output_dir: Path, line_count: int,
+                      fmt: Optional[str] = None) -> Path:
+    """
+    Streams claim line chunks into a columnar dataset in constant memory
+
+    For the npy layout each column is preallocated as a memory-mapped .npy
+    file of line_count rows and filled chunk by chunk; for arrow each chunk
+    becomes one record batch.
+
+    Args:
+        chunks: ClaimLines chunks sharing one roster (e.g. ClaimsSimulator.iter_chunks)
+        output_dir: Dataset directory
+        line_count: Total claim lines across all chunks
+        fmt: "arrow" or "npy"; defaults to arrow when pyarrow is installed
+
+    Returns:
+        Path to the dataset manifest
+
+    Raises:
+        ValueError: if the chunks do not add up to line_count
+    """
+    fmt = _resolve_format(fmt)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    first: Optional[ClaimLines] = None
+    written = 0
+
+    def tracked() -> Iterable[ClaimLines]:
+        nonlocal first, written
+        for chunk in chunks:
+            if first is None:
+                first = chunk
+            written += len(chunk)
+            if written > line_count:
+                raise ValueError(f"Claim line chunks exceed line_count ({line_count:,})")
+            yield chunk
+
+    lines_path = _table_path(output_dir, 'lines', fmt)
+    if fmt == FORMAT_ARROW:
+        _write_arrow_table(lines_path, (_claim_line_columns(chunk) for chunk in tracked()))
+    else:
+        lines_path.mkdir(parents=True, exist_ok=True)
+        mapped = {}
+        for chunk in tracked():
+            if not mapped:
+                mapped = {
+                    name: np.lib.format.open_memmap(lines_path / f"{name}.npy", mode='w+',
+                                                    dtype=getattr(chunk, name).dtype, shape=(line_count,))
+                    for name in CLAIM_LINE_FIELDS
+                }
+            for name, array in mapped.items():
+                array[written - len(chunk):written] = getattr(chunk, name)
+        for array in mapped.values():
+            array.flush()
+        schema = {
+            'version': MANIFEST_VERSION,
+            'rows': line_count,
+            'columns': [
+                {'name': name, 'kind': 'numeric', 'files': {'': f"{name}.npy"}, 'dtype': str(array.dtype)}
+                for name, array in mapped.items()
+            ],
+        }
+        with open(lines_path / TABLE_SCHEMA, 'w', encoding='utf-8') as f:
+            json.dump(schema, f, indent=2)
+
+    if first is None:
+        raise ValueError("No claim line chunks to write")
+    if written != line_count:
+        raise ValueError(f"Expected {line_count:,} claim lines, received {written:,}")
+
+    roster_path = write_table(_table_path(output_dir, 'roster', fmt),
+                              {'member_ids': NumericColumn(first.member_ids)}, fmt)
+    _write_manifest(output_dir, {
+        'kind': 'claim_lines',
+        'format': fmt,
+        'rows': line_count,
+        'plan_start': str(first.plan_start),
+        'member_enrollment': [int(v) for v in first.member_enrollment],
+        'diagnosis_codes': len(first.catalog),
+        'tables': {'lines': lines_path.name, 'roster': roster_path.name},
+    })
+    return output_dir / DATASET_MANIFEST
+
+
+def open_claim_lines(input_dir: Path, catalog: Optional[ICD10Catalog] = None) -> ClaimLines:
+    """
+    Memory-maps a claim line dataset
+
+    With the npy layout no column data is read until it is used, so
+    aggregations that need only a few columns touch only those files.
+
+    Args:
+        input_dir: Dataset directory
+        catalog: ICD10Catalog the dataset was simulated with; None for DEFAULT_CATALOG
+
+    Raises:
+        ValueError: if catalog does not match the dataset's diagnosis code count
+    """
+    input_dir = Path(input_dir)
+    manifest = read_manifest(input_dir, 'claim_lines')
+    catalog = DEFAULT_CATALOG if catalog is None else catalog
+    expected = manifest.get('diagnosis_codes', len(DEFAULT_CATALOG))
+    if expected != len(catalog):
+        raise ValueError(f"Dataset was written with a {expected:,}-code ICD-10 catalog, "
+                         f"not {len(catalog):,} codes")
+    fmt = manifest['format']
+    lines = read_table(input_dir / manifest['tables']['lines'], fmt)
+    roster = read_table(input_dir / manifest['tables']['roster'], fmt)
+
+    return ClaimLines(
+        **{name: lines[name].values for name in CLAIM_LINE_FIELDS},
+        member_ids=roster['member_ids'].values,
+        plan_start=np.datetime64(manifest['plan_start'], 'D'),
+        member_enrollment=np.array(manifest['member_enrollment'], dtype=np.int64),
+        catalog=catalog
+    )
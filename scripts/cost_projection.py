@@ -0,0 +1,209 @@
+"""
+Monte Carlo Cost Projection
+===========================
+
+Projects next-year plan payment for every member by simulating many
+outcomes at once, and reports the probability of each PredictedCostRange.
+
+Each trial draws:
+- a lognormal persistence outcome: last year's cost, pulled part of the way
+  toward the cohort reference cost (regression to the mean) and trended
+- a rare Pareto catastrophic shock (new cancer, transplant, NICU stay)
+
+Outcomes are computed as (members x trials) float32 blocks of at most
+CHUNK_CELLS cells, so memory is bounded no matter how large the cohort or the
+trial count; 100k members x 10k trials is one billion outcomes. Within a
+block the lognormal draws are common random numbers: one standard normal per
+trial, broadcast against every member's own mean. Each member's outcome
+distribution is unchanged, the normal draws (the slowest step) cost O(trials)
+per block instead of O(members x trials), and members are ranked against the
+same scenarios. Shocks are drawn independently per cell.
+
+Usage:
+    python scripts/cost_projection.py --members 100000 --trials 10000 --seed 7
+
+    projection = project_cost_ranges(member_totals, trials=10_000, rng=RNGContext(7))
+    projection.probabilities          # [member, PREDICTED_COST_RANGES]
+    projection.most_likely()          # PredictedCostRange per member
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from data_template_generator import PredictedCostRange
+from rng_context import RNGContext, resolve_rng
+
+
+# Buckets in ascending cost order; PREDICTED_COST_EDGES are the lower bounds after the first
+PREDICTED_COST_RANGES: List[PredictedCostRange] = [
+    PredictedCostRange.UNDER_50K,
+    PredictedCostRange.RANGE_50K_100K,
+    PredictedCostRange.RANGE_100K_250K,
+    PredictedCostRange.OVER_250K,
+]
+PREDICTED_COST_EDGES = np.array([50_000.0, 100_000.0, 250_000.0])
+
+# Outcomes simulated per member by default
+DEFAULT_TRIALS = 10_000
+
+# Member x trial cells per block (16 MB per float32 temporary)
+CHUNK_CELLS = 1 << 22
+
+# Current totals below this are treated as this (log of zero cost is undefined)
+MIN_CURRENT_COST = 100.0
+
+
+@dataclass(frozen=True)
+class ProjectionModel:
+    """
+    Parameters of the next-year cost distribution
+
+    Mean projected cost before shocks is
+    trend * reference * (current / reference) ** persistence, with lognormal
+    spread sigma; with probability shock_probability a Pareto
+    shock (minimum shock_minimum, tail index shock_shape) is added.
+    """
+    trend: float = 1.07                 # Annual medical + rx cost trend
+    persistence: float = 0.9            # 1 = costs repeat exactly, 0 = everyone reverts to the reference
+    sigma: float = 0.7                  # Log-space spread of the persistent outcome
+    shock_probability: float = 0.02     # Annual chance of a new catastrophic claim
+    shock_minimum: float = 40_000.0     # Smallest catastrophic shock
+    shock_shape: float = 1.6            # Pareto tail index; lower is heavier
+
+    def __post_init__(self):
+        if self.trend <= 0 or self.sigma < 0 or self.shock_minimum <= 0 or self.shock_shape <= 0:
+            raise ValueError("trend, shock_minimum and shock_shape must be positive and sigma non-negative")
+        if not 0 <= self.persistence <= 1 or not 0 <= self.shock_probability < 1:
+            raise ValueError("persistence must be in [0, 1] and shock_probability in [0, 1)")
+
+
+DEFAULT_MODEL = ProjectionModel()
+
+
+@dataclass
+class CostRangeProjection:
+    """Per-member Monte Carlo results"""
+    probabilities: np.ndarray       # float64 [member, bucket], buckets as PREDICTED_COST_RANGES
+    expected_cost: np.ndarray       # float64 mean projected cost per member
+    trials: int
+
+    def __len__(self) -> int:
+        return len(self.expected_cost)
+
+    def most_likely(self, min_probability: float = 0.0) -> List[Optional[PredictedCostRange]]:
+        """
+        Highest-probability bucket per member
+
+        Args:
+            min_probability: Members whose top bucket is less likely than this get None
+        """
+        best = self.probabilities.argmax(axis=1)
+        confident = self.probabilities[np.arange(len(best)), best] >= min_probability
+        return [PREDICTED_COST_RANGES[b] if ok else None for b, ok in zip(best.tolist(), confident.tolist())]
+
+
+def _project_block(log_mean: np.ndarray, trials: int, model: ProjectionModel,
+                   generator: np.random.Generator) -> np.ndarray:
+    """Projected costs for a block of members: float32 [members, trials]"""
+    scenarios = generator.standard_normal(trials, dtype=np.float32) * np.float32(model.sigma)
+    # Shifted by -sigma^2 / 2 so the lognormal's mean, not its median, is exp(log_mean)
+    costs = (log_mean - model.sigma ** 2 / 2).astype(np.float32)[:, None] + scenarios[None, :]
+    np.exp(costs, out=costs)
+
+    if model.shock_probability > 0:
+        # Shocks are rare, so draw their count first and place only those
+        shocks = generator.binomial(costs.size, model.shock_probability)
+        cells = generator.integers(0, costs.size, shocks)
+        # Inverse-CDF Pareto from uniforms in (0, 1]
+        uniform = 1.0 - generator.random(shocks)
+        np.add.at(costs.reshape(-1), cells,
+                  (model.shock_minimum * uniform ** (-1.0 / model.shock_shape)).astype(np.float32))
+    return costs
+
+
+def project_cost_ranges(current_totals: np.ndarray, trials: int = DEFAULT_TRIALS,
+                        rng: Optional[RNGContext] = None, model: ProjectionModel = DEFAULT_MODEL,
+                        reference_cost: Optional[float] = None,
+                        chunk_cells: int = CHUNK_CELLS) -> CostRangeProjection:
+    """
+    Simulates next-year cost for each member and buckets the outcomes
+
+    Args:
+        current_totals: Current annual plan payment per member
+        trials: Outcomes simulated per member
+        rng: Random stream; the same seed and chunk_cells give identical results
+        model: Distribution parameters
+        reference_cost: Cost that projections regress toward; defaults to the
+                        mean of the positive current totals
+        chunk_cells: Upper bound on members x trials per block (at least one member per block)
+
+    Returns:
+        CostRangeProjection with one row per member
+
+    Raises:
+        ValueError: if trials or chunk_cells is not positive
+    """
+    if trials <= 0 or chunk_cells <= 0:
+        raise ValueError(f"trials and chunk_cells must be positive, got {trials} and {chunk_cells}")
+
+    totals = np.asarray(current_totals, dtype=np.float64)
+    if reference_cost is None:
+        positive = totals[totals > 0]
+        reference_cost = float(positive.mean()) if len(positive) else MIN_CURRENT_COST
+    reference_cost = max(reference_cost, MIN_CURRENT_COST)
+
+    log_current = np.log(np.maximum(totals, MIN_CURRENT_COST))
+    log_mean = (np.log(model.trend * reference_cost)
+                  + model.persistence * (log_current - np.log(reference_cost)))
+
+    generator = resolve_rng(rng).generator
+    edges = PREDICTED_COST_EDGES.astype(np.float32)
+    at_least = np.zeros((len(totals), len(edges)), dtype=np.int64)
+    expected = np.zeros(len(totals), dtype=np.float64)
+
+    block = max(1, chunk_cells // trials)
+    for start in range(0, len(totals), block):
+        stop = min(start + block, len(totals))
+        costs = _project_block(log_mean[start:stop], trials, model, generator)
+        # Counting outcomes at or above each edge avoids a per-cell bucket index
+        for e, edge in enumerate(edges):
+            at_least[start:stop, e] = np.count_nonzero(costs >= edge, axis=1)
+        expected[start:stop] = costs.mean(axis=1, dtype=np.float64)
+
+    counts = np.empty((len(totals), len(PREDICTED_COST_RANGES)), dtype=np.int64)
+    counts[:, 0] = trials - at_least[:, 0]
+    counts[:, 1:-1] = at_least[:, :-1] - at_least[:, 1:]
+    counts[:, -1] = at_least[:, -1]
+    return CostRangeProjection(counts / trials, expected, trials)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Monte Carlo projection of PredictedCostRange probabilities")
+    parser.add_argument("--members", type=int, default=100_000, help="Simulated cohort size")
+    parser.add_argument("--trials", type=int, default=DEFAULT_TRIALS, help="Outcomes per member")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for reproducible output")
+    args = parser.parse_args()
+
+    rng = RNGContext(args.seed)
+    # Current costs for a synthetic cohort: lognormal body with a Pareto tail
+    cohort = rng.stream("cohort").generator
+    current = cohort.lognormal(np.log(2_500), 1.4, args.members) * (cohort.pareto(2.5, args.members) + 1)
+
+    started = time.perf_counter()
+    projection = project_cost_ranges(current, args.trials, rng.stream("projection"))
+    seconds = time.perf_counter() - started
+
+    cells = args.members * args.trials
+    print(f"✓ Projected {args.members:,} members x {args.trials:,} trials in {seconds:.2f}s "
+          f"({cells / seconds:,.0f} outcomes/sec)")
+    shares = projection.probabilities.mean(axis=0)
+    likely = projection.most_likely()
+    for b, bucket in enumerate(PREDICTED_COST_RANGES):
+        print(f"  {bucket.value:>18}: {shares[b]:7.2%} of outcomes, "
+              f"most likely for {sum(1 for x in likely if x is bucket):,} members")
+    sys.exit(0)
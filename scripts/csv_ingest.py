@@ -0,0 +1,341 @@
+"""
+Streaming CSV Ingest and Pre-flight Validation
+==============================================
+
+Reads the CSV templates (and the per-section files written by
+write_dashboard_csvs) back into schema objects without loading whole files
+into memory.
+
+- The '#' comment preamble emitted by CSVTemplateGenerator is skipped
+- Rows are parsed in chunks into ColumnarTables (or dataclass lists)
+- Every chunk is validated as it arrives with the rules in validation.py
+
+Pre-flight client files locally before uploading them:
+    python scripts/csv_ingest.py high_cost_claimants.csv monthly_costs.csv
+"""
+
+from dataclasses import dataclass, field, fields
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from columnar import (
+    ColumnarTable,
+    Column,
+    EnumColumn,
+    NumericColumn,
+    encode_strings,
+    section_record_type,
+    smallest_code_dtype,
+    unwrap_optional,
+)
+from csv_stream import DEFAULT_CHUNK_SIZE, UPLOAD_MAX_BYTES, UPLOAD_MAX_FILES, CSVStreamReader
+from data_template_generator import TEMPLATE_REGISTRY, CompleteDashboardData
+from validation import IncrementalValidator, RuleViolation
+
+
+# Parse errors kept in a report (the total is always counted)
+MAX_PARSE_ERRORS = 100
+
+# CSVTemplateGenerator file names that differ from their dashboard section
+TEMPLATE_SECTIONS = {
+    spec.name: spec.section for spec in TEMPLATE_REGISTRY.values() if spec.name != spec.section
+}
+
+
+@dataclass
+class TemplateSchema:
+    """Dashboard section and record type a CSV file maps to"""
+    section: str                    # CompleteDashboardData field name
+    record_type: type
+
+    @property
+    def columns(self) -> List[str]:
+        return [f.name for f in fields(self.record_type)]
+
+    @property
+    def required_columns(self) -> List[str]:
+        return [f.name for f in fields(self.record_type) if not unwrap_optional(f.type)[1]]
+
+
+@dataclass
+class ParseError:
+    """A cell or row that could not be parsed"""
+    row: int                        # Data row index (0 = first row after the header)
+    column: str
+    message: str
+
+
+def dashboard_schemas() -> Dict[str, TemplateSchema]:
+    """Schema for every CompleteDashboardData section, keyed by section name"""
+    return {
+        f.name: TemplateSchema(f.name, section_record_type(f.type) or f.type)
+        for f in fields(CompleteDashboardData)
+    }
+
+
+def resolve_schema(template: Optional[str], header: Sequence[str]) -> TemplateSchema:
+    """
+    Finds the schema for a file from an explicit template name or its header
+
+    Args:
+        template: Template or section name (e.g. "high_cost_claimants"); None to detect
+        header: Column names read from the file
+
+    Raises:
+        ValueError: if the template is unknown or no schema matches the header
+    """
+    schemas = dashboard_schemas()
+    if template is not None:
+        section = TEMPLATE_SECTIONS.get(template, template)
+        if section not in schemas:
+            raise ValueError(f"Unknown template: {template}")
+        return schemas[section]
+
+    present = set(header)
+    for schema in schemas.values():
+        if set(schema.required_columns) <= present <= set(schema.columns):
+            return schema
+    raise ValueError(f"Header does not match any template: {', '.join(header)}")
+
+
+# ============================================================================
+# CHUNK PARSING
+# ============================================================================
+
+def _parse_numeric(values: Sequence[str], dtype: type, optional: bool, column: str,
+                   row_offset: int, errors: List[ParseError]) -> NumericColumn:
+    """Vectorized numeric parse with a per-cell fallback for bad values"""
+    if not optional:
+        try:
+            return NumericColumn(np.array(values, dtype=dtype))
+        except ValueError:
+            pass
+
+    parsed = np.zeros(len(values), dtype=np.float64)
+    valid = np.ones(len(values), dtype=bool)
+    for i, value in enumerate(values):
+        text = value.strip()
+        if not text:
+            valid[i] = False
+            if not optional:
+                parsed[i] = np.nan
+                errors.append(ParseError(row_offset + i, column, "missing value"))
+            continue
+        try:
+            parsed[i] = float(text)
+        except ValueError:
+            parsed[i] = np.nan
+            valid[i] = False
+            errors.append(ParseError(row_offset + i, column, f"not a number: {value!r}"))
+
+    if dtype is np.int64:
+        # NaN cannot be stored as int64; keep floats so rules still flag the row
+        if np.isnan(parsed).any():
+            return NumericColumn(parsed, valid if optional else None)
+        parsed = parsed.astype(np.int64)
+    return NumericColumn(parsed, valid if optional else None)
+
+
+def _parse_enum(values: Sequence[str], enum_type: type, optional: bool, column: str,
+                row_offset: int, errors: List[ParseError]) -> EnumColumn:
+    """Maps enum values to codes once per distinct string, not once per row"""
+    members = list(enum_type)
+    lookup = {member.value: code for code, member in enumerate(members)}
+    code_dtype = smallest_code_dtype(len(members))
+    if not len(values):
+        return EnumColumn(np.empty(0, dtype=code_dtype), enum_type)
+
+    distinct, inverse = np.unique(np.array(values, dtype=str), return_inverse=True)
+    distinct_codes = np.array([lookup.get(v.strip(), -1) for v in distinct], dtype=code_dtype)
+    codes = distinct_codes[inverse]
+
+    for bad in np.flatnonzero(distinct_codes < 0):
+        value = str(distinct[bad])
+        if value.strip() or not optional:
+            for i in np.flatnonzero(inverse == bad):
+                errors.append(ParseError(row_offset + int(i), column, f"not a valid {enum_type.__name__}: {value!r}"))
+    return EnumColumn(codes, enum_type)
+
+
+def parse_chunk(schema: TemplateSchema, header: Sequence[str], rows: List[List[str]],
+                row_offset: int = 0) -> Tuple[ColumnarTable, List[ParseError]]:
+    """
+    Converts a chunk of string rows into a ColumnarTable
+
+    Malformed rows are padded or truncated to the header width so row indices
+    stay aligned with the file, and reported as parse errors.
+
+    Args:
+        schema: Target section schema
+        header: File column names
+        rows: Raw CSV rows
+        row_offset: Index of the chunk's first row within the file
+
+    Returns:
+        Tuple of (table, parse_errors)
+    """
+    errors: List[ParseError] = []
+    width = len(header)
+    for i, row in enumerate(rows):
+        if len(row) != width:
+            errors.append(ParseError(row_offset + i, "*", f"expected {width} columns, got {len(row)}"))
+            rows[i] = (row + [''] * width)[:width]
+
+    raw = dict(zip(header, zip(*rows))) if rows else {name: () for name in header}
+
+    columns: Dict[str, Column] = {}
+    for f in fields(schema.record_type):
+        inner, optional = unwrap_optional(f.type)
+        values = raw.get(f.name, ('',) * len(rows))
+
+        if isinstance(inner, type) and issubclass(inner, Enum):
+            columns[f.name] = _parse_enum(values, inner, optional, f.name, row_offset, errors)
+        elif inner in (int, float):
+            dtype = np.int64 if inner is int else np.float64
+            columns[f.name] = _parse_numeric(values, dtype, optional, f.name, row_offset, errors)
+        else:
+            columns[f.name] = encode_strings(list(values))
+
+    return ColumnarTable(schema.record_type, columns), errors
+
+
+# ============================================================================
+# STREAMING INGEST
+# ============================================================================
+
+def iter_tables(input_path: Path, template: Optional[str] = None,
+                chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[ColumnarTable]:
+    """
+    Streams a CSV file as ColumnarTable chunks
+
+    Raises:
+        ValueError: on the first chunk containing a parse error
+    """
+    with CSVStreamReader(input_path, chunk_size) as reader:
+        schema = resolve_schema(template, reader.header)
+        offset = 0
+        for rows in reader:
+            table, errors = parse_chunk(schema, reader.header, rows, offset)
+            if errors:
+                first = errors[0]
+                raise ValueError(f"{input_path}: row {first.row}, {first.column}: {first.message}")
+            offset += len(rows)
+            yield table
+
+
+def iter_records(input_path: Path, template: Optional[str] = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[Any]]:
+    """Streams a CSV file as lists of schema dataclasses"""
+    for table in iter_tables(input_path, template, chunk_size):
+        yield table.to_records()
+
+
+@dataclass
+class PreflightReport:
+    """Outcome of streaming a client file through parsing and validation"""
+    input_path: Path
+    section: str
+    file_bytes: int
+    rows: int
+    violations: List[RuleViolation]
+    parse_errors: List[ParseError] = field(default_factory=list)
+    parse_error_count: int = 0
+    seconds: float = 0.0
+
+    @property
+    def within_upload_limit(self) -> bool:
+        return self.file_bytes <= UPLOAD_MAX_BYTES
+
+    @property
+    def is_valid(self) -> bool:
+        return not self.violations and self.parse_error_count == 0 and self.within_upload_limit
+
+    def messages(self, max_rows: int = 5) -> List[str]:
+        messages = []
+        if not self.within_upload_limit:
+            messages.append(f"file size ({self.file_bytes / 1024 / 1024:.2f}MB) exceeds "
+                            f"{UPLOAD_MAX_BYTES // 1024 // 1024}MB upload limit")
+        for error in self.parse_errors:
+            messages.append(f"row {error.row}, {error.column}: {error.message}")
+        if self.parse_error_count > len(self.parse_errors):
+            messages.append(f"… {self.parse_error_count - len(self.parse_errors):,} more parse errors")
+        messages.extend(v.message(max_rows) for v in self.violations)
+        return messages
+
+
+def preflight_csv(input_path: Path, template: Optional[str] = None,
+                  chunk_size: int = DEFAULT_CHUNK_SIZE) -> PreflightReport:
+    """
+    Parses and validates a CSV file chunk by chunk
+
+    Memory is bounded by one chunk plus the offending row indices, so files
+    far larger than the upload limit can be checked.
+
+    Args:
+        input_path: CSV file to check
+        template: Template or section name; detected from the header if None
+        chunk_size: Rows parsed and validated per chunk
+
+    Returns:
+        PreflightReport with parse errors and rule violations
+    """
+    input_path = Path(input_path)
+    started = time.perf_counter()
+
+    with CSVStreamReader(input_path, chunk_size) as reader:
+        schema = resolve_schema(template, reader.header)
+        missing = [c for c in schema.required_columns if c not in reader.header]
+        if missing:
+            raise ValueError(f"{input_path}: missing required columns: {', '.join(missing)}")
+
+        validator = IncrementalValidator(schema.section)
+        parse_errors: List[ParseError] = []
+        parse_error_count = 0
+
+        for rows in reader:
+            table, errors = parse_chunk(schema, reader.header, rows, validator.rows_seen)
+            parse_error_count += len(errors)
+            parse_errors.extend(errors[:MAX_PARSE_ERRORS - len(parse_errors)])
+            validator.feed(table)
+
+    return PreflightReport(
+        input_path=input_path,
+        section=schema.section,
+        file_bytes=input_path.stat().st_size,
+        rows=validator.rows_seen,
+        violations=validator.finish(),
+        parse_errors=parse_errors,
+        parse_error_count=parse_error_count,
+        seconds=time.perf_counter() - started
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-flight CSV files before uploading them")
+    parser.add_argument("paths", nargs="+", type=Path, help="CSV files to check")
+    parser.add_argument("--template", default=None, help="Template name (detected from the header if omitted)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per chunk")
+    args = parser.parse_args()
+
+    all_valid = True
+    for path in args.paths:
+        report = preflight_csv(path, args.template, args.chunk_size)
+        if report.is_valid:
+            print(f"✓ {path}: {report.rows:,} rows of {report.section} "
+                  f"({report.file_bytes / 1024 / 1024:.2f}MB, {report.seconds:.2f}s)")
+        else:
+            all_valid = False
+            print(f"✗ {path}: {report.rows:,} rows of {report.section}")
+            for message in report.messages():
+                print(f"  - {message}")
+
+    if len(args.paths) > UPLOAD_MAX_FILES:
+        print(f"Note: the upload route accepts at most {UPLOAD_MAX_FILES} files per request")
+
+    sys.exit(0 if all_valid else 1)
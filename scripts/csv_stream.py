@@ -0,0 +1,548 @@
+"""
+Streaming CSV Writer
+====================
+
+Generator-based pipeline for writing large mock datasets in constant memory.
+
+Rows are produced and written in fixed-size chunks, so a 50M-row claims file
+never exists as a single Python list. Progress (rows and rows/sec) is reported
+while the file is being written.
+
+Output can be compressed while it streams (gzip, or zstd/lz4 when
+installed); see compression.py. The reader detects compressed input itself.
+
+write_csv_shards splits one stream into header-led shard files that each
+fit the upload route's size limit, with a manifest of row ranges and
+checksums.
+
+Uses only the Python standard library; NumPy-backed producers such as
+claims_simulator.write_claim_lines_csv feed chunks into write_csv_stream.
+"""
+
+from dataclasses import asdict, dataclass, field, fields, is_dataclass
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, TextIO
+import csv
+import hashlib
+import json
+import sys
+import time
+
+from compression import compressed_path, open_text_input, open_text_output
+from profiling import span
+
+
+# Rows buffered per chunk; bounds memory use for any output size
+DEFAULT_CHUNK_SIZE = 100_000
+
+# Minimum seconds between progress lines
+PROGRESS_INTERVAL_SECONDS = 5.0
+
+# Limits enforced by app/api/upload/route.ts
+UPLOAD_MAX_BYTES = 50 * 1024 * 1024
+UPLOAD_MAX_FILES = 5
+
+SHARD_MANIFEST_VERSION = 1
+
+
+@dataclass
+class StreamStats:
+    """Summary of a completed streaming write"""
+    output_path: Path
+    rows: int                       # Data rows written (excludes header/comments)
+    seconds: float                  # Wall time spent producing and writing rows
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+
+class ProgressReporter:
+    """
+    Prints throughput while a stream is being written
+
+    A line is printed at most once per interval, so reporting cost stays
+    negligible even with small chunks. Pass stream=None to silence output
+    (e.g. inside worker processes).
+    """
+
+    def __init__(self, label: str, interval: float = PROGRESS_INTERVAL_SECONDS,
+                 stream: Optional[TextIO] = sys.stdout):
+        self.label = label
+        self.interval = interval
+        self.stream = stream
+        self.started = time.perf_counter()
+        self._last_report = self.started
+
+    def update(self, rows: int) -> None:
+        """Reports progress if the interval has elapsed since the last line"""
+        now = time.perf_counter()
+        if self.stream is None or now - self._last_report < self.interval:
+            return
+        self._last_report = now
+        rate = rows / (now - self.started) if now > self.started else 0.0
+        print(f"  … {self.label}: {rows:,} rows ({rate:,.0f} rows/sec)", file=self.stream)
+
+    def finish(self, stats: StreamStats) -> None:
+        """Prints the final summary line"""
+        if self.stream is None:
+            return
+        print(f"✓ Wrote {stats.rows:,} rows to {stats.output_path} "
+              f"({stats.rows_per_second:,.0f} rows/sec)", file=self.stream)
+
+
+def chunked(rows: Iterable[Sequence[Any]], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[Sequence[Any]]]:
+    """
+    Groups any row iterable into lists of at most chunk_size rows
+
+    Args:
+        rows: Iterable of rows (lazily consumed)
+        chunk_size: Maximum rows per chunk
+
+    Yields:
+        Lists of rows; the last chunk may be smaller
+    """
+    if chunk_size <= 0:
+        raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def dataclass_rows(items: Iterable[Any], columns: Optional[List[str]] = None) -> Iterator[List[Any]]:
+    """
+    Yields CSV rows from dataclass instances
+
+    Args:
+        items: Iterable of dataclass instances (e.g. MockDataGenerator output)
+        columns: Field names to emit; defaults to all fields of the first item
+
+    Yields:
+        One list per item; enums are written as their display values and
+        None as an empty cell
+    """
+    for item in items:
+        if columns is None:
+            if not is_dataclass(item):
+                raise TypeError(f"Expected a dataclass instance, got {type(item).__name__}")
+            columns = [f.name for f in fields(item)]
+
+        row = []
+        for name in columns:
+            value = getattr(item, name)
+            if isinstance(value, Enum):
+                value = value.value
+            elif value is None:
+                value = ''
+            row.append(value)
+        yield row
+
+
+def write_csv_stream(output_path: Path, header: Sequence[str],
+                     row_chunks: Iterable[Sequence[Sequence[Any]]],
+                     comments: Optional[List[str]] = None,
+                     progress: Optional[ProgressReporter] = None,
+                     compression: Optional[str] = None,
+                     level: Optional[int] = None) -> StreamStats:
+    """
+    Writes chunks of rows to a CSV file as they are produced
+
+    Only one chunk is held in memory at a time; the producer generates the
+    next chunk after the previous one has been written. Compressed output
+    is compressed as it is written; no uncompressed copy touches the disk.
+
+    Args:
+        output_path: Destination CSV path
+        header: Column names
+        row_chunks: Iterable of row lists (e.g. from chunked or a generator)
+        comments: Optional '#' preamble lines, written like the CSV templates
+        progress: Reporter for throughput lines; defaults to stdout reporting
+        compression: "gzip", "zstd", "lz4" or "none"; None infers it from the
+                     suffix of output_path (e.g. ".csv.gz")
+        level: Compression level; None for the codec default
+
+    Returns:
+        StreamStats with row count and throughput
+    """
+    output_path = Path(output_path)
+    if progress is None:
+        progress = ProgressReporter(output_path.name)
+
+    rows = 0
+    started = time.perf_counter()
+
+    with span(f"write:{output_path.name}", "writer") as current, \
+            open_text_output(output_path, compression, level) as f:
+        writer = csv.writer(f)
+
+        if comments:
+            for comment in comments:
+                writer.writerow([f"# {comment}"])
+            writer.writerow([])
+
+        writer.writerow(header)
+
+        for chunk in row_chunks:
+            writer.writerows(chunk)
+            rows += len(chunk)
+            progress.update(rows)
+        current.rows = rows
+
+    stats = StreamStats(output_path, rows, time.perf_counter() - started)
+    progress.finish(stats)
+    return stats
+
+
+def write_dataclass_csv(output_path: Path, items: Iterable[Any], columns: List[str],
+                        chunk_size: int = DEFAULT_CHUNK_SIZE,
+                        progress: Optional[ProgressReporter] = None,
+                        compression: Optional[str] = None,
+                        level: Optional[int] = None) -> StreamStats:
+    """
+    Streams dataclass instances (lists or generators) to a CSV file
+
+    Args:
+        output_path: Destination CSV path
+        items: Dataclass instances, consumed lazily
+        columns: Field names to write, in order
+        chunk_size: Rows buffered per write
+        progress: Optional throughput reporter
+        compression: Codec name; None infers it from the suffix of output_path
+        level: Compression level; None for the codec default
+
+    Returns:
+        StreamStats for the completed write
+    """
+    return write_csv_stream(output_path, columns, chunked(dataclass_rows(items, columns), chunk_size),
+                            progress=progress, compression=compression, level=level)
+
+
+def write_dashboard_csvs(data: Any, output_dir: Path,
+                         progress_stream: Optional[TextIO] = sys.stdout,
+                         compression: Optional[str] = None,
+                         level: Optional[int] = None) -> List[StreamStats]:
+    """
+    Writes every section of a CompleteDashboardData to its own CSV file
+
+    List sections (or any sequence of records, e.g. columnar tables) are
+    written row by row; single-object sections (plan info, financial KPIs)
+    become one-row files. Files are named after the field, plus the codec
+    suffix when compressed (e.g. claim_lines.csv.gz).
+
+    Args:
+        data: CompleteDashboardData instance
+        output_dir: Directory for the section files (created if missing)
+        progress_stream: Where to report progress; None for silent writes
+        compression: "gzip", "zstd", "lz4"; None or "none" for plain CSV
+        level: Compression level; None for the codec default
+
+    Returns:
+        StreamStats for each file written, in field order
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    results = []
+    for section in fields(data):
+        value = getattr(data, section.name)
+        items = [value] if is_dataclass(value) else value
+        if not items:
+            continue
+
+        columns = [f.name for f in fields(items[0])]
+        output_path = compressed_path(output_dir / f"{section.name}.csv", compression)
+        progress = ProgressReporter(output_path.name, stream=progress_stream)
+        results.append(write_dataclass_csv(output_path, items, columns, progress=progress,
+                                           compression=compression, level=level))
+
+    return results
+
+
+@dataclass
+class ShardInfo:
+    """One shard file; rows row_start..row_end-1 of the unsharded stream"""
+    file: str                       # File name, relative to the manifest
+    row_start: int
+    row_end: int                    # Exclusive
+    bytes: int                      # File size, header included
+    sha256: str
+
+    @property
+    def rows(self) -> int:
+        return self.row_end - self.row_start
+
+
+@dataclass
+class ShardedStats(StreamStats):
+    """StreamStats for a sharded write; output_path is the manifest"""
+    shards: List[ShardInfo] = field(default_factory=list)
+
+
+class _LineSink:
+    """csv.writer target that keeps each formatted row as its own string"""
+    __slots__ = ('lines', 'write')
+
+    def __init__(self):
+        self.lines: List[str] = []
+        self.write = self.lines.append
+
+
+class _ShardFile:
+    """Open shard: tracks its size and checksum as bytes are written"""
+
+    def __init__(self, path: Path, header: bytes, row_start: int):
+        self.path = path
+        self.row_start = row_start
+        self.rows = 0
+        self.bytes = 0
+        self._hash = hashlib.sha256()
+        self._file = open(path, 'wb')
+        self.write(header)
+
+    def write(self, data: bytes) -> None:
+        self._file.write(data)
+        self._hash.update(data)
+        self.bytes += len(data)
+
+    def close(self) -> ShardInfo:
+        self._file.close()
+        return ShardInfo(self.path.name, self.row_start, self.row_start + self.rows,
+                         self.bytes, self._hash.hexdigest())
+
+
+def shard_manifest_path(output_dir: Path, name: str) -> Path:
+    return Path(output_dir) / f"{name}.shards.json"
+
+
+def write_csv_shards(output_dir: Path, name: str, header: Sequence[str],
+                     row_chunks: Iterable[Sequence[Sequence[Any]]],
+                     max_bytes: int = UPLOAD_MAX_BYTES, max_rows: Optional[int] = None,
+                     progress: Optional[ProgressReporter] = None) -> ShardedStats:
+    """
+    Streams rows into shard files no larger than max_bytes / max_rows
+
+    Shards are named <name>.part-00001.csv, ... and each starts with the
+    header row (no comment preamble: the upload route reads the header from
+    the first line). A shard is closed as soon as the next row would push it
+    past a limit, so rows are never split. <name>.shards.json records each
+    shard's row range, size and SHA-256, plus the shards grouped into upload
+    requests of at most UPLOAD_MAX_FILES files.
+
+    Args:
+        output_dir: Directory for the shards and manifest (created if missing)
+        name: Shard and manifest name stem (e.g. "high_cost_claimants")
+        header: Column names, repeated at the top of every shard
+        row_chunks: Iterable of row lists, consumed once
+        max_bytes: Size limit per shard file, header included
+        max_rows: Data row limit per shard; None for no limit
+        progress: Reporter for throughput lines; defaults to stdout reporting
+
+    Returns:
+        ShardedStats with the manifest path and every shard
+
+    Raises:
+        ValueError: if a limit is not positive, or the header or a single
+                    row does not fit in max_bytes
+    """
+    if max_bytes <= 0 or (max_rows is not None and max_rows <= 0):
+        raise ValueError(f"Shard limits must be positive, got max_bytes={max_bytes}, max_rows={max_rows}")
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = shard_manifest_path(output_dir, name)
+    if progress is None:
+        progress = ProgressReporter(manifest_path.name)
+    row_limit = max_rows if max_rows is not None else float('inf')
+
+    sink = _LineSink()
+    writer = csv.writer(sink)
+    writer.writerow(header)
+    header_bytes = sink.lines.pop().encode('utf-8')
+    if len(header_bytes) >= max_bytes:
+        raise ValueError(f"Header alone ({len(header_bytes)} bytes) exceeds max_bytes={max_bytes}")
+
+    shards: List[ShardInfo] = []
+    rows = 0
+    started = time.perf_counter()
+
+    def next_shard() -> _ShardFile:
+        path = output_dir / f"{name}.part-{len(shards) + 1:05d}.csv"
+        return _ShardFile(path, header_bytes, rows)
+
+    with span(f"write_shards:{name}", "writer") as current_span:
+        shard = next_shard()
+        for chunk in row_chunks:
+            writer.writerows(chunk)
+            data = ''.join(sink.lines).encode('utf-8')
+            if shard.bytes + len(data) <= max_bytes and shard.rows + len(sink.lines) <= row_limit:
+                # Fast path: the whole chunk fits in the open shard
+                shard.write(data)
+                shard.rows += len(sink.lines)
+                rows += len(sink.lines)
+            else:
+                lines = [line.encode('utf-8') for line in sink.lines]
+                i = 0
+                while i < len(lines):
+                    j, size = i, 0
+                    room = max_bytes - shard.bytes
+                    while j < len(lines) and shard.rows + (j - i) < row_limit and size + len(lines[j]) <= room:
+                        size += len(lines[j])
+                        j += 1
+                    if j == i:
+                        if shard.rows == 0:
+                            raise ValueError(f"Row {rows} ({len(lines[i])} bytes) does not fit in a "
+                                             f"shard of max_bytes={max_bytes}")
+                        shards.append(shard.close())
+                        shard = next_shard()
+                        continue
+                    shard.write(b''.join(lines[i:j]))
+                    shard.rows += j - i
+                    rows += j - i
+                    i = j
+            sink.lines.clear()
+            progress.update(rows)
+        shards.append(shard.close())
+        current_span.rows = rows
+
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'version': SHARD_MANIFEST_VERSION,
+            'name': name,
+            'header': list(header),
+            'max_bytes': max_bytes,
+            'max_rows': max_rows,
+            'rows': rows,
+            'shards': [asdict(shard) for shard in shards],
+            'upload_batches': [
+                [shard.file for shard in shards[i:i + UPLOAD_MAX_FILES]]
+                for i in range(0, len(shards), UPLOAD_MAX_FILES)
+            ],
+        }, f, indent=2)
+
+    stats = ShardedStats(manifest_path, rows, time.perf_counter() - started, shards)
+    progress.finish(stats)
+    return stats
+
+
+def read_shard_manifest(manifest_path: Path) -> Dict[str, Any]:
+    """
+    Loads a manifest written by write_csv_shards
+
+    Raises:
+        ValueError: if the manifest version is not supported
+    """
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('version') != SHARD_MANIFEST_VERSION:
+        raise ValueError(f"Unsupported shard manifest version: {manifest.get('version')}")
+    return manifest
+
+
+def verify_shards(manifest_path: Path) -> List[str]:
+    """
+    Checks every shard against its recorded size and checksum
+
+    Returns:
+        Error messages; empty when all shards are intact and contiguous
+    """
+    manifest_path = Path(manifest_path)
+    manifest = read_shard_manifest(manifest_path)
+    errors = []
+    expected_start = 0
+
+    for entry in manifest['shards']:
+        shard = ShardInfo(**entry)
+        path = manifest_path.parent / shard.file
+        if shard.row_start != expected_start:
+            errors.append(f"{shard.file}: starts at row {shard.row_start}, expected {expected_start}")
+        expected_start = shard.row_end
+        if not path.exists():
+            errors.append(f"{shard.file}: missing")
+            continue
+
+        digest = hashlib.sha256()
+        size = 0
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+                size += len(block)
+        if size != shard.bytes:
+            errors.append(f"{shard.file}: {size} bytes, manifest records {shard.bytes}")
+        elif digest.hexdigest() != shard.sha256:
+            errors.append(f"{shard.file}: checksum mismatch")
+
+    if expected_start != manifest['rows']:
+        errors.append(f"Shards cover {expected_start} rows, manifest records {manifest['rows']}")
+    return errors
+
+
+class CSVStreamReader:
+    """
+    Reads template-style CSV files in fixed-size chunks
+
+    The '#' comment preamble written by CSVTemplateGenerator (and any blank or
+    '#' rows after it) is skipped, so only the header and data rows are seen.
+    gzip, zstd and lz4 files are decompressed transparently, whatever their name.
+
+    Usage:
+        with CSVStreamReader(path) as reader:
+            for chunk in reader:        # lists of string rows
+                ...
+    """
+
+    def __init__(self, input_path: Path, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        if chunk_size <= 0:
+            raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+
+        self.input_path = Path(input_path)
+        self.chunk_size = chunk_size
+        self.comments: List[str] = []
+        self.header: List[str] = []
+        self._file: Optional[TextIO] = None
+        self._reader = None
+
+    def __enter__(self) -> "CSVStreamReader":
+        self.open()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def open(self) -> None:
+        """Opens the file and consumes the preamble and header row"""
+        self._file = open_text_input(self.input_path, encoding='utf-8-sig')
+        self._reader = csv.reader(self._file)
+
+        for row in self._reader:
+            if not row or not any(cell.strip() for cell in row):
+                continue
+            if row[0].lstrip().startswith('#'):
+                self.comments.append(row[0].lstrip()[1:].strip())
+                continue
+            self.header = [cell.strip() for cell in row]
+            break
+
+        if not self.header:
+            raise ValueError(f"No header row found in {self.input_path}")
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __iter__(self) -> Iterator[List[List[str]]]:
+        if self._reader is None:
+            self.open()
+
+        data_rows = (
+            row for row in self._reader
+            if row and any(row) and not row[0].startswith('#')
+        )
+        return chunked(data_rows, self.chunk_size)
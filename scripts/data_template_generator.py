@@ -13,15 +13,44 @@ This module analyzes the ComprehensiveAnalyticsDashboard component and generates
 - Mapping between CSV columns and chart elements
 """
 
-from dataclasses import dataclass, field
-from typing import List, Optional, Dict, Any, Tuple
+from dataclasses import dataclass, field, fields
+from typing import List, Optional, Dict, Any, Tuple, TYPE_CHECKING
 from datetime import datetime, timedelta
 from enum import Enum
 import csv
-import random
+import functools
+import hashlib
+import io
 import json
+import os
+import sys
+import threading
 from pathlib import Path
 
+if TYPE_CHECKING:
+    from rng_context import RNGContext
+    from validation import ValidationReport
+
+
+def _traced(category: str):
+    """
+    Records each call as a profiling span named after the function
+
+    A no-op unless profiling.tracing is active. List results set the span's
+    row count.
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            from profiling import span
+            with span(func.__name__, category) as current:
+                result = func(*args, **kwargs)
+                if isinstance(result, list):
+                    current.rows = len(result)
+                return result
+        return wrapper
+    return decorate
+
 
 # ============================================================================
 # ENUMS AND CONSTANTS
@@ -415,6 +444,7 @@ class CompleteDashboardData:
     chronic_condition_compliance: List[ChronicConditionCompliance]
     preventive_screenings: List[PreventiveScreening]
 
+    @_traced("validator")
     def validate_all(self) -> Tuple[bool, List[str]]:
         """
         Validates all data components
@@ -456,6 +486,221 @@ class CompleteDashboardData:
 
         return len(errors) == 0, errors
 
+    def validate_rows(self) -> "ValidationReport":
+        """
+        Applies every template validation rule as vectorized column checks
+
+        Unlike validate_all, reports the offending row indices for each rule
+        and also checks sort order and non-negative amounts. Requires NumPy.
+
+        Returns:
+            ValidationReport with violations grouped by rule
+        """
+        from validation import validate_dashboard
+        return validate_dashboard(self)
+
+
+def _resolve_rng(rng: Optional["RNGContext"]) -> "RNGContext":
+    """Returns rng, or a fresh unseeded context (NumPy is imported on first use)"""
+    from rng_context import resolve_rng
+    return resolve_rng(rng)
+
+
+def _top_k(items: List[Any], count: int, score, key) -> List[Any]:
+    """Top count items by score via a bounded heap; ties ordered by key ascending"""
+    from topk import top_k
+    return top_k(items, count, score, key)
+
+
+def _diagnosis_entries(count: int, rng: "RNGContext", catalog: Optional[Any]) -> List[Tuple[str, str]]:
+    """
+    count (code, description) pairs drawn without replacement by catalog weight
+
+    Repeats the drawn codes only when count exceeds the catalog.
+    """
+    from claims_simulator import DEFAULT_CATALOG
+    catalog = DEFAULT_CATALOG if catalog is None else catalog
+    indexes = catalog.sample_distinct(min(count, len(catalog)), rng)
+    return [catalog.entry(indexes[i % len(indexes)]) for i in range(count)]
+
+
+# ============================================================================
+# TEMPLATE SCHEMA REGISTRY
+# ============================================================================
+
+# Written next to the templates; maps each file to the hash of its content
+TEMPLATE_MANIFEST = "template_manifest.json"
+TEMPLATE_MANIFEST_VERSION = 1
+
+
+@dataclass(frozen=True)
+class TemplateSpec:
+    """
+    Schema of one CSV template
+
+    Columns come from the record dataclass's fields. Rules are rendered as
+    '# - ' comment lines in order; a rule tied to a column is prefixed with
+    the column name and must name one of the fields.
+    """
+    filename: str                   # e.g. "monthly_costs.csv"
+    title: str                      # First comment line
+    section: str                    # CompleteDashboardData field the rows load into
+    record_type: type               # Dataclass describing one row
+    rules: Tuple[Tuple[Optional[str], str], ...]   # (column or None, rule text)
+    sample_row: Tuple[str, ...]
+
+    def __post_init__(self):
+        columns = set(self.columns)
+        unknown = [column for column, _ in self.rules if column is not None and column not in columns]
+        if unknown:
+            raise ValueError(f"{self.filename}: rules reference unknown columns {unknown}")
+        if len(self.sample_row) != len(self.columns):
+            raise ValueError(f"{self.filename}: sample row has {len(self.sample_row)} values "
+                             f"for {len(self.columns)} columns")
+
+    @property
+    def name(self) -> str:
+        """Template name without extension (e.g. "high_cost_claimants")"""
+        return Path(self.filename).stem
+
+    @property
+    def columns(self) -> List[str]:
+        return [f.name for f in fields(self.record_type)]
+
+    def render(self) -> str:
+        """Full template text: comment preamble, header and sample row"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        writer.writerow([f"# {self.title} - Template"])
+        writer.writerow(['# Validation Rules:'])
+        for column, text in self.rules:
+            writer.writerow([f"# - {column}: {text}" if column else f"# - {text}"])
+        writer.writerow([])
+
+        writer.writerow(self.columns)
+        writer.writerow(list(self.sample_row))
+        return buffer.getvalue()
+
+    def content_hash(self) -> str:
+        return hashlib.sha256(self.render().encode('utf-8')).hexdigest()
+
+    def write(self, output_path: Path) -> None:
+        """Writes the template atomically (temporary file, then rename)"""
+        _write_atomic(Path(output_path), self.render())
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    """Readers see the old file or the new one, never a partial write"""
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(temp_path, 'w', newline='', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(temp_path, path)
+
+
+TEMPLATE_REGISTRY: Dict[str, TemplateSpec] = {spec.filename: spec for spec in [
+    TemplateSpec(
+        filename='monthly_costs.csv',
+        title='Monthly Cost Summary',
+        section='monthly_costs',
+        record_type=MonthlyCostSummary,
+        rules=(
+            (None, 'Must have exactly 12 rows (one per month)'),
+            (None, 'Months: January, February, March, April, May, June, July, August, '
+                   'September, October, November, December'),
+            ('medical_plan_payment', 'numeric, >= 0'),
+            ('rx_plan_payment', 'numeric, >= 0'),
+            ('member_enrollment', 'integer, > 0'),
+        ),
+        sample_row=('April', '2024', '450000.00', '95000.00', '1050'),
+    ),
+    TemplateSpec(
+        filename='high_cost_claimants.csv',
+        title='High-Cost Claimants',
+        section='top_claimants',
+        record_type=HighCostClaimant,
+        rules=(
+            ('member_id', 'De-identified/hashed identifier'),
+            ('medical_payment', 'numeric, >= 0'),
+            ('rx_payment', 'numeric, >= 0'),
+            ('predicted_cost_range', 'Optional, values: '
+                                     + ' | '.join(r.value for r in PredictedCostRange) + ' | (blank)'),
+            (None, 'Typically top 10-20 claimants sorted by total descending'),
+        ),
+        sample_row=('M5678871894251147653', '551798.00', '1648.00', '>$250,000'),
+    ),
+    TemplateSpec(
+        filename='diagnosis_by_cost.csv',
+        title='Top Diagnosis by Cost',
+        section='diagnosis_by_cost',
+        record_type=DiagnosisByCost,
+        rules=(
+            (None, 'Top 10 diagnoses only'),
+            ('diagnosis_code', 'Valid ICD-10 code'),
+            ('total_cost', 'numeric, >= 0'),
+            ('percentage', 'numeric, 0-100, all percentages should sum to ~100'),
+            (None, 'Sorted by total_cost descending'),
+        ),
+        sample_row=('C02.1', 'Malignant neoplasm of border of tongue', '305000.00', '17.02'),
+    ),
+    TemplateSpec(
+        filename='diagnosis_by_utilization.csv',
+        title='Top Diagnosis by Utilization',
+        section='diagnosis_by_utilization',
+        record_type=DiagnosisByUtilization,
+        rules=(
+            (None, 'Top 10 diagnoses only'),
+            ('diagnosis_code', 'Valid ICD-10 code'),
+            ('claim_count', 'integer, > 0'),
+            ('percentage', 'numeric, 0-100, all percentages should sum to ~100'),
+            (None, 'Sorted by claim_count descending'),
+        ),
+        sample_row=('Z00.00', 'Encounter for general adult medical exam', '2000', '29.87'),
+    ),
+    TemplateSpec(
+        filename='drug_classes.csv',
+        title='Top Drug Classes by Utilization',
+        section='drug_classes',
+        record_type=DrugClass,
+        rules=(
+            (None, 'Top 10 drug classes only'),
+            ('drug_class_name', 'Therapeutic class name (all caps)'),
+            ('script_count', 'integer, > 0'),
+            ('patient_cost', 'numeric, >= 0 (patient out-of-pocket)'),
+            ('plan_payment', 'numeric, >= 0 (plan payment)'),
+            (None, 'Sorted by script_count descending'),
+        ),
+        sample_row=('ANTIHYPERTENSIVES', '1149', '8640.91', '4861.57'),
+    ),
+    TemplateSpec(
+        filename='preventive_screenings.csv',
+        title='Adult Preventive Screenings',
+        section='preventive_screenings',
+        record_type=PreventiveScreening,
+        rules=(
+            ('screening_name', 'Type of preventive screening'),
+            ('prior_year_members', 'integer, >= 0 (eligible members prior year)'),
+            ('current_year_members', 'integer, >= 0 (eligible members current year)'),
+            ('prior_participation_percent', 'numeric, 0-100'),
+            ('current_participation_percent', 'numeric, 0-100'),
+        ),
+        sample_row=('Preventive Care Visit', '1100', '1050', '92', '94'),
+    ),
+    TemplateSpec(
+        filename='chronic_condition_compliance.csv',
+        title='Chronic Condition Care Compliance',
+        section='chronic_condition_compliance',
+        record_type=ChronicConditionCompliance,
+        rules=(
+            ('condition_name', 'Chronic condition name'),
+            ('compliant_count', 'integer, >= 0 (members compliant with care protocols)'),
+            ('non_compliant_count', 'integer, >= 0 (members not compliant)'),
+            ('avg_pmpy', 'numeric, >= 0 (Average Per Member Per Year cost)'),
+        ),
+        sample_row=('Hypertension', '180', '65', '12000.00'),
+    ),
+]}
+
 
 # ============================================================================
 # CSV TEMPLATE GENERATORS
@@ -465,343 +710,172 @@ class CSVTemplateGenerator:
     """
     Generates CSV template files for data import
 
-    Each template includes:
+    Each template is rendered from its TEMPLATE_REGISTRY entry and includes:
     - Proper column headers
     - Data type descriptions
     - Sample row
     - Validation rules in comments
+
+    A template_manifest.json beside the files records each template's
+    content hash, so unchanged templates are not rewritten.
     """
 
     @staticmethod
+    @_traced("writer")
     def generate_monthly_costs_template(output_path: Path) -> None:
-        """
-        Generates CSV template for Monthly Cost Summary data
-
-        Required columns:
-        - month: Month name (January, February, etc.)
-        - year: 4-digit year
-        - medical_plan_payment: Float, >= 0
-        - rx_plan_payment: Float, >= 0
-        - member_enrollment: Integer, > 0
-
-        Validation:
-        - Must have exactly 12 rows (one per month)
-        - Months must be sequential
-        - Member enrollment should be consistent or declining
-        """
-        with open(output_path, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-
-            # Header with data types
-            writer.writerow(['# Monthly Cost Summary - Template'])
-            writer.writerow(['# Validation Rules:'])
-            writer.writerow(['# - Must have exactly 12 rows (one per month)'])
-            writer.writerow(['# - Months: January, February, March, April, May, June, July, August, September, October, November, December'])
-            writer.writerow(['# - medical_plan_payment: numeric, >= 0'])
-            writer.writerow(['# - rx_plan_payment: numeric, >= 0'])
-            writer.writerow(['# - member_enrollment: integer, > 0'])
-            writer.writerow([])
-
-            # Column headers
-            writer.writerow([
-                'month',
-                'year',
-                'medical_plan_payment',
-                'rx_plan_payment',
-                'member_enrollment'
-            ])
-
-            # Sample row
-            writer.writerow([
-                'April',
-                '2024',
-                '450000.00',
-                '95000.00',
-                '1050'
-            ])
+        """Generates CSV template for Monthly Cost Summary data"""
+        TEMPLATE_REGISTRY['monthly_costs.csv'].write(output_path)
 
     @staticmethod
+    @_traced("writer")
     def generate_high_cost_claimants_template(output_path: Path) -> None:
-        """
-        Generates CSV template for High-Cost Claimants data
-
-        Required columns:
-        - member_id: String, unique identifier (masked/hashed)
-        - medical_payment: Float, >= 0
-        - rx_payment: Float, >= 0
-        - predicted_cost_range: Optional, one of: >$250,000 | $100,000-$250,000 | $50,000-$100,000 | <$50,000
-
-        Validation:
-        - Typically top 10-20 claimants
-        - member_id should be de-identified
-        - Sorted by total cost descending
-        """
-        with open(output_path, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-
-            writer.writerow(['# High-Cost Claimants - Template'])
-            writer.writerow(['# Validation Rules:'])
-            writer.writerow(['# - member_id: De-identified/hashed identifier'])
-            writer.writerow(['# - medical_payment: numeric, >= 0'])
-            writer.writerow(['# - rx_payment: numeric, >= 0'])
-            writer.writerow(['# - predicted_cost_range: Optional, values: >$250,000 | $100,000-$250,000 | $50,000-$100,000 | <$50,000 | (blank)'])
-            writer.writerow(['# - Typically top 10-20 claimants sorted by total descending'])
-            writer.writerow([])
-
-            writer.writerow([
-                'member_id',
-                'medical_payment',
-                'rx_payment',
-                'predicted_cost_range'
-            ])
-
-            writer.writerow([
-                'M5678871894251147653',
-                '551798.00',
-                '1648.00',
-                '>$250,000'
-            ])
+        """Generates CSV template for High-Cost Claimants data"""
+        TEMPLATE_REGISTRY['high_cost_claimants.csv'].write(output_path)
 
     @staticmethod
+    @_traced("writer")
     def generate_diagnosis_by_cost_template(output_path: Path) -> None:
-        """
-        Generates CSV template for Diagnosis by Cost data
-
-        Required columns:
-        - diagnosis_code: ICD-10 code
-        - diagnosis_description: Full diagnosis description
-        - total_cost: Float, >= 0
-        - percentage: Float, 0-100
-
-        Validation:
-        - Top 10 diagnoses only
-        - Percentages should sum to ~100%
-        - Sorted by cost descending
-        """
-        with open(output_path, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-
-            writer.writerow(['# Top Diagnosis by Cost - Template'])
-            writer.writerow(['# Validation Rules:'])
-            writer.writerow(['# - Top 10 diagnoses only'])
-            writer.writerow(['# - diagnosis_code: Valid ICD-10 code'])
-            writer.writerow(['# - total_cost: numeric, >= 0'])
-            writer.writerow(['# - percentage: numeric, 0-100, all percentages should sum to ~100'])
-            writer.writerow(['# - Sorted by total_cost descending'])
-            writer.writerow([])
-
-            writer.writerow([
-                'diagnosis_code',
-                'diagnosis_description',
-                'total_cost',
-                'percentage'
-            ])
-
-            writer.writerow([
-                'C02.1',
-                'Malignant neoplasm of border of tongue',
-                '305000.00',
-                '17.02'
-            ])
+        """Generates CSV template for Diagnosis by Cost data"""
+        TEMPLATE_REGISTRY['diagnosis_by_cost.csv'].write(output_path)
 
     @staticmethod
+    @_traced("writer")
     def generate_diagnosis_by_utilization_template(output_path: Path) -> None:
-        """
-        Generates CSV template for Diagnosis by Utilization data
-
-        Required columns:
-        - diagnosis_code: ICD-10 code
-        - diagnosis_description: Full diagnosis description
-        - claim_count: Integer, > 0
-        - percentage: Float, 0-100
-
-        Validation:
-        - Top 10 diagnoses only
-        - Percentages should sum to ~100%
-        - Sorted by count descending
-        """
-        with open(output_path, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-
-            writer.writerow(['# Top Diagnosis by Utilization - Template'])
-            writer.writerow(['# Validation Rules:'])
-            writer.writerow(['# - Top 10 diagnoses only'])
-            writer.writerow(['# - diagnosis_code: Valid ICD-10 code'])
-            writer.writerow(['# - claim_count: integer, > 0'])
-            writer.writerow(['# - percentage: numeric, 0-100, all percentages should sum to ~100'])
-            writer.writerow(['# - Sorted by claim_count descending'])
-            writer.writerow([])
-
-            writer.writerow([
-                'diagnosis_code',
-                'diagnosis_description',
-                'claim_count',
-                'percentage'
-            ])
-
-            writer.writerow([
-                'Z00.00',
-                'Encounter for general adult medical exam',
-                '2000',
-                '29.87'
-            ])
+        """Generates CSV template for Diagnosis by Utilization data"""
+        TEMPLATE_REGISTRY['diagnosis_by_utilization.csv'].write(output_path)
 
     @staticmethod
+    @_traced("writer")
     def generate_drug_classes_template(output_path: Path) -> None:
-        """
-        Generates CSV template for Drug Classes data
-
-        Required columns:
-        - drug_class_name: Therapeutic class name
-        - script_count: Integer, > 0
-        - patient_cost: Float, >= 0
-        - plan_payment: Float, >= 0
-
-        Validation:
-        - Top 10 drug classes by utilization
-        - Sorted by script_count descending
-        """
-        with open(output_path, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-
-            writer.writerow(['# Top Drug Classes by Utilization - Template'])
-            writer.writerow(['# Validation Rules:'])
-            writer.writerow(['# - Top 10 drug classes only'])
-            writer.writerow(['# - drug_class_name: Therapeutic class name (all caps)'])
-            writer.writerow(['# - script_count: integer, > 0'])
-            writer.writerow(['# - patient_cost: numeric, >= 0 (patient out-of-pocket)'])
-            writer.writerow(['# - plan_payment: numeric, >= 0 (plan payment)'])
-            writer.writerow(['# - Sorted by script_count descending'])
-            writer.writerow([])
-
-            writer.writerow([
-                'drug_class_name',
-                'script_count',
-                'patient_cost',
-                'plan_payment'
-            ])
-
-            writer.writerow([
-                'ANTIHYPERTENSIVES',
-                '1149',
-                '8640.91',
-                '4861.57'
-            ])
+        """Generates CSV template for Drug Classes data"""
+        TEMPLATE_REGISTRY['drug_classes.csv'].write(output_path)
 
     @staticmethod
+    @_traced("writer")
     def generate_preventive_screenings_template(output_path: Path) -> None:
-        """
-        Generates CSV template for Preventive Screenings data
-
-        Required columns:
-        - screening_name: Name of screening
-        - prior_year_members: Integer, >= 0
-        - current_year_members: Integer, >= 0
-        - prior_participation_percent: Float, 0-100
-        - current_participation_percent: Float, 0-100
-
-        Validation:
-        - Common screenings (6-10 types)
-        - Participation percentages must be 0-100
-        """
-        with open(output_path, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-
-            writer.writerow(['# Adult Preventive Screenings - Template'])
-            writer.writerow(['# Validation Rules:'])
-            writer.writerow(['# - screening_name: Type of preventive screening'])
-            writer.writerow(['# - prior_year_members: integer, >= 0 (eligible members prior year)'])
-            writer.writerow(['# - current_year_members: integer, >= 0 (eligible members current year)'])
-            writer.writerow(['# - prior_participation_percent: numeric, 0-100'])
-            writer.writerow(['# - current_participation_percent: numeric, 0-100'])
-            writer.writerow([])
-
-            writer.writerow([
-                'screening_name',
-                'prior_year_members',
-                'current_year_members',
-                'prior_participation_percent',
-                'current_participation_percent'
-            ])
-
-            writer.writerow([
-                'Preventive Care Visit',
-                '1100',
-                '1050',
-                '92',
-                '94'
-            ])
+        """Generates CSV template for Preventive Screenings data"""
+        TEMPLATE_REGISTRY['preventive_screenings.csv'].write(output_path)
 
     @staticmethod
+    @_traced("writer")
     def generate_chronic_condition_compliance_template(output_path: Path) -> None:
+        """Generates CSV template for Chronic Condition Care Compliance data"""
+        TEMPLATE_REGISTRY['chronic_condition_compliance.csv'].write(output_path)
+
+    @staticmethod
+    def _read_manifest(output_dir: Path) -> Dict[str, str]:
+        """Recorded content hashes, or {} when missing or from another version"""
+        try:
+            with open(output_dir / TEMPLATE_MANIFEST, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if manifest.get('version') != TEMPLATE_MANIFEST_VERSION:
+            return {}
+        return manifest.get('templates', {})
+
+    @staticmethod
+    @_traced("stage")
+    def write_templates(output_dirs: List[Path], names: Optional[List[str]] = None,
+                        force: bool = False, workers: Optional[int] = None) -> Dict[Path, List[str]]:
         """
-        Generates CSV template for Chronic Condition Care Compliance data
+        Brings the templates in one or more directories up to date
 
-        Required columns:
-        - condition_name: Chronic condition name
-        - compliant_count: Integer, >= 0
-        - non_compliant_count: Integer, >= 0
-        - avg_pmpy: Float, >= 0 (Average Per Member Per Year cost)
+        A template is rewritten only when its rendered content hash differs
+        from the directory's manifest or the file is missing. Stale files
+        across all directories are written in parallel, each atomically.
+
+        Args:
+            output_dirs: Template directories (e.g. one per client)
+            names: Template file names to consider; None for all
+            force: Rewrite every template regardless of the manifest
+            workers: Writer threads (defaults to ThreadPoolExecutor's default)
 
-        Validation:
-        - 5-10 common chronic conditions
-        - Compliance counts should reflect actual member population
+        Returns:
+            File names written per directory (empty lists when up to date)
+
+        Raises:
+            ValueError: if a name is not a known template
         """
-        with open(output_path, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-
-            writer.writerow(['# Chronic Condition Care Compliance - Template'])
-            writer.writerow(['# Validation Rules:'])
-            writer.writerow(['# - condition_name: Chronic condition name'])
-            writer.writerow(['# - compliant_count: integer, >= 0 (members compliant with care protocols)'])
-            writer.writerow(['# - non_compliant_count: integer, >= 0 (members not compliant)'])
-            writer.writerow(['# - avg_pmpy: numeric, >= 0 (Average Per Member Per Year cost)'])
-            writer.writerow([])
-
-            writer.writerow([
-                'condition_name',
-                'compliant_count',
-                'non_compliant_count',
-                'avg_pmpy'
-            ])
-
-            writer.writerow([
-                'Hypertension',
-                '180',
-                '65',
-                '12000.00'
-            ])
+        from concurrent.futures import ThreadPoolExecutor
+
+        if names is None:
+            specs = list(TEMPLATE_REGISTRY.values())
+        else:
+            unknown = set(names) - set(TEMPLATE_REGISTRY)
+            if unknown:
+                raise ValueError(f"Unknown templates: {', '.join(sorted(unknown))}")
+            specs = [spec for filename, spec in TEMPLATE_REGISTRY.items() if filename in names]
+        hashes = {spec.filename: spec.content_hash() for spec in specs}
+
+        manifests = {}
+        stale = []
+        for output_dir in map(Path, output_dirs):
+            output_dir.mkdir(parents=True, exist_ok=True)
+            manifests[output_dir] = CSVTemplateGenerator._read_manifest(output_dir)
+            for spec in specs:
+                path = output_dir / spec.filename
+                if force or manifests[output_dir].get(spec.filename) != hashes[spec.filename] \
+                        or not path.exists():
+                    stale.append((output_dir, spec))
+
+        if stale:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(lambda item: item[1].write(item[0] / item[1].filename), stale))
+
+        written: Dict[Path, List[str]] = {output_dir: [] for output_dir in manifests}
+        for output_dir, spec in stale:
+            written[output_dir].append(spec.filename)
+        for output_dir, filenames in written.items():
+            if filenames:
+                manifest = {**manifests[output_dir], **{name: hashes[name] for name in filenames}}
+                _write_atomic(output_dir / TEMPLATE_MANIFEST, json.dumps({
+                    'version': TEMPLATE_MANIFEST_VERSION,
+                    'templates': dict(sorted(manifest.items())),
+                }, indent=2))
+
+        return written
 
     @staticmethod
-    def generate_all_templates(output_dir: Path) -> None:
+    @_traced("stage")
+    def generate_all_templates(output_dir: Path, names: Optional[List[str]] = None,
+                               force: bool = False) -> None:
         """
         Generates all CSV templates in the specified directory
 
+        Templates whose content is unchanged since the last run are skipped.
+
         Args:
             output_dir: Directory path where templates will be created
+            names: Template file names to write (e.g. ["monthly_costs.csv"]);
+                   None writes all of them
+            force: Rewrite templates even when they are up to date
+
+        Raises:
+            ValueError: if a name is not a known template
         """
-        output_dir.mkdir(parents=True, exist_ok=True)
-
-        templates = [
-            ('monthly_costs.csv', CSVTemplateGenerator.generate_monthly_costs_template),
-            ('high_cost_claimants.csv', CSVTemplateGenerator.generate_high_cost_claimants_template),
-            ('diagnosis_by_cost.csv', CSVTemplateGenerator.generate_diagnosis_by_cost_template),
-            ('diagnosis_by_utilization.csv', CSVTemplateGenerator.generate_diagnosis_by_utilization_template),
-            ('drug_classes.csv', CSVTemplateGenerator.generate_drug_classes_template),
-            ('preventive_screenings.csv', CSVTemplateGenerator.generate_preventive_screenings_template),
-            ('chronic_condition_compliance.csv', CSVTemplateGenerator.generate_chronic_condition_compliance_template),
-        ]
+        output_dir = Path(output_dir)
+        written = CSVTemplateGenerator.write_templates([output_dir], names, force)[output_dir]
 
-        for filename, generator_func in templates:
+        for filename in names or TEMPLATE_REGISTRY:
             output_path = output_dir / filename
-            generator_func(output_path)
-            print(f"✓ Generated template: {output_path}")
+            if filename in written:
+                print(f"✓ Generated template: {output_path}")
+            else:
+                print(f"✓ Template up to date: {output_path}")
 
 
 # ============================================================================
 # MOCK DATA GENERATORS
 # ============================================================================
 
+# Claimants whose most likely projected cost range is less likely than this get no prediction
+PREDICTION_MIN_PROBABILITY = 0.4
+
+# Monte Carlo trials per claimant; bucket probabilities are within ~1.5 points at 1,000
+PREDICTION_TRIALS = 1000
+
+
 class MockDataGenerator:
     """
     Generates realistic mock data for all dashboard visualizations
@@ -865,12 +939,26 @@ class MockDataGenerator:
     ]
 
     @staticmethod
-    def generate_member_id() -> str:
-        """Generates a realistic masked member ID"""
-        return f"M{random.randint(1000000000000000000, 9999999999999999999)}"
+    def generate_member_id(rng: Optional["RNGContext"] = None) -> str:
+        """
+        Generates a realistic masked member ID
+
+        Independent draws can repeat; use generate_member_ids for a batch
+        that must be unique.
+        """
+        rng = _resolve_rng(rng)
+        return f"M{rng.randint(1000000000000000000, 9999999999999999999)}"
+
+    @staticmethod
+    def generate_member_ids(count: int, rng: Optional["RNGContext"] = None) -> List[str]:
+        """Generates count distinct masked member IDs in one vectorized call"""
+        from member_ids import format_member_ids, unique_member_ids
+        return format_member_ids(unique_member_ids(count, _resolve_rng(rng)))
 
     @staticmethod
-    def generate_monthly_costs(year: int = 2024, base_enrollment: int = 1200) -> List[MonthlyCostSummary]:
+    @_traced("generator")
+    def generate_monthly_costs(year: int = 2024, base_enrollment: int = 1200,
+                               rng: Optional["RNGContext"] = None) -> List[MonthlyCostSummary]:
         """
         Generates 12 months of cost data with realistic patterns
 
@@ -878,6 +966,7 @@ class MockDataGenerator:
         - RX costs are more stable
         - Enrollment typically declines slightly over time
         """
+        rng = _resolve_rng(rng)
         months = ["April", "May", "June", "July", "August", "September",
                   "October", "November", "December", "January", "February", "March"]
 
@@ -886,15 +975,15 @@ class MockDataGenerator:
 
         for i, month in enumerate(months):
             # Seasonal variation in medical costs
-            seasonal_factor = 1.0 + random.uniform(-0.3, 0.3)
+            seasonal_factor = 1.0 + rng.uniform(-0.3, 0.3)
             # Potential spike in costs (10% chance of high-cost month)
-            spike = random.uniform(1.0, 2.0) if random.random() < 0.1 else 1.0
+            spike = rng.uniform(1.0, 2.0) if rng.random() < 0.1 else 1.0
 
             medical = int(450000 * seasonal_factor * spike)
-            rx = int(random.uniform(85000, 125000))
+            rx = int(rng.uniform(85000, 125000))
 
             # Enrollment decreases slightly over time
-            enrollment = max(900, enrollment - random.randint(0, 25))
+            enrollment = max(900, enrollment - rng.randint(0, 25))
 
             monthly_data.append(MonthlyCostSummary(
                 month=month,
@@ -907,66 +996,63 @@ class MockDataGenerator:
         return monthly_data
 
     @staticmethod
-    def generate_high_cost_claimants(count: int = 10) -> List[HighCostClaimant]:
+    @_traced("generator")
+    def generate_high_cost_claimants(count: int = 10,
+                                     rng: Optional["RNGContext"] = None) -> List[HighCostClaimant]:
         """
         Generates high-cost claimant data
 
         - Costs follow Pareto distribution (80/20 rule)
         - Top claimants have very high costs
-        - Some have predictive cost ranges
+        - Predicted cost ranges come from a Monte Carlo projection
         """
+        rng = _resolve_rng(rng)
+        member_ids = MockDataGenerator.generate_member_ids(count, rng)
         claimants = []
 
         for i in range(count):
             # Pareto distribution for costs
             base_cost = 600000 / (i + 1) ** 0.7
-            medical = base_cost * random.uniform(0.85, 0.98)
+            medical = base_cost * rng.uniform(0.85, 0.98)
             rx = base_cost - medical
 
-            # Only assign prediction to ~70% of claimants
-            prediction = None
-            if random.random() < 0.7:
-                total = medical + rx
-                if total > 400000:
-                    prediction = PredictedCostRange.OVER_250K
-                elif total > 150000:
-                    prediction = PredictedCostRange.RANGE_100K_250K
-                elif total > 75000:
-                    prediction = PredictedCostRange.RANGE_50K_100K
-                else:
-                    prediction = PredictedCostRange.UNDER_50K
-
             claimants.append(HighCostClaimant(
-                member_id=MockDataGenerator.generate_member_id(),
+                member_id=member_ids[i],
                 medical_payment=medical,
-                rx_payment=rx,
-                predicted_cost_range=prediction
+                rx_payment=rx
             ))
 
-        # Sort by total cost descending
-        claimants.sort(key=lambda x: x.total_plan_payment, reverse=True)
+        predictions = MockDataGenerator.predict_cost_ranges([c.total_plan_payment for c in claimants], rng)
+        for claimant, predicted in zip(claimants, predictions):
+            claimant.predicted_cost_range = predicted
 
-        return claimants
+        # Highest total cost first; equal totals ordered by member ID
+        return _top_k(claimants, count, score=lambda x: x.total_plan_payment, key=lambda x: x.member_id)
 
     @staticmethod
-    def generate_diagnosis_by_cost(count: int = 10) -> List[DiagnosisByCost]:
+    @_traced("generator")
+    def generate_diagnosis_by_cost(count: int = 10, rng: Optional["RNGContext"] = None,
+                                   catalog: Optional[Any] = None) -> List[DiagnosisByCost]:
         """
         Generates top diagnoses by cost
 
-        - Uses realistic ICD-10 codes
+        - Draws distinct ICD-10 codes by catalog frequency (an ICD10Catalog;
+          defaults to ICD10_CODES)
         - Percentages sum to 100%
         - Sorted by cost descending
         """
+        rng = _resolve_rng(rng)
+        entries = _diagnosis_entries(count, rng, catalog)
         diagnoses = []
         total_cost = 1800000  # Total diagnosis pool
         remaining_percent = 100.0
 
         for i in range(count):
-            code, description = MockDataGenerator.ICD10_CODES[i % len(MockDataGenerator.ICD10_CODES)]
+            code, description = entries[i]
 
             # Decreasing percentage allocation
             if i < count - 1:
-                percent = remaining_percent * random.uniform(0.15, 0.25) / (count - i)
+                percent = remaining_percent * rng.uniform(0.15, 0.25) / (count - i)
             else:
                 percent = remaining_percent  # Last diagnosis gets remaining
 
@@ -981,27 +1067,33 @@ class MockDataGenerator:
 
             remaining_percent -= percent
 
-        return diagnoses
+        # Highest cost first; equal costs ordered by diagnosis code
+        return _top_k(diagnoses, count, score=lambda x: x.total_cost, key=lambda x: x.diagnosis_code)
 
     @staticmethod
-    def generate_diagnosis_by_utilization(count: int = 10) -> List[DiagnosisByUtilization]:
+    @_traced("generator")
+    def generate_diagnosis_by_utilization(count: int = 10, rng: Optional["RNGContext"] = None,
+                                          catalog: Optional[Any] = None) -> List[DiagnosisByUtilization]:
         """
         Generates top diagnoses by utilization
 
-        - Uses realistic ICD-10 codes
+        - Draws distinct ICD-10 codes by catalog frequency (an ICD10Catalog;
+          defaults to ICD10_CODES)
         - Percentages sum to 100%
         - Sorted by count descending
         """
+        rng = _resolve_rng(rng)
+        entries = _diagnosis_entries(count, rng, catalog)
         diagnoses = []
         total_claims = 6700  # Total claim count
         remaining_percent = 100.0
 
         for i in range(count):
-            code, description = MockDataGenerator.ICD10_CODES[i + 10 % len(MockDataGenerator.ICD10_CODES)]
+            code, description = entries[i]
 
             # Decreasing percentage allocation
             if i < count - 1:
-                percent = remaining_percent * random.uniform(0.08, 0.35) / (count - i)
+                percent = remaining_percent * rng.uniform(0.08, 0.35) / (count - i)
             else:
                 percent = remaining_percent
 
@@ -1016,13 +1108,12 @@ class MockDataGenerator:
 
             remaining_percent -= percent
 
-        # Sort by count descending
-        diagnoses.sort(key=lambda x: x.claim_count, reverse=True)
-
-        return diagnoses
+        # Highest count first; equal counts ordered by diagnosis code
+        return _top_k(diagnoses, count, score=lambda x: x.claim_count, key=lambda x: x.diagnosis_code)
 
     @staticmethod
-    def generate_drug_classes(count: int = 10) -> List[DrugClass]:
+    @_traced("generator")
+    def generate_drug_classes(count: int = 10, rng: Optional["RNGContext"] = None) -> List[DrugClass]:
         """
         Generates drug class utilization data
 
@@ -1030,13 +1121,14 @@ class MockDataGenerator:
         - Script counts, patient costs, plan payments
         - Sorted by script count descending
         """
+        rng = _resolve_rng(rng)
         drug_data = []
 
         for i in range(count):
             class_name = MockDataGenerator.DRUG_CLASSES[i % len(MockDataGenerator.DRUG_CLASSES)]
-            scripts = int(random.uniform(300, 1200))
-            patient_cost = scripts * random.uniform(5, 50)
-            plan_payment = scripts * random.uniform(3, 500)
+            scripts = int(rng.uniform(300, 1200))
+            patient_cost = scripts * rng.uniform(5, 50)
+            plan_payment = scripts * rng.uniform(3, 500)
 
             drug_data.append(DrugClass(
                 drug_class_name=class_name,
@@ -1051,7 +1143,8 @@ class MockDataGenerator:
         return drug_data
 
     @staticmethod
-    def generate_chronic_condition_compliance() -> List[ChronicConditionCompliance]:
+    @_traced("generator")
+    def generate_chronic_condition_compliance(rng: Optional["RNGContext"] = None) -> List[ChronicConditionCompliance]:
         """
         Generates chronic condition care compliance data
 
@@ -1059,22 +1152,23 @@ class MockDataGenerator:
         - Compliance rates vary by condition
         - Higher cost conditions typically have lower compliance
         """
+        rng = _resolve_rng(rng)
         compliance_data = []
 
         for condition in MockDataGenerator.CHRONIC_CONDITIONS:
-            total_members = random.randint(50, 250)
-            compliance_rate = random.uniform(0.5, 0.8)  # 50-80% compliance
+            total_members = rng.randint(50, 250)
+            compliance_rate = rng.uniform(0.5, 0.8)  # 50-80% compliance
             compliant = int(total_members * compliance_rate)
             non_compliant = total_members - compliant
 
             # Higher cost conditions
             if condition in ["Ischemic Heart Disease", "Diabetes"]:
-                avg_pmpy = random.uniform(20000, 40000)
+                avg_pmpy = rng.uniform(20000, 40000)
                 # Lower compliance for expensive conditions
-                if random.random() < 0.5:
+                if rng.random() < 0.5:
                     compliant, non_compliant = non_compliant, compliant
             else:
-                avg_pmpy = random.uniform(8000, 18000)
+                avg_pmpy = rng.uniform(8000, 18000)
 
             compliance_data.append(ChronicConditionCompliance(
                 condition_name=condition,
@@ -1086,7 +1180,8 @@ class MockDataGenerator:
         return compliance_data
 
     @staticmethod
-    def generate_preventive_screenings() -> List[PreventiveScreening]:
+    @_traced("generator")
+    def generate_preventive_screenings(rng: Optional["RNGContext"] = None) -> List[PreventiveScreening]:
         """
         Generates preventive screening participation data
 
@@ -1094,19 +1189,20 @@ class MockDataGenerator:
         - Generally improving participation rates
         - Declining eligible populations in some categories
         """
+        rng = _resolve_rng(rng)
         screenings = []
 
         for screening_name in MockDataGenerator.PREVENTIVE_SCREENINGS:
-            prior_members = random.randint(250, 1100)
+            prior_members = rng.randint(250, 1100)
             # Current members typically decrease
-            current_members = int(prior_members * random.uniform(0.85, 1.05))
+            current_members = int(prior_members * rng.uniform(0.85, 1.05))
 
-            prior_participation = random.uniform(45, 85)
+            prior_participation = rng.uniform(45, 85)
             # Most screenings show improvement
-            if random.random() < 0.8:
-                current_participation = prior_participation + random.uniform(1, 8)
+            if rng.random() < 0.8:
+                current_participation = prior_participation + rng.uniform(1, 8)
             else:
-                current_participation = prior_participation - random.uniform(1, 5)
+                current_participation = prior_participation - rng.uniform(1, 5)
 
             # Cap at 100%
             current_participation = min(current_participation, 100.0)
@@ -1122,25 +1218,93 @@ class MockDataGenerator:
         return screenings
 
     @staticmethod
-    def generate_complete_dashboard_data() -> CompleteDashboardData:
+    def predict_cost_ranges(totals: List[float], rng: Optional["RNGContext"] = None,
+                            reference_cost: Optional[float] = None) -> List[Optional[PredictedCostRange]]:
+        """
+        Most likely next-year cost range for each claimant
+
+        Simulates PREDICTION_TRIALS outcomes per claimant (cost_projection.py).
+        Claimants whose top range has under PREDICTION_MIN_PROBABILITY
+        probability get None, as when a predictive model declines to score.
+
+        Args:
+            totals: Current annual plan payment per claimant
+            rng: Random stream for the simulation
+            reference_cost: Cohort cost projections regress toward; defaults
+                            to the mean of totals
+        """
+        from cost_projection import project_cost_ranges
+        projection = project_cost_ranges(totals, PREDICTION_TRIALS, _resolve_rng(rng), reference_cost=reference_cost)
+        return projection.most_likely(PREDICTION_MIN_PROBABILITY)
+
+    @staticmethod
+    @_traced("generator")
+    def generate_complete_dashboard_data(member_count: int = 1200,
+                                         claim_line_count: int = 36000,
+                                         rng: Optional["RNGContext"] = None,
+                                         plan_info: Optional[PlanInfo] = None,
+                                         catalog: Optional[Any] = None) -> CompleteDashboardData:
         """
         Generates a complete dataset for the entire dashboard
 
+        Monthly costs, financial KPIs, place of service, diagnoses, member
+        distribution and top claimants are derived from simulated member-level
+        claim lines in a single aggregation pass, so the same path scales from
+        sample data to production-sized load tests.
+
+        Args:
+            member_count: Number of members in the simulated roster
+            claim_line_count: Number of medical/RX claim lines to simulate
+            rng: Random stream; each section draws from its own named child
+                 stream, so a seeded context gives byte-identical output
+            plan_info: Plan to generate data for; defaults to a sample plan
+            catalog: ICD10Catalog to draw diagnoses from; defaults to ICD10_CODES
+
         Returns:
             CompleteDashboardData with all visualizations populated
         """
-        # Generate monthly costs first (needed for aggregations)
-        monthly_costs = MockDataGenerator.generate_monthly_costs()
+        # NumPy is only needed for mock data; templates stay dependency-free
+        from aggregation import aggregate_claim_lines
+        from claims_simulator import ClaimsSimulator
+        from pharmacy_simulator import aggregate_fills, fills_from_claim_lines
+        from profiling import span
+
+        if plan_info is None:
+            plan_info = PlanInfo(
+                client_name="Sample Healthcare Plan",
+                plan_start_date="2024-04-01",
+                plan_end_date="2025-03-31"
+            )
+        rng = _resolve_rng(rng)
+        with span("simulate_claims", rows=claim_line_count, members=member_count):
+            claim_lines = ClaimsSimulator(
+                member_count, plan_info.plan_start_date, rng.stream("claims"), catalog
+            ).simulate(claim_line_count)
+
+        # One pass over the claim lines feeds every claim-derived section
+        with span("aggregate_claims", rows=claim_line_count):
+            aggregates = aggregate_claim_lines(claim_lines)
+        # Drugs claim lines become fills, so the drug class table shares their totals
+        with span("aggregate_pharmacy"):
+            pharmacy = aggregate_fills([fills_from_claim_lines(claim_lines, rng.stream("pharmacy"))])
+        return MockDataGenerator.build_dashboard_data(aggregates, plan_info, rng, pharmacy)
 
-        # Calculate financial KPIs from monthly data
-        total_medical = sum(m.medical_plan_payment for m in monthly_costs)
-        total_rx = sum(m.rx_plan_payment for m in monthly_costs)
+    @staticmethod
+    @_traced("generator")
+    def generate_budget_vs_actuals(monthly_costs: List[MonthlyCostSummary],
+                                   rng: Optional["RNGContext"] = None) -> List[BudgetVsActuals]:
+        """
+        Generates budget rows around actual monthly costs
 
-        # Generate budget data
+        Each month draws from its own child stream, so a month's budget does
+        not change as later months are appended.
+        """
+        rng = _resolve_rng(rng)
         budget_data = []
         for month_data in monthly_costs:
-            budget_total = month_data.total_payment * random.uniform(1.05, 1.15)
-            claims = month_data.total_payment * random.uniform(0.75, 0.85)
+            month_rng = rng.stream(f"{month_data.year}-{month_data.month}")
+            budget_total = month_data.total_payment * month_rng.uniform(1.05, 1.15)
+            claims = month_data.total_payment * month_rng.uniform(0.75, 0.85)
             fixed = month_data.total_payment - claims
 
             budget_data.append(BudgetVsActuals(
@@ -1151,27 +1315,41 @@ class MockDataGenerator:
                 budget_total=budget_total
             ))
 
-        # Member distribution (Pareto principle)
-        member_dist = [
-            MemberDistribution(CostRange.UNDER_25K, 94.0, 29.0),
-            MemberDistribution(CostRange.RANGE_25K_50K, 2.0, 9.0),
-            MemberDistribution(CostRange.RANGE_50K_100K, 2.0, 19.0),
-            MemberDistribution(CostRange.OVER_100K, 2.0, 43.0),
-        ]
+        return budget_data
 
-        # Place of service data
-        pos_data = [
-            PlaceOfServiceData(PlaceOfService.OUTPATIENT_PROCEDURES, total_medical * 0.34),
-            PlaceOfServiceData(PlaceOfService.INPATIENT_HOSPITAL, total_medical * 0.23),
-            PlaceOfServiceData(PlaceOfService.DRUGS, total_rx),
-            PlaceOfServiceData(PlaceOfService.IMMEDIATE_ATTENTION, total_medical * 0.10),
-            PlaceOfServiceData(PlaceOfService.TESTING, total_medical * 0.06),
-            PlaceOfServiceData(PlaceOfService.OFFICE_CLINIC, total_medical * 0.05),
-            PlaceOfServiceData(PlaceOfService.SUBSTANCE_ABUSE, total_medical * 0.015),
-            PlaceOfServiceData(PlaceOfService.MENTAL_HEALTH, total_medical * 0.009),
-            PlaceOfServiceData(PlaceOfService.PREGNANCY, total_medical * 0.006),
-            PlaceOfServiceData(PlaceOfService.RECOVERY, total_medical * 0.005),
-        ]
+    @staticmethod
+    @_traced("generator")
+    def build_dashboard_data(aggregates: Any, plan_info: PlanInfo,
+                             rng: Optional["RNGContext"] = None,
+                             pharmacy: Optional[Any] = None,
+                             er: Optional[Any] = None) -> CompleteDashboardData:
+        """
+        Assembles the dashboard from claim aggregates plus mock sections
+
+        Args:
+            aggregates: ClaimAggregates or IncrementalAggregator; anything with
+                        the claim-derived section methods
+            plan_info: Plan the data belongs to
+            rng: Random stream for budget, predictions and mock-only sections
+            pharmacy: PharmacyAggregates for drug classes and monthly rx plan
+                      payment; None generates mock drug classes
+            er: ERAggregates for the ER panels; None simulates visits for the
+                plan's monthly enrollment
+
+        Returns:
+            CompleteDashboardData with all visualizations populated
+        """
+        rng = _resolve_rng(rng)
+        monthly_costs = aggregates.monthly_costs()
+        if pharmacy is not None:
+            for summary, rx in zip(monthly_costs, pharmacy.monthly_rx()):
+                summary.rx_plan_payment = round(float(rx), 2)
+
+        # Calculate financial KPIs from monthly data
+        total_medical = sum(m.medical_plan_payment for m in monthly_costs)
+        total_rx = sum(m.rx_plan_payment for m in monthly_costs)
+
+        budget_data = MockDataGenerator.generate_budget_vs_actuals(monthly_costs, rng.stream("budget"))
 
         # Medical episodes
         episodes = [
@@ -1187,29 +1365,14 @@ class MockDataGenerator:
             MedicalEpisode("Medical examination", 159000, 5.19),
         ]
 
-        # ER utilization
-        er_util = [
-            ERUtilization(ERCategory.ALL_OTHERS, 1560),
-            ERUtilization(ERCategory.DRUG_ALCOHOL_PSYCH, 133),
-            ERUtilization(ERCategory.INJURY, 497),
-            ERUtilization(ERCategory.NON_EMERGENT_AVOIDABLE, 1576),
-            ERUtilization(ERCategory.PCP_TREATABLE, 1464),
-        ]
-
-        er_diagnoses = [
-            ERTopDiagnosis("Chest pain; unspecified", 117),
-            ERTopDiagnosis("Neutropenia; unspecified", 104),
-            ERTopDiagnosis("Hydronephrosis with renal and ureteral calculous", 101),
-            ERTopDiagnosis("Other chest pain", 101),
-            ERTopDiagnosis("Atherosclerotic heart disease", 98),
-        ]
+        # ER utilization and top diagnoses share one count over visits
+        if er is None:
+            from er_simulator import simulate_plan_er_visits
+            er = simulate_plan_er_visits([m.member_enrollment for m in monthly_costs],
+                                         plan_info.plan_start_date, rng.stream("er_visits"))
 
         return CompleteDashboardData(
-            plan_info=PlanInfo(
-                client_name="Sample Healthcare Plan",
-                plan_start_date="2024-04-01",
-                plan_end_date="2025-03-31"
-            ),
+            plan_info=plan_info,
             financial_kpis=FinancialKPI(
                 total_plan_payment=total_medical + total_rx,
                 medical_plan_payment=total_medical,
@@ -1217,17 +1380,22 @@ class MockDataGenerator:
             ),
             monthly_costs=monthly_costs,
             budget_vs_actuals=budget_data,
-            member_distribution=member_dist,
-            top_claimants=MockDataGenerator.generate_high_cost_claimants(10),
-            place_of_service=pos_data,
-            diagnosis_by_cost=MockDataGenerator.generate_diagnosis_by_cost(10),
-            diagnosis_by_utilization=MockDataGenerator.generate_diagnosis_by_utilization(10),
+            member_distribution=aggregates.member_distribution(),
+            top_claimants=aggregates.top_claimants(10, rng.stream("predicted_cost_range")),
+            place_of_service=aggregates.place_of_service(),
+            diagnosis_by_cost=aggregates.diagnosis_by_cost(10),
+            diagnosis_by_utilization=aggregates.diagnosis_by_utilization(10),
             medical_episodes=episodes,
-            drug_classes=MockDataGenerator.generate_drug_classes(10),
-            er_utilization=er_util,
-            er_top_diagnoses=er_diagnoses,
-            chronic_condition_compliance=MockDataGenerator.generate_chronic_condition_compliance(),
-            preventive_screenings=MockDataGenerator.generate_preventive_screenings()
+            drug_classes=(pharmacy.drug_classes(10) if pharmacy is not None
+                          else MockDataGenerator.generate_drug_classes(10, rng.stream("drug_classes"))),
+            er_utilization=er.er_utilization(),
+            er_top_diagnoses=er.top_diagnoses(5),
+            chronic_condition_compliance=MockDataGenerator.generate_chronic_condition_compliance(
+                rng.stream("chronic_condition_compliance")
+            ),
+            preventive_screenings=MockDataGenerator.generate_preventive_screenings(
+                rng.stream("preventive_screenings")
+            )
         )
 
 
@@ -1384,17 +1552,183 @@ VISUALIZATION_MAPPING = {
 
 
 # ============================================================================
-# MAIN EXECUTION
+# COMMAND LINE
 # ============================================================================
 
-if __name__ == "__main__":
+# Defaults shared by the mock, validate and bench subcommands
+DEFAULT_OUTPUT_DIR = Path("./data_templates")
+DEFAULT_CLAIM_LINES = 36000
+LINES_PER_MEMBER = 30               # Claim lines per simulated member (36,000 / 1,200)
+
+# Output formats accepted by each subcommand (first is the default)
+COMMAND_FORMATS = {
+    "templates": ["csv"],
+    "mock": ["csv", "json", "npy", "arrow"],
+    "validate": ["text", "json"],
+    "mapping": ["json"],
+    "bench": ["json"],
+}
+
+# compression.CODECS, repeated so building the parser does not import gzip
+COMPRESSION_CHOICES = ["none", "gzip", "zstd", "lz4"]
+
+
+def _json_default(value: Any) -> Any:
+    """json.dump fallback for enums in dataclass output"""
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _claim_line_count(value: str) -> int:
+    """--scale type: '1e6' -> 1000000; rejects negative counts"""
+    import argparse
+    try:
+        count = int(float(value))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a row count, got {value!r}")
+    if count < 0:
+        raise argparse.ArgumentTypeError(f"row count must be non-negative, got {value!r}")
+    return count
+
+
+def _bench_cases(value: str) -> List[str]:
+    """--cases type; imports benchmark (and NumPy) only when --cases is given"""
+    from benchmark import parse_cases
+    return parse_cases(value)
+
+
+def _bench_scales(value: str) -> List[int]:
+    """--scales type; imports benchmark (and NumPy) only when --scales is given"""
+    from benchmark import parse_scales
+    return parse_scales(value)
+
+
+def _mock_data(args) -> Optional[CompleteDashboardData]:
+    """
+    Generates the dashboard for --scale claim lines and --seed (imports NumPy)
+
+    Returns:
+        The dataset, or None after printing an error if --icd10-catalog cannot be opened
+    """
+    from rng_context import RNGContext
+    catalog = None
+    if args.icd10_catalog is not None:
+        from icd10_catalog import ICD10Catalog
+        try:
+            catalog = ICD10Catalog.open(args.icd10_catalog)
+        except (OSError, ValueError) as e:
+            print(f"✗ Cannot open ICD-10 catalog {args.icd10_catalog}: {e}")
+            return None
+    return MockDataGenerator.generate_complete_dashboard_data(
+        member_count=max(args.scale // LINES_PER_MEMBER, 1),
+        claim_line_count=args.scale,
+        rng=RNGContext(args.seed),
+        catalog=catalog
+    )
+
+
+def _command_templates(args) -> int:
+    CSVTemplateGenerator.generate_all_templates(args.output, args.only, args.force)
+    return 0
+
+
+def _command_mapping(args) -> int:
+    args.output.mkdir(parents=True, exist_ok=True)
+    mapping_path = args.output / "visualization_mapping.json"
+    with open(mapping_path, 'w', encoding='utf-8') as f:
+        json.dump(VISUALIZATION_MAPPING, f, indent=2)
+    print(f"✓ Visualization mapping saved to: {mapping_path}")
+    return 0
+
+
+def _command_mock(args) -> int:
+    if args.format not in ("csv", "json") and args.compress != "none":
+        print(f"✗ --compress applies to csv and json output, not {args.format}")
+        return 2
+
+    data = _mock_data(args)
+    if data is None:
+        return 2
+    # Writers raise ValueError when a format or codec needs a package that is not installed
+    try:
+        if args.format == "csv":
+            from csv_stream import write_dashboard_csvs
+            write_dashboard_csvs(data, args.output, compression=args.compress, level=args.level)
+        elif args.format == "json":
+            from dataclasses import asdict
+            from compression import compressed_path, open_text_output
+            args.output.mkdir(parents=True, exist_ok=True)
+            output_path = compressed_path(args.output / "dashboard_data.json", args.compress)
+            with open_text_output(output_path, args.compress, args.level) as f:
+                json.dump(asdict(data), f, indent=2, default=_json_default)
+            print(f"✓ Mock data saved to: {output_path}")
+        else:
+            from columnar_io import write_dashboard
+            manifest = write_dashboard(data, args.output, args.format)
+            print(f"✓ Mock data saved to: {manifest}")
+    except ValueError as e:
+        print(f"✗ {e}")
+        return 2
+    return 0
+
+
+def _command_validate(args) -> int:
+    data = _mock_data(args)
+    if data is None:
+        return 2
+    is_valid, errors = data.validate_all()
+    report = data.validate_rows()
+    messages = errors + report.messages()
+
+    if args.format == "json":
+        args.output.mkdir(parents=True, exist_ok=True)
+        output_path = args.output / "validation_report.json"
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "is_valid": is_valid and report.is_valid,
+                "rows_checked": report.rows_checked,
+                "rules_checked": report.rules_checked,
+                "errors": messages,
+            }, f, indent=2)
+        print(f"✓ Validation report saved to: {output_path}")
+
+    if is_valid and report.is_valid:
+        print(f"✓ All validation checks passed ({report.rows_checked:,} rows, {report.rules_checked} rules)")
+        return 0
+    print("✗ Validation errors found:")
+    for message in messages:
+        print(f"  - {message}")
+    return 1
+
+
+def _command_bench(args) -> int:
+    from benchmark import compare_results, run_benchmarks, CASES
+
+    report = run_benchmarks(args.cases or list(CASES), args.scales or [args.scale], args.seed)
+    args.output.mkdir(parents=True, exist_ok=True)
+    output_path = args.output / "benchmark_results.json"
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"✓ Results saved to: {output_path}")
+
+    if args.compare is not None:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            regressions = compare_results(report, json.load(f))
+        for message in regressions:
+            print(f"✗ {message}")
+        return 1 if regressions else 0
+    return 0
+
+
+def _command_all(args) -> int:
+    """Templates, mock data, validation and mapping in one run (no subcommand)"""
     print("=" * 80)
     print("Healthcare Analytics Data Template Generator")
     print("=" * 80)
     print()
 
-    # Create output directory
-    output_dir = Path("./data_templates")
+    output_dir = args.output
 
     # Generate CSV templates
     print("Generating CSV templates...")
@@ -1420,10 +1754,7 @@ if __name__ == "__main__":
 
     # Save visualization mapping
     print("Saving visualization mapping...")
-    mapping_path = output_dir / "visualization_mapping.json"
-    with open(mapping_path, 'w', encoding='utf-8') as f:
-        json.dump(VISUALIZATION_MAPPING, f, indent=2)
-    print(f"✓ Visualization mapping saved to: {mapping_path}")
+    _command_mapping(args)
     print()
 
     # Print summary statistics
@@ -1448,3 +1779,104 @@ if __name__ == "__main__":
     print("=" * 80)
     print("Templates and mappings saved to:", output_dir.absolute())
     print("=" * 80)
+    return 0 if is_valid else 1
+
+
+COMMANDS = {
+    "templates": _command_templates,
+    "mock": _command_mock,
+    "validate": _command_validate,
+    "mapping": _command_mapping,
+    "bench": _command_bench,
+}
+
+
+def build_parser():
+    """
+    Argument parser for the generator CLI
+
+    Only argparse is imported here; NumPy and the companion modules are
+    imported inside the subcommands that use them, so templates and mapping
+    start as fast as the interpreter.
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Generate CSV templates, mock data and mappings "
+                    "(no subcommand runs templates, mock, validate and mapping)"
+    )
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT_DIR, help="Output directory")
+    parser.add_argument("--trace", type=Path, default=None,
+                        help="Record per-stage spans; writes trace.json and trace.chrome.json here")
+    parser.add_argument("--trace-memory", action="store_true", help="Include tracemalloc deltas in the trace")
+    parser.add_argument("--profile", action="store_true", help="Also dump cProfile stats per top-level stage")
+    subparsers = parser.add_subparsers(dest="command")
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--output", type=Path, default=argparse.SUPPRESS, help="Output directory")
+    common.add_argument("--scale", type=_claim_line_count, default=DEFAULT_CLAIM_LINES,
+                        help="Simulated claim lines (members = scale / 30)")
+    common.add_argument("--seed", type=int, default=None, help="Seed for reproducible output")
+    common.add_argument("--icd10-catalog", type=Path, default=None, metavar="DIR",
+                        help="ICD-10 catalog built by icd10_catalog.py (default: the built-in 18 codes)")
+
+    helps = {
+        "templates": "Write empty CSV templates",
+        "mock": "Generate a mock dashboard dataset",
+        "validate": "Generate mock data and run every validation rule",
+        "mapping": "Write the visualization mapping JSON",
+        "bench": "Run the generator benchmark suite",
+    }
+    for name, formats in COMMAND_FORMATS.items():
+        command = subparsers.add_parser(name, parents=[common], help=helps[name])
+        command.add_argument("--format", choices=formats, default=formats[0], help="Output format")
+
+    subparsers.choices["templates"].add_argument("--only", nargs="+", choices=list(TEMPLATE_REGISTRY),
+                                                 default=None, metavar="FILE",
+                                                 help="Template files to write (e.g. monthly_costs.csv)")
+    subparsers.choices["templates"].add_argument("--force", action="store_true",
+                                                 help="Rewrite templates even when the manifest says they are current")
+    mock = subparsers.choices["mock"]
+    mock.add_argument("--compress", choices=COMPRESSION_CHOICES, default="none",
+                      help="Compress csv/json output while streaming (zstd and lz4 need their packages)")
+    mock.add_argument("--level", type=int, default=None, help="Compression level (default: per codec)")
+    bench = subparsers.choices["bench"]
+    bench.add_argument("--scales", type=_bench_scales, default=None,
+                       help="Comma-separated row counts (default: --scale)")
+    bench.add_argument("--cases", type=_bench_cases, default=None,
+                       help="Comma-separated benchmark cases (default: all)")
+    bench.add_argument("--compare", type=Path, default=None, help="Baseline JSON to compare against")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Runs the CLI; returns the process exit code"""
+    args = build_parser().parse_args(argv)
+    if args.command is None:
+        args.format = "csv"
+    command = COMMANDS.get(args.command, _command_all)
+
+    if args.trace is None:
+        return command(args)
+
+    from profiling import tracing
+    with tracing(args.trace_memory, args.trace / "profiles" if args.profile else None) as tracer:
+        status = command(args)
+
+    print()
+    for stage in tracer.summary()[:10]:
+        rows = f", {stage['rows']:,} rows" if stage['rows'] is not None else ""
+        print(f"  {stage['name']}: {stage['seconds']:.3f}s ({stage['count']} calls{rows})")
+    for path in tracer.write(args.trace):
+        print(f"✓ Trace saved to: {path}")
+    return status
+
+
+# ============================================================================
+# MAIN EXECUTION
+# ============================================================================
+
+if __name__ == "__main__":
+    # Companion modules import this one by name; share this copy with them
+    sys.modules.setdefault("data_template_generator", sys.modules[__name__])
+    sys.exit(main())
@@ -0,0 +1,638 @@
+"""
+Database Bulk Loader
+====================
+
+Seeds the init-db.sql tables experience_data, high_cost_claimants and
+monthly_summaries from simulated claims.
+
+Three load paths share the same row producers:
+- PostgreSQL: a psql script of COPY ... FROM STDIN blocks (CSV format), one
+  transaction per table, or the raw COPY stream for a driver's copy API
+- SQLite stand-in: equivalent tables filled with batched executemany calls,
+  one transaction per table
+- Upload route: experience and claimant CSVs in the headers
+  app/api/upload/route.ts expects, sharded to its 50MB / 5-file limits
+
+Each table's transaction first deletes the user's existing rows, so
+re-seeding a user replaces its data instead of failing on UNIQUE(user_id, month).
+
+Usage:
+    python scripts/db_loader.py --members 1000000 --claim-lines 3000000 \\
+        --copy-output seed.sql --sqlite seed.db
+    python scripts/db_loader.py --members 5000000 --upload-shards ./upload
+
+    psql "$DATABASE_URL" -f seed.sql
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import repeat
+from pathlib import Path
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+import argparse
+import csv
+import io
+import sqlite3
+import time
+
+import numpy as np
+
+from aggregation import PLAN_MONTHS, ClaimAggregates
+from claims_simulator import PLACE_OF_SERVICE_CATEGORIES, ClaimLines, ClaimsSimulator
+from compression import open_text_output
+from csv_stream import DEFAULT_CHUNK_SIZE, UPLOAD_MAX_BYTES, ProgressReporter, write_csv_shards
+from data_template_generator import (
+    BudgetVsActuals,
+    MockDataGenerator,
+    MonthlyCostSummary,
+    PlaceOfService,
+    PlanInfo,
+)
+from rng_context import RNGContext, resolve_rng
+
+
+# Demo user inserted by init-db.sql
+DEMO_USER_ID = '00000000-0000-0000-0000-000000000001'
+
+# Rows per executemany call on the SQLite path
+DEFAULT_BATCH_SIZE = 50_000
+
+# dashboard_configs.target_loss_ratio default
+DEFAULT_TARGET_LOSS_RATIO = 0.85
+
+# Bounds of DECIMAL(5, 2) risk_score
+MAX_RISK_SCORE = 999.99
+
+# Age range of simulated claimants (inclusive)
+CLAIMANT_AGE_RANGE = (18, 64)
+
+
+# ============================================================================
+# TABLE COLUMNS (init-db.sql; id and timestamps use their defaults)
+# ============================================================================
+
+EXPERIENCE_AMOUNT_COLUMNS = [
+    'domestic_medical_ip',
+    'domestic_medical_op',
+    'non_domestic_medical',
+    'prescription_drugs',
+    'dental',
+    'vision',
+    'mental_health',
+    'preventive_care',
+    'emergency_room',
+    'urgent_care',
+    'specialty_care',
+    'lab_diagnostic',
+    'physical_therapy',
+    'dme',
+    'home_health',
+]
+
+EXPERIENCE_DATA_COLUMNS = ['user_id', 'month'] + EXPERIENCE_AMOUNT_COLUMNS + ['enrollment']
+
+HIGH_COST_CLAIMANT_COLUMNS = [
+    'user_id',
+    'member_id',
+    'age',
+    'gender',
+    'primary_diagnosis_code',
+    'primary_diagnosis_description',
+    'total_paid_amount',
+    'claim_count',
+    'enrollment_months',
+    'risk_score',
+]
+
+MONTHLY_SUMMARY_COLUMNS = [
+    'user_id',
+    'month',
+    'claims',
+    'fees',
+    'premiums',
+    'total_cost',
+    'monthly_loss_ratio',
+    'rolling_12_loss_ratio',
+    'variance',
+    'member_months',
+    'pmpm',
+]
+
+# Headers the upload route's parsers expect (lib/utils/csvParser.ts) per column
+UPLOAD_HEADERS = {
+    'month': 'Month',
+    'domestic_medical_ip': 'Domestic_Medical_IP',
+    'domestic_medical_op': 'Domestic_Medical_OP',
+    'non_domestic_medical': 'Non_Domestic_Medical',
+    'prescription_drugs': 'Prescription_Drugs',
+    'dental': 'Dental',
+    'vision': 'Vision',
+    'mental_health': 'Mental_Health',
+    'preventive_care': 'Preventive_Care',
+    'emergency_room': 'Emergency_Room',
+    'urgent_care': 'Urgent_Care',
+    'specialty_care': 'Specialty_Care',
+    'lab_diagnostic': 'Lab_Diagnostic',
+    'physical_therapy': 'Physical_Therapy',
+    'dme': 'DME',
+    'home_health': 'Home_Health',
+    'enrollment': 'Enrollment',
+    'member_id': 'Member_ID',
+    'age': 'Age',
+    'gender': 'Gender',
+    'primary_diagnosis_code': 'Primary_Diagnosis_Code',
+    'primary_diagnosis_description': 'Primary_Diagnosis_Description',
+    'total_paid_amount': 'Total_Paid_Amount',
+    'claim_count': 'Claim_Count',
+    'enrollment_months': 'Enrollment_Months',
+    'risk_score': 'Risk_Score',
+}
+
+# experience_data column receiving each place of service's paid amount
+EXPERIENCE_COLUMN_BY_PLACE = {
+    PlaceOfService.OUTPATIENT_PROCEDURES: 'domestic_medical_op',
+    PlaceOfService.INPATIENT_HOSPITAL: 'domestic_medical_ip',
+    PlaceOfService.DRUGS: 'prescription_drugs',
+    PlaceOfService.IMMEDIATE_ATTENTION: 'emergency_room',
+    PlaceOfService.TESTING: 'lab_diagnostic',
+    PlaceOfService.OFFICE_CLINIC: 'specialty_care',
+    PlaceOfService.SUBSTANCE_ABUSE: 'mental_health',
+    PlaceOfService.MENTAL_HEALTH: 'mental_health',
+    PlaceOfService.PREGNANCY: 'domestic_medical_ip',
+    PlaceOfService.RECOVERY: 'physical_therapy',
+}
+
+# SQLite stand-ins for the PostgreSQL DDL (UUID -> TEXT, DECIMAL -> NUMERIC).
+# id keeps a random default but no primary key index: inserting random keys
+# into a B-tree costs more than the rest of the load combined
+_SQLITE_ID = "id TEXT NOT NULL DEFAULT (lower(hex(randomblob(16))))"
+_SQLITE_TIMESTAMPS = ("created_at TEXT DEFAULT CURRENT_TIMESTAMP,\n"
+                      "  updated_at TEXT DEFAULT CURRENT_TIMESTAMP")
+
+SQLITE_SCHEMA = {
+    'experience_data': f"""
+CREATE TABLE IF NOT EXISTS experience_data (
+  {_SQLITE_ID},
+  user_id TEXT,
+  month TEXT NOT NULL,
+  {', '.join(f'{column} NUMERIC DEFAULT 0' for column in EXPERIENCE_AMOUNT_COLUMNS)},
+  enrollment INTEGER NOT NULL,
+  {_SQLITE_TIMESTAMPS},
+  UNIQUE(user_id, month)
+)""",
+    'high_cost_claimants': f"""
+CREATE TABLE IF NOT EXISTS high_cost_claimants (
+  {_SQLITE_ID},
+  user_id TEXT,
+  member_id TEXT NOT NULL,
+  age INTEGER NOT NULL,
+  gender TEXT CHECK (gender IN ('M', 'F')),
+  primary_diagnosis_code TEXT NOT NULL,
+  primary_diagnosis_description TEXT NOT NULL,
+  total_paid_amount NUMERIC NOT NULL,
+  claim_count INTEGER NOT NULL,
+  enrollment_months INTEGER NOT NULL,
+  risk_score NUMERIC NOT NULL,
+  {_SQLITE_TIMESTAMPS}
+)""",
+    'monthly_summaries': f"""
+CREATE TABLE IF NOT EXISTS monthly_summaries (
+  {_SQLITE_ID},
+  user_id TEXT,
+  month TEXT NOT NULL,
+  claims NUMERIC NOT NULL,
+  fees NUMERIC NOT NULL,
+  premiums NUMERIC NOT NULL,
+  total_cost NUMERIC NOT NULL,
+  monthly_loss_ratio NUMERIC NOT NULL,
+  rolling_12_loss_ratio NUMERIC,
+  variance NUMERIC,
+  member_months INTEGER NOT NULL,
+  pmpm NUMERIC NOT NULL,
+  {_SQLITE_TIMESTAMPS},
+  UNIQUE(user_id, month)
+)""",
+}
+
+
+@dataclass
+class TableRows:
+    """Rows bound for one table, produced lazily in chunks"""
+    table: str
+    columns: List[str]
+    user_id: str                            # Owner of every row; existing rows are replaced
+    chunks: Iterable[List[Tuple[Any, ...]]]  # Consumed once
+
+
+@dataclass
+class LoadStats:
+    """Summary of one table's load"""
+    table: str
+    rows: int
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+
+# ============================================================================
+# ROW PRODUCERS
+# ============================================================================
+
+class MemberClaimSummary:
+    """
+    Per-member claim counts and paid amount by diagnosis
+
+    Complements ClaimAggregates (which keeps member totals) with what
+    high_cost_claimants needs; fed the same chunks in the same pass.
+    """
+
+    def __init__(self, member_count: int, diagnosis_count: int):
+        self.claim_counts = np.zeros(member_count, dtype=np.int64)
+        self.diagnosis_paid = np.zeros((member_count, diagnosis_count), dtype=np.float64)
+
+    def add(self, claim_lines: ClaimLines) -> None:
+        """Folds a chunk of claim lines into the accumulators"""
+        members, diagnoses = self.diagnosis_paid.shape
+        self.claim_counts += np.bincount(claim_lines.member_index, minlength=members)
+        key = claim_lines.member_index.astype(np.int64) * diagnoses + claim_lines.icd10_index
+        self.diagnosis_paid += np.bincount(key, weights=claim_lines.paid_amount,
+                                           minlength=self.diagnosis_paid.size).reshape(members, diagnoses)
+
+
+def _plan_month(month: str, year: int) -> str:
+    """'April', 2024 -> '2024-04'"""
+    return datetime.strptime(f"{month} {year}", '%B %Y').strftime('%Y-%m')
+
+
+def experience_data_rows(aggregates: ClaimAggregates, user_id: str = DEMO_USER_ID) -> TableRows:
+    """
+    One experience_data row per covered plan month
+
+    Place-of-service paid amounts are summed into the experience_data
+    columns via EXPERIENCE_COLUMN_BY_PLACE; unmapped columns stay zero.
+    """
+    mapping = np.zeros((len(PLACE_OF_SERVICE_CATEGORIES), len(EXPERIENCE_AMOUNT_COLUMNS)))
+    for i, category in enumerate(PLACE_OF_SERVICE_CATEGORIES):
+        mapping[i, EXPERIENCE_AMOUNT_COLUMNS.index(EXPERIENCE_COLUMN_BY_PLACE[category])] = 1.0
+    amounts = np.round(aggregates.paid_cube.sum(axis=2) @ mapping, 2)
+
+    start_month = aggregates.plan_start.astype('datetime64[M]')
+    rows = [
+        (user_id, str(start_month + i), *amounts[i].tolist(), int(aggregates.member_enrollment[i]))
+        for i in range(aggregates.months)
+    ]
+    return TableRows('experience_data', EXPERIENCE_DATA_COLUMNS, user_id, [rows])
+
+
+def monthly_summary_rows(monthly_costs: List[MonthlyCostSummary], budget: List[BudgetVsActuals],
+                         user_id: str = DEMO_USER_ID,
+                         target_loss_ratio: float = DEFAULT_TARGET_LOSS_RATIO) -> TableRows:
+    """
+    One monthly_summaries row per month of the dashboard's budget table
+
+    claims and fees are the budget table's actuals and premiums its budget;
+    the rolling ratio covers the plan months up to and including each row
+    (at most PLAN_MONTHS).
+    """
+    rows = []
+    totals, premiums = [], []
+    for costs, month in zip(monthly_costs, budget):
+        total_cost = month.claims_actual + month.fixed_costs_actual
+        totals.append(total_cost)
+        premiums.append(month.budget_total)
+        loss_ratio = total_cost / month.budget_total if month.budget_total else 0.0
+        rolling_premiums = sum(premiums[-PLAN_MONTHS:])
+        rolling = sum(totals[-PLAN_MONTHS:]) / rolling_premiums if rolling_premiums else None
+
+        rows.append((
+            user_id,
+            _plan_month(month.month, month.year),
+            round(month.claims_actual, 2),
+            round(month.fixed_costs_actual, 2),
+            round(month.budget_total, 2),
+            round(total_cost, 2),
+            round(loss_ratio, 4),
+            round(rolling, 4) if rolling is not None else None,
+            round((loss_ratio - target_loss_ratio) / target_loss_ratio, 4),
+            costs.member_enrollment,
+            round(total_cost / costs.member_enrollment, 2) if costs.member_enrollment else 0.0,
+        ))
+
+    return TableRows('monthly_summaries', MONTHLY_SUMMARY_COLUMNS, user_id, [rows])
+
+
+def high_cost_claimant_rows(aggregates: ClaimAggregates, summary: MemberClaimSummary,
+                            enrollment_months: np.ndarray, user_id: str = DEMO_USER_ID,
+                            rng: Optional[RNGContext] = None, min_total_paid: float = 0.0,
+                            chunk_size: int = DEFAULT_CHUNK_SIZE) -> TableRows:
+    """
+    high_cost_claimants rows for every member paid at least min_total_paid
+
+    Args:
+        aggregates: Member totals for the plan year
+        summary: Claim counts and diagnosis amounts from the same claim lines
+        enrollment_months: Months enrolled per roster member (MemberRoster.term_month)
+        user_id: Owner of the rows
+        rng: Random stream for age and gender, which claims do not carry
+        min_total_paid: Annual plan payment threshold; members without
+                        claims are always excluded
+        chunk_size: Rows formatted per chunk
+
+    Returns:
+        TableRows in roster order; risk_score is the member's total relative
+        to the mean claimant total
+    """
+    rng = resolve_rng(rng).generator
+    totals = aggregates.member_totals
+    member_count = len(totals)
+
+    # Drawn for the whole roster so a member's values ignore the threshold
+    low, high = CLAIMANT_AGE_RANGE
+    ages = rng.integers(low, high, member_count, endpoint=True)
+    genders = np.where(rng.random(member_count) < 0.5, 'M', 'F')
+
+    claimants = totals > 0
+    mean_total = totals[claimants].mean() if claimants.any() else 0.0
+    selected = np.flatnonzero(claimants & (totals >= min_total_paid))
+
+    catalog = aggregates.catalog
+
+    def chunks() -> Iterator[List[Tuple[Any, ...]]]:
+        for start in range(0, len(selected), chunk_size):
+            idx = selected[start:start + chunk_size]
+            # Primary diagnosis: the ICD-10 code with the member's largest paid amount
+            primary = summary.diagnosis_paid[idx].argmax(axis=1)
+            risk = np.minimum(np.round(totals[idx] / mean_total, 2), MAX_RISK_SCORE)
+            yield list(zip(
+                repeat(user_id),
+                np.char.add('M', aggregates.member_ids[idx].astype(str)).tolist(),
+                ages[idx].tolist(),
+                genders[idx].tolist(),
+                catalog.display_codes[primary].tolist(),
+                [catalog.description(i) for i in primary.tolist()],
+                np.round(totals[idx], 2).tolist(),
+                summary.claim_counts[idx].tolist(),
+                enrollment_months[idx].tolist(),
+                risk.tolist(),
+            ))
+
+    return TableRows('high_cost_claimants', HIGH_COST_CLAIMANT_COLUMNS, user_id, chunks())
+
+
+# ============================================================================
+# POSTGRESQL COPY
+# ============================================================================
+
+def copy_statement(table: str, columns: List[str]) -> str:
+    """COPY command matching the CSV stream from iter_copy_data"""
+    return f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+
+
+def iter_copy_data(rows: TableRows) -> Iterator[str]:
+    """
+    COPY CSV data for a table, one string per row chunk
+
+    None is written as an unquoted empty field, which COPY reads as NULL.
+    Suitable for a driver's copy API (e.g. psycopg's cursor.copy(...).write).
+    """
+    for chunk in rows.chunks:
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator='\n').writerows(chunk)
+        yield buffer.getvalue()
+
+
+def write_copy_script(output_path: Path, tables: List[TableRows], compression: Optional[str] = None,
+                      level: Optional[int] = None) -> List[LoadStats]:
+    """
+    Writes a psql script that loads each table in its own transaction
+
+    Each block deletes the user's existing rows, then streams the data
+    inline after COPY ... FROM STDIN, terminated by '\\.'. A compressed
+    script (e.g. seed.sql.gz) is piped into psql: gunzip -c seed.sql.gz | psql
+
+    Args:
+        output_path: Destination .sql path (run with psql -f)
+        tables: Row producers, consumed once
+        compression: "gzip", "zstd", "lz4" or "none"; None infers it from the suffix
+        level: Compression level; None for the codec default
+
+    Returns:
+        LoadStats per table (time spent producing and writing its rows)
+    """
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    stats = []
+    with open_text_output(output_path, compression, level) as f:
+        for rows in tables:
+            started = time.perf_counter()
+            f.write("BEGIN;\n")
+            user_id = rows.user_id.replace("'", "''")
+            f.write(f"DELETE FROM {rows.table} WHERE user_id = '{user_id}';\n")
+            f.write(copy_statement(rows.table, rows.columns) + ";\n")
+            count = 0
+            for data in iter_copy_data(rows):
+                f.write(data)
+                count += data.count('\n')
+            f.write("\\.\nCOMMIT;\n\n")
+            stats.append(LoadStats(rows.table, count, time.perf_counter() - started))
+
+    return stats
+
+
+# ============================================================================
+# SQLITE STAND-IN
+# ============================================================================
+
+def _batches(chunks: Iterable[List[Tuple[Any, ...]]], batch_size: int) -> Iterator[List[Tuple[Any, ...]]]:
+    """Re-slices row chunks into executemany batches of at most batch_size"""
+    for chunk in chunks:
+        for start in range(0, len(chunk), batch_size):
+            yield chunk[start:start + batch_size]
+
+
+def load_sqlite(db_path: Path, tables: List[TableRows],
+                batch_size: int = DEFAULT_BATCH_SIZE) -> List[LoadStats]:
+    """
+    Loads tables into a SQLite stand-in database
+
+    Tables are created from SQLITE_SCHEMA if missing. Each table is loaded in
+    a single transaction: the user's existing rows are deleted, then rows are
+    inserted with executemany in batches. A failure rolls the table back.
+
+    Args:
+        db_path: SQLite database file (created if missing)
+        tables: Row producers, consumed once
+        batch_size: Rows per executemany call
+
+    Returns:
+        LoadStats per table
+    """
+    if batch_size <= 0:
+        raise ValueError(f"batch_size must be positive, got {batch_size}")
+
+    db_path = Path(db_path)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    connection = sqlite3.connect(db_path, isolation_level=None)
+    stats = []
+    try:
+        for rows in tables:
+            started = time.perf_counter()
+            connection.execute(SQLITE_SCHEMA[rows.table])
+            insert = (f"INSERT INTO {rows.table} ({', '.join(rows.columns)}) "
+                      f"VALUES ({', '.join('?' * len(rows.columns))})")
+
+            count = 0
+            connection.execute("BEGIN")
+            try:
+                connection.execute(f"DELETE FROM {rows.table} WHERE user_id = ?", (rows.user_id,))
+                for batch in _batches(rows.chunks, batch_size):
+                    connection.executemany(insert, batch)
+                    count += len(batch)
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            stats.append(LoadStats(rows.table, count, time.perf_counter() - started))
+    finally:
+        connection.close()
+
+    return stats
+
+
+# ============================================================================
+# UPLOAD ROUTE SHARDS
+# ============================================================================
+
+def write_upload_shards(output_dir: Path, tables: List[TableRows], max_bytes: int = UPLOAD_MAX_BYTES,
+                        max_rows: Optional[int] = None) -> List[LoadStats]:
+    """
+    Writes tables as upload-route CSVs, sharded to fit its limits
+
+    Columns are renamed to UPLOAD_HEADERS and user_id is dropped (the route
+    assigns rows to the signed-in user). Tables with columns the route does
+    not accept (monthly_summaries) are skipped. Each table gets
+    <table>.part-NNNNN.csv shards and a <table>.shards.json manifest; see
+    csv_stream.write_csv_shards.
+
+    Args:
+        output_dir: Directory for shards and manifests
+        tables: Row producers, consumed once
+        max_bytes: Size limit per shard file
+        max_rows: Optional data row limit per shard
+
+    Returns:
+        LoadStats per table written
+    """
+    stats = []
+    for rows in tables:
+        keep = [i for i, column in enumerate(rows.columns) if column != 'user_id']
+        if any(rows.columns[i] not in UPLOAD_HEADERS for i in keep):
+            continue
+
+        header = [UPLOAD_HEADERS[rows.columns[i]] for i in keep]
+        chunks = ([tuple(row[i] for i in keep) for row in chunk] for chunk in rows.chunks)
+        result = write_csv_shards(output_dir, rows.table, header, chunks, max_bytes, max_rows,
+                                  progress=ProgressReporter(rows.table, stream=None))
+        stats.append(LoadStats(rows.table, result.rows, result.seconds))
+        print(f"  ✓ {rows.table}: {len(result.shards)} shards -> {result.output_path}")
+
+    return stats
+
+
+# ============================================================================
+# SEEDING
+# ============================================================================
+
+def seed_tables(member_count: int, claim_line_count: int, user_id: str = DEMO_USER_ID,
+                rng: Optional[RNGContext] = None, plan_info: Optional[PlanInfo] = None,
+                min_total_paid: float = 0.0,
+                chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[TableRows]:
+    """
+    Simulates a plan year and returns row producers for all three tables
+
+    Claim lines are generated in chunks and folded into ClaimAggregates and a
+    MemberClaimSummary in one pass. The monthly rows use the same named
+    streams as MockDataGenerator.generate_complete_dashboard_data, so a seed
+    gives the same months as the dashboard generator.
+
+    Args:
+        member_count: Simulated roster size (upper bound on claimant rows)
+        claim_line_count: Claim lines to simulate
+        user_id: Owner of every row
+        rng: Random stream for the simulation
+        plan_info: Plan year; defaults to the dashboard sample plan
+        min_total_paid: high_cost_claimants threshold on annual plan payment
+        chunk_size: Claim lines simulated per chunk
+    """
+    if plan_info is None:
+        plan_info = PlanInfo(
+            client_name="Sample Healthcare Plan",
+            plan_start_date="2024-04-01",
+            plan_end_date="2025-03-31"
+        )
+    rng = resolve_rng(rng)
+    simulator = ClaimsSimulator(member_count, plan_info.plan_start_date, rng.stream("claims"))
+    roster = simulator.simulate_roster()
+
+    aggregates = ClaimAggregates.empty(roster.member_ids, simulator.plan_start, roster.member_enrollment)
+    summary = MemberClaimSummary(member_count, len(aggregates.catalog))
+    for start in range(0, claim_line_count, chunk_size):
+        chunk = simulator.simulate_lines(roster, min(chunk_size, claim_line_count - start))
+        aggregates.add(chunk)
+        summary.add(chunk)
+
+    data = MockDataGenerator.build_dashboard_data(aggregates, plan_info, rng)
+    return [
+        experience_data_rows(aggregates, user_id),
+        high_cost_claimant_rows(aggregates, summary, roster.term_month, user_id,
+                                rng.stream("claimant_demographics"), min_total_paid, chunk_size),
+        monthly_summary_rows(data.monthly_costs, data.budget_vs_actuals, user_id),
+    ]
+
+
+def _report(stats: List[LoadStats], target: Path) -> None:
+    for table in stats:
+        print(f"  ✓ {table.table}: {table.rows:,} rows ({table.rows_per_second:,.0f} rows/sec)")
+    print(f"✓ Loaded {sum(s.rows for s in stats):,} rows into {target}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seed experience, claimant and summary tables")
+    parser.add_argument("--members", type=int, default=1200, help="Simulated roster size")
+    parser.add_argument("--claim-lines", type=int, default=36000, help="Claim lines to simulate")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for reproducible output")
+    parser.add_argument("--user-id", default=DEMO_USER_ID, help="users.id owning the rows")
+    parser.add_argument("--min-total-paid", type=float, default=0.0,
+                        help="Annual plan payment threshold for high_cost_claimants")
+    parser.add_argument("--copy-output", type=Path, default=None,
+                        help="psql COPY script to write (.gz/.zst/.lz4 to compress)")
+    parser.add_argument("--sqlite", type=Path, default=None, help="SQLite stand-in database to load")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help="Rows per executemany call (SQLite)")
+    parser.add_argument("--upload-shards", type=Path, default=None,
+                        help="Directory for upload-route CSV shards and manifests")
+    parser.add_argument("--shard-bytes", type=int, default=UPLOAD_MAX_BYTES,
+                        help="Maximum bytes per shard (default: the 50MB upload limit)")
+    parser.add_argument("--shard-rows", type=int, default=None, help="Maximum data rows per shard")
+    args = parser.parse_args()
+
+    if args.copy_output is None and args.sqlite is None and args.upload_shards is None:
+        parser.error("pass --copy-output, --sqlite and/or --upload-shards")
+
+    rng = RNGContext(args.seed)
+    targets = [(path, loader) for path, loader in (
+        (args.copy_output, write_copy_script),
+        (args.sqlite, lambda path, tables: load_sqlite(path, tables, args.batch_size)),
+        (args.upload_shards,
+         lambda path, tables: write_upload_shards(path, tables, args.shard_bytes, args.shard_rows)),
+    ) if path is not None]
+
+    for path, loader in targets:
+        # Row producers are single-use; a fixed seed reproduces them per target
+        started = time.perf_counter()
+        tables = seed_tables(args.members, args.claim_lines, args.user_id, rng, min_total_paid=args.min_total_paid)
+        _report(loader(path, tables), path)
+        print(f"  ({time.perf_counter() - started:.2f}s including simulation)")
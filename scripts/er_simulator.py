@@ -0,0 +1,315 @@
+"""
+ER Visit Simulator
+==================
+
+NumPy-backed generator of individual emergency room visits, and the counting
+kernel that rolls them up into the ERUtilization and ERTopDiagnosis panels.
+
+Each visit carries:
+- member (index into the simulated roster, shared with ClaimsSimulator)
+- visit date
+- ER category (index into ER_CATEGORIES)
+- primary diagnosis (index into ER_DIAGNOSIS_NAMES)
+
+Category and diagnosis are drawn together from one alias table over every
+(category, diagnosis) pair, so a visit costs two uniforms whatever the size
+of the diagnosis list. One np.bincount over a category x diagnosis key then
+yields both the category counts and the top diagnoses.
+
+Usage:
+    python scripts/er_simulator.py --visits 5e6 --members 1000000 --seed 7 --output er_visits.csv.gz
+
+    er = aggregate_er_visits(ERSimulator(1_000_000, rng=RNGContext(7)).iter_chunks(5_000_000))
+    er.er_utilization()
+    er.top_diagnoses(5)
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+import sys
+
+import numpy as np
+
+from aggregation import top_k_indices
+from claims_simulator import (
+    MemberRoster,
+    RosterEventSimulator,
+    event_argument_parser,
+    fold_chunks,
+    run_event_cli,
+    write_event_chunks_csv,
+)
+from csv_stream import DEFAULT_CHUNK_SIZE, StreamStats
+from data_template_generator import ERCategory, ERTopDiagnosis, ERUtilization
+from icd10_catalog import AliasTable
+from rng_context import RNGContext
+
+
+# ============================================================================
+# SIMULATION PARAMETERS
+# ============================================================================
+
+ER_CATEGORIES: List[ERCategory] = list(ERCategory)
+
+# Share of ER visits in each category, in ER_CATEGORIES order
+ER_CATEGORY_SHARE = np.array([
+    0.298,   # All Others
+    0.025,   # Drug Alcohol Psych
+    0.095,   # Injury
+    0.302,   # Non Emergent, Avoidable
+    0.280,   # PCP Treatable
+])
+
+# Primary diagnoses by category, with relative frequency within the category
+ER_DIAGNOSES: List[Tuple[ERCategory, str, float]] = [
+    (ERCategory.ALL_OTHERS, "Neutropenia; unspecified", 104),
+    (ERCategory.ALL_OTHERS, "Hydronephrosis with renal and ureteral calculous obstruction", 101),
+    (ERCategory.ALL_OTHERS, "Atherosclerotic heart disease", 98),
+    (ERCategory.ALL_OTHERS, "Syncope and collapse", 90),
+    (ERCategory.ALL_OTHERS, "Atrial fibrillation; unspecified", 80),
+    (ERCategory.ALL_OTHERS, "Pneumonia; unspecified organism", 78),
+    (ERCategory.ALL_OTHERS, "Sepsis; unspecified organism", 60),
+    (ERCategory.ALL_OTHERS, "Chronic obstructive pulmonary disease with acute exacerbation", 55),
+    (ERCategory.ALL_OTHERS, "Acute kidney failure; unspecified", 45),
+    (ERCategory.ALL_OTHERS, "Hypertensive urgency", 40),
+    (ERCategory.DRUG_ALCOHOL_PSYCH, "Alcohol abuse with intoxication; unspecified", 30),
+    (ERCategory.DRUG_ALCOHOL_PSYCH, "Anxiety disorder; unspecified", 28),
+    (ERCategory.DRUG_ALCOHOL_PSYCH, "Major depressive disorder; single episode; unspecified", 20),
+    (ERCategory.DRUG_ALCOHOL_PSYCH, "Suicidal ideations", 15),
+    (ERCategory.DRUG_ALCOHOL_PSYCH, "Poisoning by opioids; accidental", 10),
+    (ERCategory.DRUG_ALCOHOL_PSYCH, "Bipolar disorder; unspecified", 10),
+    (ERCategory.INJURY, "Sprain of ligament of ankle; unspecified", 60),
+    (ERCategory.INJURY, "Laceration without foreign body of scalp", 50),
+    (ERCategory.INJURY, "Strain of muscle of lower back", 45),
+    (ERCategory.INJURY, "Fracture of lower end of radius; unspecified", 35),
+    (ERCategory.INJURY, "Concussion without loss of consciousness", 30),
+    (ERCategory.INJURY, "Contusion of knee; unspecified", 28),
+    (ERCategory.NON_EMERGENT_AVOIDABLE, "Acute upper respiratory infection; unspecified", 95),
+    (ERCategory.NON_EMERGENT_AVOIDABLE, "Urinary tract infection; site not specified", 92),
+    (ERCategory.NON_EMERGENT_AVOIDABLE, "Acute pharyngitis; unspecified", 88),
+    (ERCategory.NON_EMERGENT_AVOIDABLE, "Headache; unspecified", 86),
+    (ERCategory.NON_EMERGENT_AVOIDABLE, "Low back pain; unspecified", 84),
+    (ERCategory.NON_EMERGENT_AVOIDABLE, "Otitis media; unspecified", 70),
+    (ERCategory.NON_EMERGENT_AVOIDABLE, "Viral infection; unspecified", 68),
+    (ERCategory.NON_EMERGENT_AVOIDABLE, "Acute sinusitis; unspecified", 60),
+    (ERCategory.NON_EMERGENT_AVOIDABLE, "Rash and other nonspecific skin eruption", 55),
+    (ERCategory.NON_EMERGENT_AVOIDABLE, "Disorder of teeth; unspecified", 45),
+    (ERCategory.NON_EMERGENT_AVOIDABLE, "Conjunctivitis; unspecified", 40),
+    (ERCategory.PCP_TREATABLE, "Chest pain; unspecified", 117),
+    (ERCategory.PCP_TREATABLE, "Other chest pain", 101),
+    (ERCategory.PCP_TREATABLE, "Abdominal pain; unspecified", 96),
+    (ERCategory.PCP_TREATABLE, "Fever; unspecified", 60),
+    (ERCategory.PCP_TREATABLE, "Nausea with vomiting; unspecified", 55),
+    (ERCategory.PCP_TREATABLE, "Dizziness and giddiness", 50),
+    (ERCategory.PCP_TREATABLE, "Acute bronchitis; unspecified", 48),
+    (ERCategory.PCP_TREATABLE, "Cellulitis of lower limb; unspecified", 40),
+    (ERCategory.PCP_TREATABLE, "Cough", 35),
+    (ERCategory.PCP_TREATABLE, "Dehydration", 30),
+]
+
+ER_DIAGNOSIS_NAMES = np.array([name for _, name, _ in ER_DIAGNOSES])
+ER_DIAGNOSIS_CATEGORY = np.array([ER_CATEGORIES.index(category) for category, _, _ in ER_DIAGNOSES],
+                                 dtype=np.int8)
+
+# Annual ER visits per 1,000 members (commercial population)
+ER_VISITS_PER_1000 = 180.0
+
+
+def _pair_weights() -> np.ndarray:
+    """Probability of each diagnosis: its category's share times its share within the category"""
+    frequency = np.array([weight for _, _, weight in ER_DIAGNOSES], dtype=np.float64)
+    within = frequency / np.bincount(ER_DIAGNOSIS_CATEGORY, weights=frequency)[ER_DIAGNOSIS_CATEGORY]
+    share = ER_CATEGORY_SHARE / ER_CATEGORY_SHARE.sum()
+    return share[ER_DIAGNOSIS_CATEGORY] * within
+
+
+ER_DIAGNOSIS_ALIAS = AliasTable.build(_pair_weights())
+
+
+# ============================================================================
+# VISIT STORAGE
+# ============================================================================
+
+@dataclass
+class ERVisits:
+    """
+    ER visits stored as parallel NumPy columns
+
+    - er_category: index into ER_CATEGORIES
+    - diagnosis: index into ER_DIAGNOSIS_NAMES
+    """
+    member_index: np.ndarray        # int32, index into the simulated roster
+    visit_date: np.ndarray          # datetime64[D]
+    er_category: np.ndarray         # int8
+    diagnosis: np.ndarray           # int16
+    member_ids: np.ndarray          # uint64 roster IDs, indexed by member_index
+    plan_start: np.datetime64       # First day of the plan year
+
+    def __len__(self) -> int:
+        return len(self.diagnosis)
+
+
+# ============================================================================
+# SIMULATOR
+# ============================================================================
+
+class ERSimulator(RosterEventSimulator):
+    """Generates ER visits in vectorized batches; higher-risk members visit more often"""
+
+    def simulate_events(self, roster: MemberRoster, visit_count: int) -> ERVisits:
+        """Generates visits against an existing roster"""
+        if visit_count < 0:
+            raise ValueError(f"visit_count must be non-negative, got {visit_count}")
+
+        member_index, visit_date = self.claims.draw_members(roster, visit_count)
+        diagnosis = ER_DIAGNOSIS_ALIAS.sample_generator(visit_count, self.rng).astype(np.int16)
+
+        return ERVisits(
+            member_index=member_index,
+            visit_date=visit_date,
+            er_category=ER_DIAGNOSIS_CATEGORY[diagnosis],
+            diagnosis=diagnosis,
+            member_ids=roster.member_ids,
+            plan_start=self.plan_start
+        )
+
+
+# ============================================================================
+# AGGREGATION
+# ============================================================================
+
+@dataclass
+class ERAggregates:
+    """
+    Visit counts per (ER category, diagnosis) accumulated from visits
+
+    One composite key per visit feeds a single np.bincount; category counts
+    and diagnosis counts are the two marginals of the resulting table.
+    """
+    visits: np.ndarray              # int64 [er_category, diagnosis]
+
+    @classmethod
+    def empty(cls) -> "ERAggregates":
+        return cls(visits=np.zeros((len(ER_CATEGORIES), len(ER_DIAGNOSIS_NAMES)), dtype=np.int64))
+
+    @property
+    def visit_count(self) -> int:
+        return int(self.visits.sum())
+
+    def add(self, visits: ERVisits) -> None:
+        """Folds a chunk of visits into the counts"""
+        if not len(visits):
+            return
+
+        key = visits.er_category.astype(np.int64) * len(ER_DIAGNOSIS_NAMES) + visits.diagnosis
+        self.visits += np.bincount(key, minlength=self.visits.size).reshape(self.visits.shape)
+
+    def er_utilization(self) -> List[ERUtilization]:
+        """Visit count per ER category, in ER_CATEGORIES order"""
+        counts = self.visits.sum(axis=1)
+        return [ERUtilization(category, int(counts[c])) for c, category in enumerate(ER_CATEGORIES)]
+
+    def top_diagnoses(self, count: int = 5) -> List[ERTopDiagnosis]:
+        """Most frequent diagnoses, ties by description"""
+        counts = self.visits.sum(axis=0)
+        return [
+            ERTopDiagnosis(str(ER_DIAGNOSIS_NAMES[idx]), int(counts[idx]))
+            for idx in top_k_indices(counts, ER_DIAGNOSIS_NAMES, count)
+        ]
+
+
+def aggregate_er_visits(chunks: Iterable[ERVisits]) -> ERAggregates:
+    """Aggregates a stream of visit chunks (or a one-element list)"""
+    return fold_chunks(ERAggregates.empty(), chunks)
+
+
+def simulate_plan_er_visits(member_enrollment: Sequence[int], plan_start: str = "2024-04-01",
+                            rng: Optional[RNGContext] = None) -> ERAggregates:
+    """
+    ER visits for a plan's enrollment at ER_VISITS_PER_1000
+
+    Args:
+        member_enrollment: Active members per plan month
+        plan_start: First day of the plan year
+        rng: Random stream for the simulator
+
+    Returns:
+        ERAggregates for the simulated visits
+    """
+    enrollment = np.asarray(member_enrollment, dtype=np.int64)
+    member_count = max(int(enrollment.max(initial=0)), 1)
+    visit_count = int(round(enrollment.sum() / 12 * ER_VISITS_PER_1000 / 1000))
+    simulator = ERSimulator(member_count, plan_start, rng)
+    return aggregate_er_visits(simulator.iter_chunks(visit_count))
+
+
+# ============================================================================
+# STREAMING OUTPUT
+# ============================================================================
+
+ER_VISIT_COLUMNS = [
+    'member_id',
+    'visit_date',
+    'er_category',
+    'diagnosis',
+]
+
+ER_CATEGORY_NAMES = np.array([category.value for category in ER_CATEGORIES])
+
+
+def er_visit_rows(visits: ERVisits) -> List[Tuple[Any, ...]]:
+    """Formats a chunk of visits as CSV rows matching ER_VISIT_COLUMNS"""
+    member_ids = np.char.add('M', visits.member_ids[visits.member_index].astype(str))
+
+    return list(zip(
+        member_ids.tolist(),
+        visits.visit_date.astype(str).tolist(),
+        ER_CATEGORY_NAMES[visits.er_category].tolist(),
+        ER_DIAGNOSIS_NAMES[visits.diagnosis].tolist(),
+    ))
+
+
+def write_er_visits_csv(output_path: Path, visit_count: int, member_count: int = 1200,
+                        rng: Optional[RNGContext] = None,
+                        chunk_size: int = DEFAULT_CHUNK_SIZE,
+                        compression: Optional[str] = None,
+                        level: Optional[int] = None,
+                        er: Optional[ERAggregates] = None) -> StreamStats:
+    """
+    Streams simulated ER visits to a CSV file in constant memory
+
+    Args:
+        output_path: Destination CSV path
+        visit_count: Number of visits to write
+        member_count: Size of the simulated roster
+        rng: Random stream for the simulator
+        chunk_size: Visits generated and written per chunk
+        compression: "gzip", "zstd", "lz4" or "none"; None infers it from the suffix
+        level: Compression level; None for the codec default
+        er: Accumulators to fold each chunk into while writing
+
+    Returns:
+        StreamStats for the completed write
+    """
+    chunks = ERSimulator(member_count, rng=rng).iter_chunks(visit_count, chunk_size)
+    return write_event_chunks_csv(output_path, ER_VISIT_COLUMNS, er_visit_rows, chunks, compression, level, er)
+
+
+if __name__ == "__main__":
+    args = event_argument_parser("Simulate ER visits and count them into the ER panels", "visits",
+                                 default_members=1_000_000).parse_args()
+
+    members = args.members
+    er = ERAggregates.empty()
+    seconds = run_event_cli(args, args.visits, ERSimulator(members, rng=RNGContext(args.seed)), er,
+                            ER_VISIT_COLUMNS, er_visit_rows)
+
+    print(f"✓ Simulated and counted {er.visit_count:,} ER visits for {members:,} members in {seconds:.2f}s "
+          f"({er.visit_count / seconds:,.0f} visits/sec)")
+    for row in er.er_utilization():
+        print(f"  {row.er_category.value:<30} {row.visit_count:>12,}")
+    print("  Top diagnoses:")
+    for row in er.top_diagnoses(5):
+        print(f"    {row.diagnosis_description[:60]:<60} {row.visit_count:>10,}")
+    sys.exit(0)
@@ -0,0 +1,441 @@
+"""
+ICD-10 Code Catalog
+===================
+
+Compact, memory-mapped ICD-10 code index with weighted sampling.
+
+- Codes are packed into uint64 keys (up to 7 ASCII characters, dot removed)
+  and found through an open-addressing hash table: O(1) code -> index
+- Descriptions live in one UTF-8 blob addressed by an offsets array, so a
+  70k-code catalog opens instantly and only touched pages are read
+- Sampling uses Walker's alias method (Vose's construction): two uniform
+  draws per code regardless of catalog size
+
+A catalog directory is built once from a CMS code file (icd10cm_codes_YYYY.txt,
+"A000    Cholera due to ...") or a CSV with code and description columns and
+an optional weight column. Without weights every code is equally likely.
+
+Usage:
+    python scripts/icd10_catalog.py build icd10cm_codes_2025.txt --output ./icd10_index
+    python scripts/icd10_catalog.py lookup ./icd10_index E11.9 Z00.00
+
+    catalog = ICD10Catalog.open(Path("./icd10_index"))
+    catalog.lookup("E11.9")                       # description
+    indexes = catalog.sample(5_000_000, rng)      # int32 catalog indexes
+"""
+
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Tuple
+import argparse
+import csv
+import json
+import sys
+import time
+
+import numpy as np
+
+from rng_context import RNGContext, resolve_rng
+
+
+CATALOG_MANIFEST = "catalog.json"
+CATALOG_VERSION = 1
+
+# Array files in a catalog directory
+CATALOG_ARRAYS = ('keys', 'slots', 'description_offsets', 'weights', 'alias_probability', 'alias_index')
+DESCRIPTIONS_FILE = "descriptions.bin"
+
+# Longest code that packs into a key (ICD-10-CM codes have 3-7 characters)
+MAX_CODE_LENGTH = 7
+
+# Hash table slots per code, rounded up to a power of two; bounds probe lengths
+TABLE_LOAD_FACTOR = 0.5
+
+_HASH_MULTIPLIER = 0x9E3779B97F4A7C15
+_EMPTY_SLOT = -1
+
+
+def normalize_code(code: str) -> str:
+    """'e11.9 ' -> 'E119' (the CMS file form)"""
+    return code.strip().replace('.', '').upper()
+
+
+def display_code(code: str) -> str:
+    """'E119' -> 'E11.9'; category codes (3 characters) have no dot"""
+    code = normalize_code(code)
+    return code if len(code) <= 3 else f"{code[:3]}.{code[3:]}"
+
+
+def pack_code(code: str) -> int:
+    """
+    Normalized code as a uint64 key
+
+    Raises:
+        ValueError: if the code is empty, too long or not ASCII
+    """
+    normalized = normalize_code(code)
+    if not normalized or len(normalized) > MAX_CODE_LENGTH or not normalized.isascii():
+        raise ValueError(f"Not an ICD-10 code: {code!r}")
+    return int.from_bytes(normalized.encode('ascii').ljust(8, b'\0'), 'big')
+
+
+def unpack_code(key: int) -> str:
+    return int(key).to_bytes(8, 'big').rstrip(b'\0').decode('ascii')
+
+
+def _slot_of(key: int, bits: int) -> int:
+    return ((key * _HASH_MULTIPLIER) & 0xFFFFFFFFFFFFFFFF) >> (64 - bits)
+
+
+# ============================================================================
+# ALIAS SAMPLING
+# ============================================================================
+
+class AliasTable:
+    """
+    Walker alias table for O(1) weighted sampling
+
+    Each column i holds probability[i] of itself and 1 - probability[i] of
+    alias[i]; a draw picks a column uniformly, then one uniform decides
+    between the two.
+
+    Args:
+        probability: float64 acceptance probability per column
+        alias: int32 fallback index per column
+    """
+
+    def __init__(self, probability: np.ndarray, alias: np.ndarray):
+        self.probability = probability
+        self.alias = alias
+
+    def __len__(self) -> int:
+        return len(self.probability)
+
+    @classmethod
+    def build(cls, weights: Sequence[float]) -> "AliasTable":
+        """
+        Vose's construction from non-negative weights
+
+        Raises:
+            ValueError: if weights are empty, negative or all zero
+        """
+        weights = np.asarray(weights, dtype=np.float64)
+        if weights.ndim != 1 or not len(weights) or (weights < 0).any() or weights.sum() <= 0:
+            raise ValueError("Alias weights must be a non-empty 1-D array of non-negative values, not all zero")
+
+        count = len(weights)
+        scaled = weights * (count / weights.sum())
+        probability = np.ones(count, dtype=np.float64)
+        alias = np.arange(count, dtype=np.int32)
+
+        small = np.flatnonzero(scaled < 1.0).tolist()
+        large = np.flatnonzero(scaled >= 1.0).tolist()
+        residual = scaled.tolist()
+        while small and large:
+            less, more = small.pop(), large.pop()
+            probability[less] = residual[less]
+            alias[less] = more
+            residual[more] -= 1.0 - residual[less]
+            (small if residual[more] < 1.0 else large).append(more)
+        # Leftovers are 1 up to rounding error; they keep probability 1
+        return cls(probability, alias)
+
+    def sample(self, count: int, rng: Optional[RNGContext] = None) -> np.ndarray:
+        """count independent draws as int32 indexes"""
+        generator = resolve_rng(rng).generator
+        return self.sample_generator(count, generator)
+
+    def sample_generator(self, count: int, generator: np.random.Generator) -> np.ndarray:
+        """sample() for a bare Generator (e.g. ClaimsSimulator.rng)"""
+        column = generator.integers(0, len(self.probability), count, dtype=np.int32)
+        keep = generator.random(count) < self.probability[column]
+        return np.where(keep, column, self.alias[column])
+
+
+# ============================================================================
+# CATALOG
+# ============================================================================
+
+class ICD10Catalog:
+    """
+    ICD-10 codes, descriptions and sampling weights
+
+    Arrays are NumPy arrays or read-only memory maps (ICD10Catalog.open);
+    both behave the same.
+    """
+
+    def __init__(self, keys: np.ndarray, slots: np.ndarray, description_offsets: np.ndarray,
+                 descriptions: np.ndarray, weights: np.ndarray, alias_probability: np.ndarray,
+                 alias_index: np.ndarray):
+        self.keys = keys                                # uint64 packed codes, catalog order
+        self.slots = slots                              # int32 hash table of catalog indexes (-1 empty)
+        self.description_offsets = description_offsets  # int64, len(keys) + 1
+        self.descriptions = descriptions                # uint8 UTF-8 blob
+        self.weights = weights                          # float64 sampling weight per code
+        self.alias = AliasTable(alias_probability, alias_index)
+        self._bits = int(len(slots)).bit_length() - 1
+        self._display_codes: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @property
+    def index_dtype(self) -> type:
+        """Smallest signed integer type that holds every catalog index"""
+        return np.int16 if len(self) <= np.iinfo(np.int16).max else np.int32
+
+    # ------------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------------
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[Tuple[str, str]],
+                     weights: Optional[Sequence[float]] = None) -> "ICD10Catalog":
+        """
+        Builds an in-memory catalog
+
+        Args:
+            entries: (code, description) pairs; codes with or without dots
+            weights: Sampling weight per entry; None for uniform
+
+        Raises:
+            ValueError: on malformed or duplicate codes, or mismatched weights
+        """
+        entries = list(entries)
+        keys = np.array([pack_code(code) for code, _ in entries], dtype=np.uint64)
+        weights = np.ones(len(keys)) if weights is None else np.asarray(weights, dtype=np.float64)
+        if len(weights) != len(keys):
+            raise ValueError(f"{len(weights)} weights for {len(keys)} codes")
+
+        bits = max(1, int(np.ceil(np.log2(max(len(keys), 1) / TABLE_LOAD_FACTOR))))
+        slots = np.full(1 << bits, _EMPTY_SLOT, dtype=np.int32)
+        mask = (1 << bits) - 1
+        for index, key in enumerate(keys.tolist()):
+            slot = _slot_of(key, bits)
+            while slots[slot] != _EMPTY_SLOT:
+                if keys[slots[slot]] == key:
+                    raise ValueError(f"Duplicate ICD-10 code: {display_code(unpack_code(key))}")
+                slot = (slot + 1) & mask
+            slots[slot] = index
+
+        encoded = [description.encode('utf-8') for _, description in entries]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(e) for e in encoded], out=offsets[1:])
+        blob = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+
+        alias = AliasTable.build(weights)
+        return cls(keys, slots, offsets, blob, weights, alias.probability, alias.alias)
+
+    def write(self, output_dir: Path) -> Path:
+        """Saves the catalog as .npy arrays plus a description blob; returns the manifest path"""
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        arrays = {
+            'keys': self.keys, 'slots': self.slots, 'description_offsets': self.description_offsets,
+            'weights': self.weights, 'alias_probability': self.alias.probability,
+            'alias_index': self.alias.alias,
+        }
+        for name, array in arrays.items():
+            np.save(output_dir / f"{name}.npy", np.asarray(array))
+        np.asarray(self.descriptions).tofile(output_dir / DESCRIPTIONS_FILE)
+
+        manifest_path = output_dir / CATALOG_MANIFEST
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': CATALOG_VERSION, 'codes': len(self), 'table_slots': len(self.slots)},
+                      f, indent=2)
+        return manifest_path
+
+    @classmethod
+    def open(cls, input_dir: Path) -> "ICD10Catalog":
+        """
+        Memory-maps a catalog written by write()
+
+        Raises:
+            ValueError: if the catalog version is not supported
+        """
+        input_dir = Path(input_dir)
+        with open(input_dir / CATALOG_MANIFEST, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('version') != CATALOG_VERSION:
+            raise ValueError(f"Unsupported catalog version: {manifest.get('version')}")
+
+        arrays = {name: np.load(input_dir / f"{name}.npy", mmap_mode='r') for name in CATALOG_ARRAYS}
+        blob_path = input_dir / DESCRIPTIONS_FILE
+        descriptions = (np.memmap(blob_path, dtype=np.uint8, mode='r') if blob_path.stat().st_size
+                        else np.zeros(0, dtype=np.uint8))
+        return cls(arrays['keys'], arrays['slots'], arrays['description_offsets'], descriptions,
+                   arrays['weights'], arrays['alias_probability'], arrays['alias_index'])
+
+    # ------------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------------
+
+    def index_of(self, code: str) -> Optional[int]:
+        """Catalog index of a code (with or without dot); None when absent"""
+        try:
+            key = pack_code(code)
+        except ValueError:
+            return None
+        mask = len(self.slots) - 1
+        slot = _slot_of(key, self._bits)
+        while True:
+            index = int(self.slots[slot])
+            if index == _EMPTY_SLOT:
+                return None
+            if int(self.keys[index]) == key:
+                return index
+            slot = (slot + 1) & mask
+
+    def indexes_of(self, codes: Sequence[str]) -> np.ndarray:
+        """Vectorized index_of; -1 for absent or malformed codes"""
+        packed = []
+        for code in codes:
+            try:
+                packed.append(pack_code(code))
+            except ValueError:
+                packed.append(0)    # Never a real key: codes are non-empty
+        keys = np.array(packed, dtype=np.uint64)
+
+        mask = np.uint64(len(self.slots) - 1)
+        slot = (keys * np.uint64(_HASH_MULTIPLIER)) >> np.uint64(64 - self._bits)
+        result = np.full(len(keys), _EMPTY_SLOT, dtype=np.int64)
+        pending = np.flatnonzero(keys != 0)
+        while len(pending):
+            index = self.slots[slot[pending]].astype(np.int64)
+            found = (index != _EMPTY_SLOT) & (self.keys[np.maximum(index, 0)] == keys[pending])
+            result[pending[found]] = index[found]
+            # Empty slot: absent; occupied by another key: probe the next slot
+            pending = pending[(index != _EMPTY_SLOT) & ~found]
+            slot[pending] = (slot[pending] + np.uint64(1)) & mask
+        return result
+
+    def code(self, index: int) -> str:
+        """Display form ('E11.9') of the code at index"""
+        return display_code(unpack_code(int(self.keys[index])))
+
+    def description(self, index: int) -> str:
+        start, stop = self.description_offsets[index], self.description_offsets[index + 1]
+        return bytes(self.descriptions[start:stop]).decode('utf-8')
+
+    def lookup(self, code: str) -> Optional[str]:
+        """Description of a code; None when it is not in the catalog"""
+        index = self.index_of(code)
+        return self.description(index) if index is not None else None
+
+    def entry(self, index: int) -> Tuple[str, str]:
+        """(display code, description), the MockDataGenerator.ICD10_CODES shape"""
+        return self.code(index), self.description(index)
+
+    @property
+    def display_codes(self) -> np.ndarray:
+        """Display codes of every entry as a string array (built on first use)"""
+        if self._display_codes is None:
+            raw = np.asarray(self.keys).astype('>u8').view('S8').astype(str)
+            self._display_codes = np.array([display_code(code) for code in raw.tolist()])
+        return self._display_codes
+
+    # ------------------------------------------------------------------------
+    # Sampling
+    # ------------------------------------------------------------------------
+
+    def sample(self, count: int, rng: Optional[RNGContext] = None) -> np.ndarray:
+        """count weighted draws (with replacement) as catalog indexes"""
+        return self.alias.sample(count, rng).astype(self.index_dtype, copy=False)
+
+    def sample_distinct(self, count: int, rng: Optional[RNGContext] = None) -> np.ndarray:
+        """
+        count distinct indexes drawn by weight without replacement
+
+        Uses exponential keys (Efraimidis-Spirakis): one draw per code, then
+        the count smallest log(u) / weight.
+
+        Raises:
+            ValueError: if count exceeds the codes with positive weight
+        """
+        weights = np.asarray(self.weights)
+        eligible = np.flatnonzero(weights > 0)
+        if count > len(eligible):
+            raise ValueError(f"Cannot draw {count} distinct codes from {len(eligible)} with positive weight")
+        generator = resolve_rng(rng).generator
+        keys = generator.exponential(size=len(eligible)) / weights[eligible]
+        chosen = np.argpartition(keys, count - 1)[:count] if count else np.empty(0, dtype=np.int64)
+        return eligible[chosen[np.argsort(keys[chosen], kind='stable')]]
+
+
+# ============================================================================
+# SOURCE FILES
+# ============================================================================
+
+def read_catalog_source(source: Path) -> Tuple[List[Tuple[str, str]], Optional[List[float]]]:
+    """
+    Reads (code, description) entries and optional weights
+
+    Accepts the CMS order-free code file (code, whitespace, description per
+    line) or a CSV whose header has code and description columns and
+    optionally weight.
+
+    Raises:
+        ValueError: if a CSV lacks the code/description columns or a weight is not numeric
+    """
+    with open(source, 'r', encoding='utf-8-sig', newline='') as f:
+        first = f.readline()
+        f.seek(0)
+        header = [cell.strip().lower() for cell in next(csv.reader([first]), [])]
+        if 'code' in header and 'description' in header:
+            reader = csv.DictReader(f, fieldnames=header)
+            next(reader)
+            entries, weights = [], []
+            for row in reader:
+                if not (row.get('code') or '').strip():
+                    continue
+                entries.append((row['code'], row['description'].strip()))
+                if 'weight' in header:
+                    try:
+                        weights.append(float(row['weight']))
+                    except (TypeError, ValueError):
+                        raise ValueError(f"Invalid weight for {row['code']}: {row['weight']!r}") from None
+            return entries, weights if 'weight' in header else None
+
+        entries = []
+        for line in f:
+            parts = line.strip().split(None, 1)
+            if len(parts) == 2:
+                entries.append((parts[0], parts[1]))
+        return entries, None
+
+
+def build_catalog(source: Path, output_dir: Path) -> ICD10Catalog:
+    """Builds and writes a catalog directory from a source file; returns it memory-mapped"""
+    entries, weights = read_catalog_source(source)
+    ICD10Catalog.from_entries(entries, weights).write(output_dir)
+    return ICD10Catalog.open(output_dir)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build and query ICD-10 code catalogs")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build = subparsers.add_parser("build", help="Index a CMS code file or code,description[,weight] CSV")
+    build.add_argument("source", type=Path, help="Catalog source file")
+    build.add_argument("--output", type=Path, default=Path("./icd10_index"), help="Catalog directory")
+
+    lookup = subparsers.add_parser("lookup", help="Print descriptions for codes")
+    lookup.add_argument("catalog", type=Path, help="Catalog directory")
+    lookup.add_argument("codes", nargs="+", help="Codes, with or without dots")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        started = time.perf_counter()
+        catalog = build_catalog(args.source, args.output)
+        print(f"✓ Indexed {len(catalog):,} codes into {args.output} ({time.perf_counter() - started:.2f}s)")
+        sys.exit(0)
+
+    catalog = ICD10Catalog.open(args.catalog)
+    missing = 0
+    for code in args.codes:
+        description = catalog.lookup(code)
+        if description is None:
+            missing += 1
+            print(f"✗ {code}: not in catalog")
+        else:
+            print(f"✓ {display_code(code)}: {description}")
+    sys.exit(1 if missing else 0)
@@ -0,0 +1,291 @@
+"""
+Incremental Month-Append Aggregation
+====================================
+
+Maintains plan-year-to-date aggregates as claims arrive one month at a time.
+
+State kept between runs (persisted as a single .npz file):
+- ClaimAggregates accumulators: month x place of service x diagnosis cube
+  and per-member medical/rx totals
+- Each member's CostRange bracket plus per-bracket claimant counts and payments
+- The top-K members by plan payment
+
+Appending a month costs time proportional to that month's claim lines and
+the members they touch; earlier months are never rescanned. All dashboard
+sections are re-emitted from the state, so after the twelfth month the
+output matches a full-year aggregation of the same claims.
+
+Usage:
+    state = IncrementalAggregator.start(member_ids, "2024-04-01")
+    state.append_month(april_claims)
+    state.save(Path("plan_state.npz"))
+
+    state = IncrementalAggregator.load(Path("plan_state.npz"))
+    state.append_month(may_claims)
+    data = state.dashboard_data(plan_info, rng)
+"""
+
+from pathlib import Path
+from typing import List, Optional
+import os
+
+import numpy as np
+
+from aggregation import (
+    COST_RANGES,
+    PLAN_MONTHS,
+    SPARSE_MEMBER_RATIO,
+    ClaimAggregates,
+    cost_brackets,
+    member_distribution_rows,
+    top_k_indices,
+)
+from claims_simulator import DEFAULT_CATALOG, ClaimLines
+from data_template_generator import (
+    CompleteDashboardData,
+    DiagnosisByCost,
+    DiagnosisByUtilization,
+    HighCostClaimant,
+    MemberDistribution,
+    MockDataGenerator,
+    MonthlyCostSummary,
+    PlaceOfServiceData,
+    PlanInfo,
+)
+from icd10_catalog import ICD10Catalog
+from rng_context import RNGContext
+
+
+# Bump when the persisted layout changes
+STATE_VERSION = 1
+
+# Members tracked for the high-cost claimants table
+DEFAULT_TOP_COUNT = 10
+
+
+def _touched_members(member_index: np.ndarray, member_count: int) -> np.ndarray:
+    """Sorted distinct member indexes; a presence bincount once a month covers much of the roster"""
+    if len(member_index) * SPARSE_MEMBER_RATIO < member_count:
+        return np.unique(member_index)
+    return np.flatnonzero(np.bincount(member_index, minlength=member_count))
+
+
+class IncrementalAggregator:
+    """
+    Plan-year-to-date claim aggregates that grow one month at a time
+
+    Exposes the same section methods as ClaimAggregates, so it can be passed
+    to MockDataGenerator.build_dashboard_data.
+    """
+
+    def __init__(self, aggregates: ClaimAggregates, member_bracket: np.ndarray,
+                 bracket_claimants: np.ndarray, bracket_payments: np.ndarray,
+                 top_members: np.ndarray, top_count: int = DEFAULT_TOP_COUNT):
+        self.aggregates = aggregates
+        self.member_bracket = member_bracket        # int8 CostRange index per member, -1 = no claims yet
+        self.bracket_claimants = bracket_claimants  # int64 claimants per CostRange
+        self.bracket_payments = bracket_payments    # float64 plan payment per CostRange
+        self.top_members = top_members              # int64 member indexes, best first
+        self.top_count = top_count
+
+    @classmethod
+    def start(cls, member_ids: np.ndarray, plan_start: str, top_count: int = DEFAULT_TOP_COUNT,
+              catalog: Optional[ICD10Catalog] = None) -> "IncrementalAggregator":
+        """
+        Empty state for a new plan year
+
+        Args:
+            member_ids: Roster IDs; claim lines index into this array
+            plan_start: First day of the plan year (YYYY-MM-DD)
+            top_count: Number of top members to track
+            catalog: ICD10Catalog the claim lines index into; None for DEFAULT_CATALOG
+        """
+        aggregates = ClaimAggregates.empty(member_ids, np.datetime64(plan_start, 'D'),
+                                           np.zeros(PLAN_MONTHS, dtype=np.int64), catalog)
+        aggregates.months = 0
+        return cls(
+            aggregates=aggregates,
+            member_bracket=np.full(len(member_ids), -1, dtype=np.int8),
+            bracket_claimants=np.zeros(len(COST_RANGES), dtype=np.int64),
+            bracket_payments=np.zeros(len(COST_RANGES), dtype=np.float64),
+            top_members=np.empty(0, dtype=np.int64),
+            top_count=top_count
+        )
+
+    @property
+    def months_loaded(self) -> int:
+        return self.aggregates.months
+
+    def append_month(self, claim_lines: ClaimLines) -> None:
+        """
+        Folds the next plan month of claim lines into the running state
+
+        Args:
+            claim_lines: Every claim line for the month; member_enrollment is
+                         read for this month only
+
+        Raises:
+            ValueError: if the plan year is complete, the lines belong to a
+                        different month, or they reference another roster
+        """
+        month = self.months_loaded
+        if month >= PLAN_MONTHS:
+            raise ValueError("Plan year already has 12 months; start a new state for the next year")
+        if len(claim_lines.member_ids) != len(self.aggregates.member_ids):
+            raise ValueError("Claim lines reference a different member roster")
+        if len(claim_lines) and np.any(claim_lines.month_index != month):
+            raise ValueError(f"Expected claim lines for plan month {month + 1} only")
+
+        member_paid = self.aggregates.member_paid
+        touched = _touched_members(claim_lines.member_index, len(member_paid))
+        before = member_paid[touched].sum(axis=1)
+
+        self.aggregates.add(claim_lines)
+        self.aggregates.member_enrollment[month] = claim_lines.member_enrollment[month]
+        self.aggregates.months = month + 1
+
+        after = member_paid[touched].sum(axis=1)
+        self._update_brackets(touched, before, after)
+
+        has_reversals = len(claim_lines) and claim_lines.paid_amount.min() < 0
+        self._update_top_members(touched, rescan=bool(has_reversals))
+
+    def _update_brackets(self, touched: np.ndarray, before: np.ndarray, after: np.ndarray) -> None:
+        """Moves touched members between CostRange brackets"""
+        n = len(COST_RANGES)
+        old = self.member_bracket[touched]
+        new = cost_brackets(after).astype(np.int8)
+        was, now = old >= 0, new >= 0
+
+        self.bracket_claimants += np.bincount(new[now], minlength=n) - np.bincount(old[was], minlength=n)
+        self.bracket_payments += (np.bincount(new[now], weights=after[now], minlength=n)
+                                  - np.bincount(old[was], weights=before[was], minlength=n))
+        # Empty brackets must read exactly zero, not subtraction residue
+        self.bracket_payments[self.bracket_claimants == 0] = 0.0
+        self.member_bracket[touched] = new
+
+    def _update_top_members(self, touched: np.ndarray, rescan: bool) -> None:
+        """
+        Refreshes the top-K members
+
+        Totals only grow when every paid amount is non-negative, so the new
+        top K lies within the previous top K plus this month's members. A
+        month with reversals falls back to a scan of the member accumulators.
+        """
+        if rescan:
+            self.top_members = self.aggregates.top_members(self.top_count)
+            return
+
+        previous = self.top_members[~np.isin(self.top_members, touched)]
+        candidates = np.concatenate([touched, previous])
+        totals = self.aggregates.member_paid[candidates].sum(axis=1)
+        best = top_k_indices(totals, self.aggregates.member_ids[candidates], self.top_count)
+        self.top_members = candidates[best]
+
+    # ------------------------------------------------------------------------
+    # Dashboard sections
+    # ------------------------------------------------------------------------
+
+    def monthly_costs(self) -> List[MonthlyCostSummary]:
+        """One row per month loaded so far"""
+        return self.aggregates.monthly_costs()
+
+    def place_of_service(self) -> List[PlaceOfServiceData]:
+        return self.aggregates.place_of_service()
+
+    def diagnosis_by_cost(self, count: int = 10) -> List[DiagnosisByCost]:
+        return self.aggregates.diagnosis_by_cost(count)
+
+    def diagnosis_by_utilization(self, count: int = 10) -> List[DiagnosisByUtilization]:
+        return self.aggregates.diagnosis_by_utilization(count)
+
+    def member_distribution(self) -> List[MemberDistribution]:
+        """Read from the running bracket totals, without a member scan"""
+        return member_distribution_rows(self.bracket_claimants, self.bracket_payments)
+
+    def top_claimants(self, count: int = 10, rng: Optional[RNGContext] = None) -> List[HighCostClaimant]:
+        """
+        Highest-cost members from the tracked top-K
+
+        Raises:
+            ValueError: if count exceeds the tracked top_count
+        """
+        if count > self.top_count:
+            raise ValueError(f"Only the top {self.top_count} members are tracked, requested {count}")
+        return self.aggregates.claimants(self.top_members[:count], rng)
+
+    def dashboard_data(self, plan_info: PlanInfo, rng: Optional[RNGContext] = None) -> CompleteDashboardData:
+        """Re-emits every dashboard section from the current state"""
+        return MockDataGenerator.build_dashboard_data(self, plan_info, rng)
+
+    # ------------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------------
+
+    def save(self, path: Path) -> None:
+        """Writes the state atomically (temporary file, then rename)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(path.name + '.tmp')
+        aggregates = self.aggregates
+
+        with open(temp_path, 'wb') as f:
+            np.savez(
+                f,
+                version=np.int64(STATE_VERSION),
+                plan_start=np.array(str(aggregates.plan_start)),
+                months=np.int64(aggregates.months),
+                lines=np.int64(aggregates.lines),
+                top_count=np.int64(self.top_count),
+                paid_cube=aggregates.paid_cube,
+                count_cube=aggregates.count_cube,
+                member_paid=aggregates.member_paid,
+                member_ids=aggregates.member_ids,
+                member_enrollment=aggregates.member_enrollment,
+                member_bracket=self.member_bracket,
+                bracket_claimants=self.bracket_claimants,
+                bracket_payments=self.bracket_payments,
+                top_members=self.top_members,
+            )
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: Path, catalog: Optional[ICD10Catalog] = None) -> "IncrementalAggregator":
+        """
+        Reads state written by save
+
+        Args:
+            path: State file
+            catalog: ICD10Catalog passed to start; None for DEFAULT_CATALOG
+
+        Raises:
+            ValueError: if the file was written by an incompatible version or another catalog
+        """
+        catalog = DEFAULT_CATALOG if catalog is None else catalog
+        with np.load(Path(path), allow_pickle=False) as state:
+            version = int(state['version'])
+            if version != STATE_VERSION:
+                raise ValueError(f"Unsupported state version {version} in {path} (expected {STATE_VERSION})")
+            if state['paid_cube'].shape[2] != len(catalog):
+                raise ValueError(f"State in {path} has {state['paid_cube'].shape[2]:,} diagnosis codes, "
+                                 f"catalog has {len(catalog):,}")
+
+            aggregates = ClaimAggregates(
+                paid_cube=state['paid_cube'],
+                count_cube=state['count_cube'],
+                member_paid=state['member_paid'],
+                member_ids=state['member_ids'],
+                plan_start=np.datetime64(str(state['plan_start']), 'D'),
+                member_enrollment=state['member_enrollment'],
+                lines=int(state['lines']),
+                months=int(state['months']),
+                catalog=catalog
+            )
+            return cls(
+                aggregates=aggregates,
+                member_bracket=state['member_bracket'],
+                bracket_claimants=state['bracket_claimants'],
+                bracket_payments=state['bracket_payments'],
+                top_members=state['top_members'],
+                top_count=int(state['top_count'])
+            )
@@ -0,0 +1,206 @@
+"""
+Member ID Generation and De-identification
+==========================================
+
+Vectorized replacements for per-member MockDataGenerator.generate_member_id
+calls.
+
+- unique_member_ids: N distinct "M<19 digits>" IDs in one call. Counter
+  values 0..N-1 are pushed through a keyed Feistel permutation, so IDs can
+  never collide and any slice (start, count) can be produced independently
+  (e.g. per chunk or per worker) with the same key
+- hash_member_ids: keyed BLAKE2b or HMAC-SHA256 of real member IDs, mapped
+  into the same 19-digit ID space, hashed in chunks across worker processes
+
+IDs are carried as uint64 arrays (the numeric part), like MemberRoster and
+ClaimAggregates; format_member_ids adds the "M" prefix.
+
+Usage:
+    ids = unique_member_ids(5_000_000, RNGContext(42))
+    masked = hash_member_ids(real_ids, key=secret)     # secret: bytes
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import List, Optional, Sequence, Union
+import hashlib
+import os
+
+import numpy as np
+
+from rng_context import RNGContext, resolve_rng
+
+
+# Numeric part of a member ID: 19 digits, [10^18, 10^19)
+ID_LOW = 10 ** 18
+ID_SPAN = 9 * 10 ** 18
+
+# Feistel rounds; 4 already give a pseudorandom permutation, extra rounds are cheap
+FEISTEL_ROUNDS = 6
+
+# Odd 64-bit multiplier for the round function (golden ratio)
+_ROUND_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+_LOW_32 = np.uint64(0xFFFFFFFF)
+_SHIFT_32 = np.uint64(32)
+
+HASH_METHODS = ("blake2b", "hmac-sha256")
+
+# IDs hashed per task; large enough to amortize inter-process transfer
+HASH_CHUNK_SIZE = 250_000
+
+
+class MemberIdPermutation:
+    """
+    Keyed bijection on [0, ID_SPAN)
+
+    A balanced 64-bit Feistel network with cycle walking: outputs that fall
+    outside the ID space are encrypted again until they land inside it,
+    which keeps the mapping a permutation of the ID space (on average about
+    two passes per value).
+
+    Args:
+        round_keys: FEISTEL_ROUNDS uint64 keys (see from_rng)
+    """
+
+    def __init__(self, round_keys: np.ndarray):
+        self.round_keys = np.asarray(round_keys, dtype=np.uint64)
+
+    @classmethod
+    def from_rng(cls, rng: Optional[RNGContext] = None) -> "MemberIdPermutation":
+        """Draws round keys from rng"""
+        return cls.from_generator(resolve_rng(rng).generator)
+
+    @classmethod
+    def from_generator(cls, generator: np.random.Generator) -> "MemberIdPermutation":
+        """Draws round keys from a bare Generator (e.g. ClaimsSimulator.rng)"""
+        return cls(generator.integers(0, 2 ** 64, FEISTEL_ROUNDS, dtype=np.uint64, endpoint=False))
+
+    def _encrypt(self, values: np.ndarray) -> np.ndarray:
+        left = values >> _SHIFT_32
+        right = values & _LOW_32
+        for key in self.round_keys:
+            mixed = ((right ^ key) * _ROUND_MULTIPLIER) >> _SHIFT_32
+            left, right = right, left ^ mixed
+        return (left << _SHIFT_32) | right
+
+    def __call__(self, counters: np.ndarray) -> np.ndarray:
+        """
+        Permutes counter values
+
+        Args:
+            counters: Integers in [0, ID_SPAN)
+
+        Returns:
+            uint64 array of distinct values in [0, ID_SPAN) for distinct inputs
+        """
+        values = self._encrypt(np.asarray(counters, dtype=np.uint64))
+        span = np.uint64(ID_SPAN)
+        outside = np.flatnonzero(values >= span)
+        while len(outside):
+            values[outside] = self._encrypt(values[outside])
+            outside = outside[values[outside] >= span]
+        return values
+
+
+def unique_member_ids(count: int, rng: Optional[RNGContext] = None, start: int = 0,
+                      permutation: Optional[MemberIdPermutation] = None) -> np.ndarray:
+    """
+    Generates distinct member IDs in one vectorized call
+
+    Args:
+        count: Number of IDs
+        rng: Random stream for the permutation key (ignored with permutation)
+        start: First counter value; slices with the same permutation never overlap
+        permutation: Reuse a key across calls, e.g. one slice per chunk
+
+    Returns:
+        uint64 array of numeric IDs in [10^18, 10^19)
+
+    Raises:
+        ValueError: if the counters would exceed the ID space
+    """
+    if count < 0 or start < 0 or start + count > ID_SPAN:
+        raise ValueError(f"Counter range [{start}, {start + count}) is outside the ID space")
+    if permutation is None:
+        permutation = MemberIdPermutation.from_rng(rng)
+    counters = np.arange(start, start + count, dtype=np.uint64)
+    return permutation(counters) + np.uint64(ID_LOW)
+
+
+def format_member_ids(ids: np.ndarray) -> List[str]:
+    """Numeric IDs as "M<19 digits>" strings"""
+    return np.char.add('M', np.asarray(ids, dtype=np.uint64).astype(str)).tolist()
+
+
+def _hash_chunk(member_ids: Sequence[Union[str, bytes]], key: bytes, method: str) -> np.ndarray:
+    """Keyed 64-bit digests of one chunk, reduced into the ID space"""
+    encoded = [m.encode('utf-8') if isinstance(m, str) else m for m in member_ids]
+    if method == "blake2b":
+        # Keying costs a full compression block; copying a keyed state skips it
+        keyed = hashlib.blake2b(key=key, digest_size=8)
+        digests = []
+        for member_id in encoded:
+            h = keyed.copy()
+            h.update(member_id)
+            digests.append(h.digest())
+    else:
+        # RFC 2104 with the padded-key states computed once (hmac.digest redoes them per call)
+        block_key = key if len(key) <= 64 else hashlib.sha256(key).digest()
+        block_key = block_key.ljust(64, b'\0')
+        inner = hashlib.sha256(bytes(b ^ 0x36 for b in block_key))
+        outer = hashlib.sha256(bytes(b ^ 0x5C for b in block_key))
+        digests = []
+        for member_id in encoded:
+            h = inner.copy()
+            h.update(member_id)
+            o = outer.copy()
+            o.update(h.digest())
+            digests.append(o.digest()[:8])
+    values = np.frombuffer(b''.join(digests), dtype='<u8')
+    return values % np.uint64(ID_SPAN) + np.uint64(ID_LOW)
+
+
+def hash_member_ids(member_ids: Sequence[Union[str, bytes]], key: bytes, method: str = "blake2b",
+                    workers: Optional[int] = None, chunk_size: int = HASH_CHUNK_SIZE) -> np.ndarray:
+    """
+    De-identifies real member IDs with a keyed hash
+
+    The same key always maps an ID to the same output, so joins across files
+    survive de-identification; without the key the mapping cannot be
+    recomputed. Outputs are 64-bit digests reduced into the 19-digit ID
+    space, so distinct inputs collide with probability about n^2 / 1.8e19
+    (roughly 1e-6 for 5M members).
+
+    Hashing short strings holds the GIL, so chunks are spread over worker
+    processes rather than threads.
+
+    Args:
+        member_ids: Real identifiers (str or bytes)
+        key: Secret key; at most 64 bytes for blake2b
+        method: "blake2b" (keyed BLAKE2b) or "hmac-sha256"
+        workers: Worker processes; defaults to the CPU count, 1 hashes inline
+        chunk_size: IDs per task
+
+    Returns:
+        uint64 array of numeric IDs, in input order
+
+    Raises:
+        ValueError: if method is unknown or the key is unusable
+    """
+    if method not in HASH_METHODS:
+        raise ValueError(f"Unknown hash method: {method} (expected one of {', '.join(HASH_METHODS)})")
+    if not key:
+        raise ValueError("A non-empty key is required")
+    if method == "blake2b" and len(key) > hashlib.blake2b.MAX_KEY_SIZE:
+        raise ValueError(f"blake2b keys are at most {hashlib.blake2b.MAX_KEY_SIZE} bytes")
+
+    chunks = [member_ids[i:i + chunk_size] for i in range(0, len(member_ids), chunk_size)]
+    if not chunks:
+        return np.zeros(0, dtype=np.uint64)
+
+    workers = min(workers or os.cpu_count() or 1, len(chunks))
+    task = partial(_hash_chunk, key=key, method=method)
+    if workers == 1:
+        return np.concatenate([task(chunk) for chunk in chunks])
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return np.concatenate(list(executor.map(task, chunks)))
@@ -0,0 +1,214 @@
+"""
+Multi-Client Dataset Generation
+===============================
+
+Fans dataset generation for many client plans out across a process pool.
+
+- Each client gets an independent, deterministic RNG stream spawned from a
+  single base seed, so results do not depend on worker count or scheduling
+- Each client writes its dashboard sections to its own output directory
+- A manifest (manifest.json) merges per-client results in client order
+
+Usage:
+    python scripts/multi_client.py --clients 500 --seed 42 --output ./data_clients
+    python scripts/multi_client.py --clients 50 --trace ./trace    # merged worker timeline
+    python scripts/multi_client.py --clients 500 --compress gzip   # *.csv.gz per client
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import argparse
+import json
+import os
+import sys
+import time
+
+from compression import CODECS, NONE, require_codec
+from csv_stream import write_dashboard_csvs
+from data_template_generator import MockDataGenerator, PlanInfo
+from profiling import Tracer, span, tracing
+from rng_context import RNGContext
+
+
+@dataclass
+class ClientSpec:
+    """Work item for one client plan"""
+    index: int                      # Position in the manifest
+    plan_info: PlanInfo
+    output_dir: Path                # Client-specific output directory
+    member_count: int = 1200
+    claim_line_count: int = 36000
+    trace: bool = False             # Record profiling spans and return them with the entry
+    compression: Optional[str] = None   # Codec for the section CSVs (see compression.py)
+
+
+def make_client_plans(count: int, plan_start_date: str = "2024-04-01",
+                      plan_end_date: str = "2025-03-31") -> List[PlanInfo]:
+    """Builds placeholder PlanInfo records (Client 001, Client 002, ...)"""
+    width = max(3, len(str(count)))
+    return [
+        PlanInfo(
+            client_name=f"Client {i + 1:0{width}d}",
+            plan_start_date=plan_start_date,
+            plan_end_date=plan_end_date
+        )
+        for i in range(count)
+    ]
+
+
+def client_directory_name(index: int, plan_info: PlanInfo) -> str:
+    """
+    Filesystem-safe directory name for a client
+
+    Prefixed with the client's index, so names that sanitize alike
+    ("Acme, Inc." and "Acme Inc") still get their own directories.
+    """
+    safe = "".join(c if c.isalnum() else "_" for c in plan_info.client_name.lower())
+    return f"{index:04d}_{safe.strip('_') or 'client'}"
+
+
+def generate_client(spec: ClientSpec, rng: RNGContext) -> Dict[str, Any]:
+    """
+    Generates and writes one client's dataset (runs inside a worker process)
+
+    Args:
+        spec: Client work item
+        rng: This client's spawned random stream
+
+    Returns:
+        Manifest entry for the client; with spec.trace, also its span
+        records under "spans"
+    """
+    started = time.perf_counter()
+    with ExitStack() as stack:
+        tracer = stack.enter_context(tracing()) if spec.trace else None
+        with span("client", client=spec.plan_info.client_name):
+            data = MockDataGenerator.generate_complete_dashboard_data(
+                member_count=spec.member_count,
+                claim_line_count=spec.claim_line_count,
+                rng=rng,
+                plan_info=spec.plan_info
+            )
+            is_valid, errors = data.validate_all()
+            stats = write_dashboard_csvs(data, spec.output_dir, progress_stream=None,
+                                         compression=spec.compression)
+
+    entry = {
+        "index": spec.index,
+        "client_name": spec.plan_info.client_name,
+        "plan_period": spec.plan_info.get_plan_period_display(),
+        "output_dir": str(spec.output_dir),
+        "spawn_key": list(rng.seed_sequence.spawn_key),
+        "files": {s.output_path.name: s.rows for s in stats},
+        "total_plan_payment": data.financial_kpis.total_plan_payment,
+        "is_valid": is_valid,
+        "errors": errors,
+        "seconds": round(time.perf_counter() - started, 4),
+    }
+    if tracer is not None:
+        entry["spans"] = [asdict(record) for record in tracer.records]
+    return entry
+
+
+def generate_clients(plans: List[PlanInfo], output_dir: Path, seed: int = 0,
+                     workers: Optional[int] = None, member_count: int = 1200,
+                     claim_line_count: int = 36000, trace_dir: Optional[Path] = None,
+                     compression: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Generates datasets for many clients across a ProcessPoolExecutor
+
+    Args:
+        plans: One PlanInfo per client
+        output_dir: Root directory; each client gets a subdirectory
+        seed: Base seed; client streams are spawned from it
+        workers: Worker processes (defaults to CPU count)
+        member_count: Simulated members per client
+        claim_line_count: Simulated claim lines per client
+        trace_dir: If set, workers record profiling spans and the merged
+                   timeline is written here (trace.json, trace.chrome.json)
+        compression: "gzip", "zstd" or "lz4" to compress each client's CSVs
+
+    Returns:
+        The merged manifest (also written to output_dir/manifest.json)
+
+    Raises:
+        ValueError: if compression is unknown or its package is not installed
+    """
+    # Checked here so a missing package fails once, not in every worker
+    require_codec(compression or NONE)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+
+    specs = [
+        ClientSpec(i, plan, output_dir / client_directory_name(i, plan), member_count, claim_line_count,
+                   trace=trace_dir is not None, compression=compression)
+        for i, plan in enumerate(plans)
+    ]
+    client_rngs = RNGContext(seed).spawn(len(specs))
+
+    started = time.perf_counter()
+    # Batch small tasks so per-task IPC overhead does not limit scaling
+    chunksize = max(1, len(specs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        entries = list(executor.map(generate_client, specs, client_rngs, chunksize=chunksize))
+    elapsed = time.perf_counter() - started
+
+    if trace_dir is not None:
+        # Span timestamps are wall-clock, so worker records share one timeline
+        tracer = Tracer()
+        for entry in entries:
+            tracer.extend(entry.pop("spans"))
+        tracer.write(trace_dir)
+
+    manifest = {
+        "seed": seed,
+        "client_count": len(entries),
+        "workers": workers,
+        "member_count": member_count,
+        "claim_line_count": claim_line_count,
+        "compression": compression or "none",
+        "elapsed_seconds": round(elapsed, 4),
+        "invalid_clients": [e["client_name"] for e in entries if not e["is_valid"]],
+        "clients": sorted(entries, key=lambda e: e["index"]),
+    }
+
+    with open(output_dir / "manifest.json", 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+    return manifest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate mock datasets for many clients in parallel")
+    parser.add_argument("--clients", type=int, default=10, help="Number of client plans")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--seed", type=int, default=0, help="Base seed for all client streams")
+    parser.add_argument("--members", type=int, default=1200, help="Simulated members per client")
+    parser.add_argument("--claim-lines", type=int, default=36000, help="Simulated claim lines per client")
+    parser.add_argument("--output", type=Path, default=Path("./data_clients"), help="Output root directory")
+    parser.add_argument("--trace", type=Path, default=None,
+                        help="Write a merged per-stage trace of all workers to this directory")
+    parser.add_argument("--compress", choices=CODECS, default=NONE,
+                        help="Compress each client's CSVs while writing (zstd and lz4 need their packages)")
+    args = parser.parse_args()
+
+    try:
+        manifest = generate_clients(
+            make_client_plans(args.clients), args.output, seed=args.seed, workers=args.workers,
+            member_count=args.members, claim_line_count=args.claim_lines, trace_dir=args.trace,
+            compression=args.compress
+        )
+    except ValueError as e:
+        print(f"✗ {e}")
+        sys.exit(2)
+    print(f"✓ Generated {manifest['client_count']} clients with {manifest['workers']} workers "
+          f"in {manifest['elapsed_seconds']:.2f}s")
+    if manifest["invalid_clients"]:
+        print(f"✗ Validation errors in {len(manifest['invalid_clients'])} clients (see manifest)")
+    print(f"✓ Manifest saved to: {args.output / 'manifest.json'}")
+    if args.trace is not None:
+        print(f"✓ Trace saved to: {args.trace}")
@@ -0,0 +1,397 @@
+"""
+Pharmacy Fill Simulator
+=======================
+
+NumPy-backed generator of individual prescription fills, and the group-by
+kernels that roll them up into DrugClass rows and monthly rx plan payment.
+
+Each fill carries:
+- member (index into the simulated roster, shared with ClaimsSimulator)
+- fill date
+- drug class (index into MockDataGenerator.DRUG_CLASSES)
+- days supply (30 or 90)
+- patient cost and plan payment
+
+Fills come from two places:
+- PharmacySimulator draws fills directly against a roster, in fixed-size
+  chunks, for RX load tests at any scale
+- fills_from_claim_lines expands the Drugs claim lines of a claims
+  simulation into fills, keeping member, date and plan payment, so the
+  dashboard's DrugClass table, monthly rx and claimant rx agree
+
+Usage:
+    python scripts/pharmacy_simulator.py --fills 5e6 --members 150000 --seed 7 --output fills.csv.gz
+
+    pharmacy = aggregate_fills(PharmacySimulator(150_000, rng=RNGContext(7)).iter_chunks(5_000_000))
+    pharmacy.drug_classes(10)
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable, List, Optional, Tuple
+import sys
+
+import numpy as np
+
+from aggregation import PLAN_MONTHS, top_k_indices
+from claims_simulator import (
+    ClaimLines,
+    MemberRoster,
+    RosterEventSimulator,
+    event_argument_parser,
+    fold_chunks,
+    run_event_cli,
+    write_event_chunks_csv,
+)
+from csv_stream import DEFAULT_CHUNK_SIZE, StreamStats
+from data_template_generator import DrugClass, MockDataGenerator
+from rng_context import RNGContext, resolve_rng
+
+
+# ============================================================================
+# SIMULATION PARAMETERS
+# ============================================================================
+
+DRUG_CLASS_NAMES = np.array(MockDataGenerator.DRUG_CLASSES)
+
+# Relative fill frequency of each class in MockDataGenerator.DRUG_CLASSES
+DRUG_CLASS_FREQUENCY = np.array([
+    0.200,   # ANTIHYPERTENSIVES
+    0.140,   # ANTIDEPRESSANTS
+    0.150,   # ANTIHYPERLIPIDEMICS
+    0.120,   # ANTIDIABETICS
+    0.070,   # ANTICONVULSANTS
+    0.080,   # BETA BLOCKERS
+    0.070,   # ANTIASTHMATIC AND BRONCHODILATOR AGENTS
+    0.070,   # CALCIUM CHANNEL BLOCKERS
+    0.050,   # ANALGESICS - OPIOID
+    0.050,   # ADHD/ANTI-NARCOLEPSY/ANTI-OBESITY/ANOREXIANTS
+])
+
+# Mean allowed amount of a 30-day fill (GLP-1s and inhalers dominate their classes)
+DRUG_CLASS_MEAN_ALLOWED = np.array([
+    25.0, 30.0, 20.0, 320.0, 90.0, 18.0, 180.0, 22.0, 45.0, 260.0,
+])
+
+# Share of each class's fills written for 90 days (maintenance drugs by mail)
+NINETY_DAY_SHARE = np.array([
+    0.55, 0.45, 0.55, 0.35, 0.35, 0.50, 0.20, 0.50, 0.02, 0.05,
+])
+
+# A 90-day fill costs this many 30-day fills (mail-order discount)
+NINETY_DAY_COST_FACTOR = 2.7
+
+# Log-space spread of fill amounts around the class mean
+ALLOWED_SIGMA = 0.8
+
+# Member cost share: coinsurance of the allowed amount, bounded by a copay floor and cap
+PATIENT_COINSURANCE = 0.20
+MIN_PATIENT_COST = 5.0
+MAX_PATIENT_COST = 150.0
+
+# Claim lines matched to a drug class per vectorized step (20 candidate scores each)
+MATCH_CHUNK_SIZE = 250_000
+
+
+# ============================================================================
+# FILL STORAGE
+# ============================================================================
+
+@dataclass
+class PharmacyFills:
+    """
+    Prescription fills stored as parallel NumPy columns
+
+    - drug_class: index into DRUG_CLASS_NAMES
+    """
+    member_index: np.ndarray        # int32, index into the simulated roster
+    fill_date: np.ndarray           # datetime64[D]
+    drug_class: np.ndarray          # int8
+    days_supply: np.ndarray         # int16, 30 or 90
+    patient_cost: np.ndarray        # float64, member out-of-pocket
+    plan_payment: np.ndarray        # float64
+    member_ids: np.ndarray          # uint64 roster IDs, indexed by member_index
+    plan_start: np.datetime64       # First day of the plan year
+
+    def __len__(self) -> int:
+        return len(self.plan_payment)
+
+    @property
+    def month_index(self) -> np.ndarray:
+        """Plan month (0-11) of each fill"""
+        start_month = self.plan_start.astype('datetime64[M]')
+        return (self.fill_date.astype('datetime64[M]') - start_month).astype(np.int64)
+
+    def slice(self, start: int, stop: int) -> "PharmacyFills":
+        """Fills [start:stop] as views sharing the roster columns"""
+        return PharmacyFills(
+            member_index=self.member_index[start:stop],
+            fill_date=self.fill_date[start:stop],
+            drug_class=self.drug_class[start:stop],
+            days_supply=self.days_supply[start:stop],
+            patient_cost=self.patient_cost[start:stop],
+            plan_payment=self.plan_payment[start:stop],
+            member_ids=self.member_ids,
+            plan_start=self.plan_start
+        )
+
+
+def _draw_fill_details(count: int, generator: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+    """Drug class and days supply for count fills"""
+    class_p = DRUG_CLASS_FREQUENCY / DRUG_CLASS_FREQUENCY.sum()
+    drug_class = generator.choice(len(class_p), size=count, p=class_p).astype(np.int8)
+    ninety = generator.random(count) < NINETY_DAY_SHARE[drug_class]
+    days_supply = np.where(ninety, 90, 30).astype(np.int16)
+    return drug_class, days_supply
+
+
+def _match_fill_details(plan_payment: np.ndarray, generator: np.random.Generator,
+                        chunk_size: int = MATCH_CHUNK_SIZE) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Drug class and days supply drawn given each fill's plan payment
+
+    Samples each (class, supply) pair by its prior share times the lognormal
+    likelihood of the amount (Gumbel-max trick), so expensive fills land in
+    expensive classes and 90-day supplies.
+    """
+    ninety = np.stack([1.0 - NINETY_DAY_SHARE, NINETY_DAY_SHARE], axis=1)
+    log_prior = np.log(DRUG_CLASS_FREQUENCY[:, None] / DRUG_CLASS_FREQUENCY.sum() * ninety).ravel()
+    factor = np.array([1.0, NINETY_DAY_COST_FACTOR])
+    expected_plan = (DRUG_CLASS_MEAN_ALLOWED[:, None] * factor * (1.0 - PATIENT_COINSURANCE)).ravel()
+    log_median = np.log(expected_plan) - ALLOWED_SIGMA ** 2 / 2
+
+    pair = np.empty(len(plan_payment), dtype=np.int64)
+    for start in range(0, len(plan_payment), chunk_size):
+        amount = np.log(np.maximum(plan_payment[start:start + chunk_size], 0.01))
+        score = log_prior - (amount[:, None] - log_median) ** 2 / (2 * ALLOWED_SIGMA ** 2)
+        score += generator.gumbel(size=score.shape)
+        pair[start:start + chunk_size] = score.argmax(axis=1)
+
+    drug_class = (pair // 2).astype(np.int8)
+    days_supply = np.where(pair % 2 == 1, 90, 30).astype(np.int16)
+    return drug_class, days_supply
+
+
+def patient_cost_for_plan_payment(plan_payment: np.ndarray) -> np.ndarray:
+    """
+    Member cost share implied by the plan's payment
+
+    Inverts plan = allowed - min(max(coinsurance * allowed, floor), cap), so
+    fills expanded from claim lines keep the claim's plan payment exactly.
+    """
+    share = plan_payment * (PATIENT_COINSURANCE / (1.0 - PATIENT_COINSURANCE))
+    return np.round(np.clip(share, MIN_PATIENT_COST, MAX_PATIENT_COST), 2)
+
+
+# ============================================================================
+# SIMULATOR
+# ============================================================================
+
+class PharmacySimulator(RosterEventSimulator):
+    """
+    Generates prescription fills in vectorized batches
+
+    The roster's Pareto member risk drives both how often a member fills
+    and how expensive their fills are.
+    """
+
+    def simulate_events(self, roster: MemberRoster, fill_count: int) -> PharmacyFills:
+        """Generates fills against an existing roster"""
+        if fill_count < 0:
+            raise ValueError(f"fill_count must be non-negative, got {fill_count}")
+
+        rng = self.rng
+        member_index, fill_date = self.claims.draw_members(roster, fill_count)
+
+        drug_class, days_supply = _draw_fill_details(fill_count, rng)
+        # Lognormal noise with unit mean, scaled by class, supply and member severity
+        noise = rng.lognormal(-ALLOWED_SIGMA ** 2 / 2, ALLOWED_SIGMA, fill_count)
+        supply_factor = np.where(days_supply == 90, NINETY_DAY_COST_FACTOR, 1.0)
+        allowed = DRUG_CLASS_MEAN_ALLOWED[drug_class] * supply_factor * roster.severity[member_index] * noise
+
+        patient_cost = np.round(np.clip(allowed * PATIENT_COINSURANCE, MIN_PATIENT_COST, MAX_PATIENT_COST), 2)
+        patient_cost = np.minimum(patient_cost, np.round(allowed, 2))
+        plan_payment = np.round(allowed, 2) - patient_cost
+
+        return PharmacyFills(
+            member_index=member_index,
+            fill_date=fill_date,
+            drug_class=drug_class,
+            days_supply=days_supply,
+            patient_cost=patient_cost,
+            plan_payment=plan_payment,
+            member_ids=roster.member_ids,
+            plan_start=self.plan_start
+        )
+
+
+def fills_from_claim_lines(claim_lines: ClaimLines, rng: Optional[RNGContext] = None) -> PharmacyFills:
+    """
+    Expands the Drugs claim lines into fills
+
+    Member, date and plan payment are the claim line's, so rolled-up rx plan
+    payment matches the claim aggregates. Drug class and days supply are
+    drawn in proportion to how well they explain the amount; patient cost
+    follows from the plan payment.
+    """
+    drugs = claim_lines.take(claim_lines.is_rx)
+    generator = resolve_rng(rng).generator
+    drug_class, days_supply = _match_fill_details(drugs.paid_amount, generator)
+
+    return PharmacyFills(
+        member_index=drugs.member_index,
+        fill_date=drugs.service_date,
+        drug_class=drug_class,
+        days_supply=days_supply,
+        patient_cost=patient_cost_for_plan_payment(drugs.paid_amount),
+        plan_payment=drugs.paid_amount,
+        member_ids=claim_lines.member_ids,
+        plan_start=claim_lines.plan_start
+    )
+
+
+# ============================================================================
+# AGGREGATION
+# ============================================================================
+
+@dataclass
+class PharmacyAggregates:
+    """
+    Per (plan month, drug class) totals accumulated from fills
+
+    One composite key per fill feeds three np.bincount kernels (scripts,
+    patient cost, plan payment); the 12 x classes cube is all that is kept.
+    """
+    scripts: np.ndarray             # int64 [month, drug_class]
+    patient_cost: np.ndarray        # float64 [month, drug_class]
+    plan_payment: np.ndarray        # float64 [month, drug_class]
+    fills: int = 0                  # Fills aggregated so far
+
+    @classmethod
+    def empty(cls) -> "PharmacyAggregates":
+        shape = (PLAN_MONTHS, len(DRUG_CLASS_NAMES))
+        return cls(
+            scripts=np.zeros(shape, dtype=np.int64),
+            patient_cost=np.zeros(shape, dtype=np.float64),
+            plan_payment=np.zeros(shape, dtype=np.float64)
+        )
+
+    def add(self, fills: PharmacyFills) -> None:
+        """
+        Folds a chunk of fills into the accumulators
+
+        Raises:
+            ValueError: if a fill date falls outside the plan year
+        """
+        if not len(fills):
+            return
+
+        months = fills.month_index
+        if months.min() < 0 or months.max() >= PLAN_MONTHS:
+            raise ValueError("Fill dates must fall within the plan year")
+
+        size = self.scripts.size
+        key = months * len(DRUG_CLASS_NAMES) + fills.drug_class
+        self.scripts += np.bincount(key, minlength=size).reshape(self.scripts.shape)
+        self.patient_cost += np.bincount(key, weights=fills.patient_cost,
+                                         minlength=size).reshape(self.scripts.shape)
+        self.plan_payment += np.bincount(key, weights=fills.plan_payment,
+                                         minlength=size).reshape(self.scripts.shape)
+        self.fills += len(fills)
+
+    def monthly_rx(self) -> np.ndarray:
+        """Rx plan payment per plan month (12 entries)"""
+        return self.plan_payment.sum(axis=1)
+
+    def drug_classes(self, count: int = 10) -> List[DrugClass]:
+        """Top drug classes by script count, ties by class name"""
+        scripts = self.scripts.sum(axis=0)
+        patient_cost = self.patient_cost.sum(axis=0)
+        plan_payment = self.plan_payment.sum(axis=0)
+
+        return [
+            DrugClass(
+                drug_class_name=str(DRUG_CLASS_NAMES[idx]),
+                script_count=int(scripts[idx]),
+                patient_cost=round(float(patient_cost[idx]), 2),
+                plan_payment=round(float(plan_payment[idx]), 2)
+            )
+            for idx in top_k_indices(scripts, DRUG_CLASS_NAMES, count)
+        ]
+
+
+def aggregate_fills(chunks: Iterable[PharmacyFills]) -> PharmacyAggregates:
+    """Aggregates a stream of fill chunks (or a one-element list)"""
+    return fold_chunks(PharmacyAggregates.empty(), chunks)
+
+
+# ============================================================================
+# STREAMING OUTPUT
+# ============================================================================
+
+PHARMACY_FILL_COLUMNS = [
+    'member_id',
+    'fill_date',
+    'drug_class',
+    'days_supply',
+    'patient_cost',
+    'plan_payment',
+]
+
+
+def pharmacy_fill_rows(fills: PharmacyFills) -> List[Tuple[Any, ...]]:
+    """Formats a chunk of fills as CSV rows matching PHARMACY_FILL_COLUMNS"""
+    member_ids = np.char.add('M', fills.member_ids[fills.member_index].astype(str))
+
+    return list(zip(
+        member_ids.tolist(),
+        fills.fill_date.astype(str).tolist(),
+        DRUG_CLASS_NAMES[fills.drug_class].tolist(),
+        fills.days_supply.tolist(),
+        np.char.mod('%.2f', fills.patient_cost).tolist(),
+        np.char.mod('%.2f', fills.plan_payment).tolist(),
+    ))
+
+
+def write_pharmacy_fills_csv(output_path: Path, fill_count: int, member_count: int = 1200,
+                             rng: Optional[RNGContext] = None,
+                             chunk_size: int = DEFAULT_CHUNK_SIZE,
+                             compression: Optional[str] = None,
+                             level: Optional[int] = None,
+                             pharmacy: Optional[PharmacyAggregates] = None) -> StreamStats:
+    """
+    Streams simulated fills to a CSV file in constant memory
+
+    Args:
+        output_path: Destination CSV path
+        fill_count: Number of fills to write
+        member_count: Size of the simulated roster
+        rng: Random stream for the simulator
+        chunk_size: Fills generated and written per chunk
+        compression: "gzip", "zstd", "lz4" or "none"; None infers it from the suffix
+        level: Compression level; None for the codec default
+        pharmacy: Accumulators to fold each chunk into while writing
+
+    Returns:
+        StreamStats for the completed write
+    """
+    chunks = PharmacySimulator(member_count, rng=rng).iter_chunks(fill_count, chunk_size)
+    return write_event_chunks_csv(output_path, PHARMACY_FILL_COLUMNS, pharmacy_fill_rows, chunks,
+                                  compression, level, pharmacy)
+
+
+if __name__ == "__main__":
+    args = event_argument_parser("Simulate pharmacy fills and roll them up into drug classes", "fills",
+                                 members_help="Roster size (default: fills / 12)").parse_args()
+
+    members = args.members or max(args.fills // 12, 1)
+    pharmacy = PharmacyAggregates.empty()
+    seconds = run_event_cli(args, args.fills, PharmacySimulator(members, rng=RNGContext(args.seed)), pharmacy,
+                            PHARMACY_FILL_COLUMNS, pharmacy_fill_rows)
+
+    print(f"✓ Simulated and aggregated {pharmacy.fills:,} fills for {members:,} members in {seconds:.2f}s "
+          f"({pharmacy.fills / seconds:,.0f} fills/sec)")
+    for drug in pharmacy.drug_classes(len(DRUG_CLASS_NAMES)):
+        print(f"  {drug.drug_class_name[:40]:<40} {drug.script_count:>10,} scripts  "
+              f"${drug.plan_payment:>14,.2f} plan  ${drug.patient_cost:>13,.2f} patient")
+    sys.exit(0)
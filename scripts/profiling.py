@@ -0,0 +1,299 @@
+"""
+Pipeline Profiling Spans
+========================
+
+Opt-in instrumentation for the generation pipeline. Generators, writers and
+validators wrap their work in span(...) context managers; while no tracer is
+active a span is a no-op, so instrumented code pays one global lookup.
+
+Each span records:
+- Wall-clock start and duration
+- Rows produced (passed in, or set on the span before it closes)
+- tracemalloc delta and peak above the span's starting level (trace_memory)
+- A cProfile dump per outermost span (profile_dir)
+
+Traces are written as JSON (spans plus a per-name summary) and as a Chrome
+trace (chrome://tracing, Perfetto). Span timestamps are wall-clock, so
+records collected in worker processes merge into one timeline.
+
+Usage:
+    with tracing(trace_memory=True) as tracer:
+        data = MockDataGenerator.generate_complete_dashboard_data()
+    tracer.write(Path("trace"))    # trace/trace.json, trace/trace.chrome.json
+
+Standard library only, so the template generator can use it without NumPy.
+"""
+
+from contextlib import contextmanager, nullcontext
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+import json
+import os
+import threading
+import time
+
+
+TRACE_FILE = "trace.json"
+CHROME_TRACE_FILE = "trace.chrome.json"
+
+
+@dataclass
+class SpanRecord:
+    """One completed span"""
+    name: str
+    category: str                   # "stage", "generator", "writer", "validator"
+    start_us: int                   # Wall-clock start, microseconds since the epoch
+    duration_us: int
+    pid: int
+    tid: int
+    depth: int                      # Nesting level within its thread (0 = outermost)
+    rows: Optional[int] = None
+    memory_delta_bytes: Optional[int] = None   # Traced memory at exit minus at entry
+    memory_peak_bytes: Optional[int] = None    # Highest traced memory above the entry level
+    profile_path: Optional[str] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def seconds(self) -> float:
+        return self.duration_us / 1_000_000
+
+
+class Span:
+    """Handle yielded by span(); set rows or attributes before the block exits"""
+    __slots__ = ('rows', 'attributes', '_peak')
+
+    def __init__(self, rows: Optional[int], attributes: Dict[str, Any]):
+        self.rows = rows
+        self.attributes = attributes
+        self._peak = 0
+
+
+# Shared handle and context while tracing is off; values set on it are ignored
+_NULL_SPAN = Span(None, {})
+_NULL_CONTEXT = nullcontext(_NULL_SPAN)
+
+
+class Tracer:
+    """
+    Collects span records for one process
+
+    Args:
+        trace_memory: Record tracemalloc deltas and peaks (slows allocation-heavy code)
+        profile_dir: Directory for cProfile dumps of outermost spans; None disables
+    """
+
+    def __init__(self, trace_memory: bool = False, profile_dir: Optional[Path] = None):
+        self.trace_memory = trace_memory
+        self.profile_dir = Path(profile_dir) if profile_dir is not None else None
+        self.records: List[SpanRecord] = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._profiling = False
+        self._started_tracemalloc = False
+
+    def _stack(self) -> List[Span]:
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def start(self) -> None:
+        import tracemalloc
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+
+    def stop(self) -> None:
+        if self._started_tracemalloc:
+            import tracemalloc
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    @contextmanager
+    def span(self, name: str, category: str = "stage", rows: Optional[int] = None,
+             **attributes: Any) -> Iterator[Span]:
+        """Records the enclosed block as one span"""
+        # cProfile and tracemalloc are imported on first use, keeping CLI startup fast
+        import cProfile
+        import tracemalloc
+
+        stack = self._stack()
+        handle = Span(rows, attributes)
+        memory = self.trace_memory and tracemalloc.is_tracing()
+
+        if memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                # The parent's peak so far must survive the reset below
+                stack[-1]._peak = max(stack[-1]._peak, peak)
+            tracemalloc.reset_peak()
+            memory_start = current
+
+        profiler = None
+        if self.profile_dir is not None and not self._profiling:
+            profiler = cProfile.Profile()
+            self._profiling = True
+            profiler.enable()
+
+        stack.append(handle)
+        wall_start = time.time_ns() // 1000
+        started = time.perf_counter()
+        try:
+            yield handle
+        finally:
+            duration = time.perf_counter() - started
+            stack.pop()
+
+            profile_path = None
+            if profiler is not None:
+                profiler.disable()
+                self._profiling = False
+                self.profile_dir.mkdir(parents=True, exist_ok=True)
+                safe = "".join(c if c.isalnum() else "_" for c in name)
+                path = self.profile_dir / f"{len(self.records):04d}_{safe}_{os.getpid()}.prof"
+                profiler.dump_stats(path)
+                profile_path = str(path)
+
+            memory_delta = memory_peak = None
+            if memory:
+                current, peak = tracemalloc.get_traced_memory()
+                peak = max(peak, handle._peak)
+                memory_delta = current - memory_start
+                memory_peak = peak - memory_start
+                if stack:
+                    stack[-1]._peak = max(stack[-1]._peak, peak)
+
+            record = SpanRecord(
+                name=name,
+                category=category,
+                start_us=wall_start,
+                duration_us=int(duration * 1_000_000),
+                pid=os.getpid(),
+                tid=threading.get_ident(),
+                depth=len(stack),
+                rows=handle.rows,
+                memory_delta_bytes=memory_delta,
+                memory_peak_bytes=memory_peak,
+                profile_path=profile_path,
+                attributes=handle.attributes
+            )
+            with self._lock:
+                self.records.append(record)
+
+    def extend(self, records: Iterable[Any]) -> None:
+        """Merges records from another tracer (e.g. returned by a worker process)"""
+        with self._lock:
+            for record in records:
+                self.records.append(record if isinstance(record, SpanRecord) else SpanRecord(**record))
+
+    # ------------------------------------------------------------------------
+    # Output
+    # ------------------------------------------------------------------------
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Per-name totals (count, seconds, rows, rows/sec), slowest first"""
+        totals: Dict[str, Dict[str, Any]] = {}
+        for record in self.records:
+            entry = totals.setdefault(record.name, {
+                'name': record.name, 'category': record.category, 'count': 0,
+                'seconds': 0.0, 'rows': None, 'memory_peak_bytes': None,
+            })
+            entry['count'] += 1
+            entry['seconds'] += record.seconds
+            if record.rows is not None:
+                entry['rows'] = (entry['rows'] or 0) + record.rows
+            if record.memory_peak_bytes is not None:
+                entry['memory_peak_bytes'] = max(entry['memory_peak_bytes'] or 0, record.memory_peak_bytes)
+
+        for entry in totals.values():
+            entry['seconds'] = round(entry['seconds'], 6)
+            entry['rows_per_second'] = (
+                round(entry['rows'] / entry['seconds'], 1) if entry['rows'] and entry['seconds'] > 0 else None
+            )
+        return sorted(totals.values(), key=lambda e: e['seconds'], reverse=True)
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """Chrome trace event format: one complete ("X") event per span"""
+        events = []
+        for record in sorted(self.records, key=lambda r: r.start_us):
+            args = {'rows': record.rows, **record.attributes}
+            if record.memory_delta_bytes is not None:
+                args['memory_delta_bytes'] = record.memory_delta_bytes
+                args['memory_peak_bytes'] = record.memory_peak_bytes
+            events.append({
+                'name': record.name,
+                'cat': record.category,
+                'ph': 'X',
+                'ts': record.start_us,
+                'dur': record.duration_us,
+                'pid': record.pid,
+                'tid': record.tid,
+                'args': args,
+            })
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def write(self, output_dir: Path) -> List[Path]:
+        """
+        Writes trace.json and trace.chrome.json
+
+        Returns:
+            Paths of the written files
+        """
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        trace_path = output_dir / TRACE_FILE
+        chrome_path = output_dir / CHROME_TRACE_FILE
+
+        with open(trace_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'summary': self.summary(),
+                'spans': [asdict(record) for record in sorted(self.records, key=lambda r: r.start_us)],
+            }, f, indent=2, default=str)
+        with open(chrome_path, 'w', encoding='utf-8') as f:
+            json.dump(self.chrome_trace(), f, default=str)
+
+        return [trace_path, chrome_path]
+
+
+# ============================================================================
+# ACTIVE TRACER
+# ============================================================================
+
+_active: Optional[Tracer] = None
+
+
+def active_tracer() -> Optional[Tracer]:
+    return _active
+
+
+@contextmanager
+def tracing(trace_memory: bool = False, profile_dir: Optional[Path] = None) -> Iterator[Tracer]:
+    """Activates a new Tracer for the enclosed block"""
+    global _active
+    previous = _active
+    tracer = Tracer(trace_memory, profile_dir)
+    tracer.start()
+    _active = tracer
+    try:
+        yield tracer
+    finally:
+        _active = previous
+        tracer.stop()
+
+
+def span(name: str, category: str = "stage", rows: Optional[int] = None, **attributes: Any):
+    """
+    Context manager recording a span on the active tracer
+
+    A no-op when tracing is off.
+
+    Args:
+        name: Span name (e.g. "simulate_claims", "write:monthly_costs.csv")
+        category: "stage", "generator", "writer" or "validator"
+        rows: Rows produced, if known up front; otherwise set span.rows
+        attributes: Extra values shown in the trace viewer
+    """
+    if _active is None:
+        return _NULL_CONTEXT
+    return _active.span(name, category, rows, **attributes)
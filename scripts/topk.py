@@ -0,0 +1,128 @@
+"""
+Streaming Top-K
+===============
+
+Bounded-heap selection of the K highest-scoring items from a stream of any
+length (top claimants by plan payment, top diagnoses by cost or count).
+
+- State is O(K): a min-heap whose root is the entry evicted next
+- Items scoring below the current K-th best are rejected with a single
+  comparison, so long streams cost O(N) plus O(log K) per accepted item
+- Ties on score are broken by key ascending, so results do not depend on
+  input order, chunking or how partial results are merged
+
+Standard library only, so the template generator can use it without NumPy.
+"""
+
+from typing import Any, Callable, Generic, Iterable, List, Optional, Tuple, TypeVar
+import heapq
+
+
+T = TypeVar('T')
+
+
+class _Descending:
+    """Wraps a key so that larger keys sort first inside the min-heap"""
+    __slots__ = ('key',)
+
+    def __init__(self, key: Any):
+        self.key = key
+
+    def __lt__(self, other: "_Descending") -> bool:
+        return other.key < self.key
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _Descending) and self.key == other.key
+
+
+class TopK(Generic[T]):
+    """
+    Keeps the K highest-scoring (score, key, item) entries seen so far
+
+    Keys should be unique and must be comparable (member IDs, diagnosis
+    codes); entries with equal score and key keep arrival order. The item is
+    carried along and never compared.
+
+    Usage:
+        top = TopK(10)
+        for claimant in stream:
+            top.push(claimant.total_plan_payment, claimant.member_id, claimant)
+        best = top.items()
+    """
+
+    def __init__(self, k: int):
+        if k < 0:
+            raise ValueError(f"k must be non-negative, got {k}")
+        self.k = k
+        # (score, key, -arrival, item); negated arrival makes earlier entries win
+        self._heap: List[Tuple[float, _Descending, int, T]] = []
+        self._arrivals = 0
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    @property
+    def is_full(self) -> bool:
+        return len(self._heap) >= self.k
+
+    @property
+    def threshold(self) -> Optional[float]:
+        """Lowest score still retained once full; None while filling"""
+        return self._heap[0][0] if self._heap and self.is_full else None
+
+    def push(self, score: float, key: Any, item: T = None) -> bool:
+        """
+        Offers one entry
+
+        Returns:
+            True if the entry is currently among the top K
+        """
+        heap = self._heap
+        self._arrivals += 1
+        if len(heap) < self.k:
+            heapq.heappush(heap, (score, _Descending(key), -self._arrivals, item))
+            return True
+        if not heap or score < heap[0][0]:
+            return False
+
+        entry = (score, _Descending(key), -self._arrivals, item)
+        if entry < heap[0]:
+            # Same score as the root but a larger (or later duplicate) key: loses the tie
+            return False
+        heapq.heapreplace(heap, entry)
+        return True
+
+    def extend(self, entries: Iterable[Tuple[float, Any, T]]) -> None:
+        """Offers (score, key, item) entries in order"""
+        for score, key, item in entries:
+            self.push(score, key, item)
+
+    def merge(self, other: "TopK[T]") -> None:
+        """Folds in another partial result (e.g. from a different shard)"""
+        self.extend(other.entries())
+
+    def entries(self) -> List[Tuple[float, Any, T]]:
+        """Retained (score, key, item) entries, best first"""
+        ordered = sorted(self._heap, reverse=True)
+        return [(score, wrapped.key, item) for score, wrapped, _, item in ordered]
+
+    def items(self) -> List[T]:
+        """Retained items, best first"""
+        return [item for _, _, item in self.entries()]
+
+
+def top_k(items: Iterable[T], k: int, score: Callable[[T], float],
+          key: Callable[[T], Any]) -> List[T]:
+    """
+    Top K items of an iterable by score, best first, ties by key ascending
+
+    Args:
+        items: Any iterable; consumed once
+        k: Number of items to keep
+        score: Ranking value (higher is better)
+        key: Unique tie-breaker for equal scores
+    """
+    top: TopK[T] = TopK(k)
+    for item in items:
+        top.push(score(item), key(item), item)
+    return top.items()
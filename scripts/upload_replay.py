@@ -0,0 +1,509 @@
+"""
+Upload Replay Harness
+=====================
+
+Replays generated CSV files against /api/upload and reports latency.
+
+- The driver POSTs multipart/form-data uploads (field "files", up to
+  UPLOAD_MAX_FILES per request) over asyncio with a fixed number of
+  concurrent connections; file bodies are streamed from disk, not loaded
+- Uploads come from CSV paths, directories of CSVs, or shard manifests
+  written by csv_stream.write_csv_shards (one request per upload batch)
+- Results are grouped by request size: count, errors, throughput and
+  p50/p95/p99 latency per SIZE_BUCKETS class
+- A stand-in server mirrors the route's checks (file count, 50MB limit,
+  .csv names, header detection) for runs without the Next.js app
+
+Usage:
+    python scripts/upload_replay.py run ./upload/high_cost_claimants.shards.json --serve
+    python scripts/upload_replay.py run ./data_templates --url http://localhost:3000/api/upload \\
+        --concurrency 8 --repeat 20 --output replay.json
+    python scripts/upload_replay.py serve --port 8765
+
+Standard library only.
+"""
+
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+import argparse
+import asyncio
+import json
+import math
+import os
+import subprocess
+import sys
+import time
+import uuid
+
+from csv_stream import UPLOAD_MAX_BYTES, UPLOAD_MAX_FILES, read_shard_manifest
+
+
+DEFAULT_URL = "http://127.0.0.1:8765/api/upload"
+DEFAULT_CONCURRENCY = 4
+
+# Bytes read from disk and written to the socket per step
+STREAM_BLOCK_SIZE = 1024 * 1024
+
+# Request size classes for the latency report: (upper bound in bytes, label)
+SIZE_BUCKETS = [
+    (64 * 1024, "<64KB"),
+    (1024 * 1024, "64KB-1MB"),
+    (10 * 1024 * 1024, "1-10MB"),
+    (50 * 1024 * 1024, "10-50MB"),
+    (math.inf, ">50MB"),
+]
+
+REPORT_VERSION = 1
+
+# Headers detectCSVType (lib/utils/csvParser.ts) looks for
+EXPERIENCE_HEADERS = ['Month', 'Domestic_Medical_IP', 'Enrollment']
+CLAIMANT_HEADERS = ['Member_ID', 'Age', 'Gender', 'Primary_Diagnosis_Code']
+
+
+@dataclass
+class UploadRequest:
+    """One POST: the files sent together in its form data"""
+    files: List[Path]
+
+    @property
+    def size_bytes(self) -> int:
+        return sum(path.stat().st_size for path in self.files)
+
+
+@dataclass
+class UploadResult:
+    """Outcome of one POST"""
+    files: int
+    size_bytes: int
+    status: int                     # HTTP status; 0 when the request failed to complete
+    seconds: float
+    rejected_files: int = 0         # Files the route answered with success: false
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and 200 <= self.status < 300
+
+
+# ============================================================================
+# REQUEST PLANNING
+# ============================================================================
+
+def plan_requests(inputs: Sequence[Path], files_per_request: int = 1) -> List[UploadRequest]:
+    """
+    Turns CLI inputs into upload requests
+
+    Args:
+        inputs: CSV files, directories (their *.csv files, sorted) or
+                *.shards.json manifests (one request per upload batch)
+        files_per_request: Files grouped per request for CSVs and directories
+
+    Raises:
+        ValueError: if files_per_request is outside 1..UPLOAD_MAX_FILES or an input is missing
+    """
+    if not 1 <= files_per_request <= UPLOAD_MAX_FILES:
+        raise ValueError(f"files_per_request must be 1-{UPLOAD_MAX_FILES}, got {files_per_request}")
+
+    requests: List[UploadRequest] = []
+    loose: List[Path] = []
+    for path in map(Path, inputs):
+        if path.is_dir():
+            loose.extend(sorted(path.glob('*.csv')))
+        elif path.name.endswith('.shards.json'):
+            manifest = read_shard_manifest(path)
+            requests.extend(
+                UploadRequest([path.parent / name for name in batch]) for batch in manifest['upload_batches']
+            )
+        elif path.exists():
+            loose.append(path)
+        else:
+            raise ValueError(f"Input not found: {path}")
+
+    requests.extend(
+        UploadRequest(loose[i:i + files_per_request]) for i in range(0, len(loose), files_per_request)
+    )
+    return requests
+
+
+# ============================================================================
+# ASYNC DRIVER
+# ============================================================================
+
+def _multipart_parts(files: List[Path], boundary: str) -> Tuple[List[Tuple[bytes, Optional[Path]]], int]:
+    """Multipart framing around each file; returns (parts, content length)"""
+    parts: List[Tuple[bytes, Optional[Path]]] = []
+    length = 0
+    for path in files:
+        head = (f"--{boundary}\r\n"
+                f'Content-Disposition: form-data; name="files"; filename="{path.name}"\r\n'
+                f"Content-Type: text/csv\r\n\r\n").encode('utf-8')
+        parts.append((head, path))
+        parts.append((b"\r\n", None))
+        length += len(head) + path.stat().st_size + 2
+    tail = f"--{boundary}--\r\n".encode('utf-8')
+    parts.append((tail, None))
+    return parts, length + len(tail)
+
+
+async def _read_response(reader: asyncio.StreamReader) -> Tuple[int, bytes]:
+    """Status code and body of an HTTP/1.1 response"""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("Connection closed before a response")
+    status = int(status_line.split()[1])
+
+    length = None
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.strip().lower() == 'content-length':
+            length = int(value.strip())
+    body = await reader.readexactly(length) if length is not None else await reader.read()
+    return status, body
+
+
+def _rejected_files(body: bytes) -> int:
+    """Per-file failures in a route response (the route answers 200 even when all files fail)"""
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        return 0
+    if not isinstance(payload, dict):
+        return 0
+    return sum(1 for entry in payload.get('data') or [] if isinstance(entry, dict) and not entry.get('success'))
+
+
+async def send_upload(url: str, request: UploadRequest, timeout: float = 300.0) -> UploadResult:
+    """
+    POSTs one request's files as multipart/form-data
+
+    Latency runs from opening the connection to reading the full response.
+    """
+    target = urlsplit(url)
+    host, port = target.hostname, target.port or 80
+    boundary = f"replay-{uuid.uuid4().hex}"
+    parts, length = _multipart_parts(request.files, boundary)
+    size = request.size_bytes
+
+    started = time.perf_counter()
+    writer = None
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        writer.write((f"POST {target.path or '/'} HTTP/1.1\r\n"
+                      f"Host: {target.netloc}\r\n"
+                      f"Content-Type: multipart/form-data; boundary={boundary}\r\n"
+                      f"Content-Length: {length}\r\n"
+                      f"Connection: close\r\n\r\n").encode('latin-1'))
+        for head, path in parts:
+            writer.write(head)
+            if path is not None:
+                with open(path, 'rb') as f:
+                    for block in iter(lambda: f.read(STREAM_BLOCK_SIZE), b''):
+                        writer.write(block)
+                        await writer.drain()
+        await writer.drain()
+        status, body = await asyncio.wait_for(_read_response(reader), timeout)
+        seconds = time.perf_counter() - started
+        return UploadResult(len(request.files), size, status, seconds, _rejected_files(body))
+    except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as e:
+        return UploadResult(len(request.files), size, 0, time.perf_counter() - started,
+                            error=f"{type(e).__name__}: {e}")
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+async def replay(url: str, requests: List[UploadRequest], concurrency: int = DEFAULT_CONCURRENCY,
+                 repeat: int = 1) -> Tuple[List[UploadResult], float]:
+    """
+    Sends every request repeat times with at most concurrency in flight
+
+    Returns:
+        (results in completion order, wall seconds for the whole replay)
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    for _ in range(repeat):
+        for request in requests:
+            queue.put_nowait(request)
+    results: List[UploadResult] = []
+
+    async def worker() -> None:
+        while not queue.empty():
+            request = queue.get_nowait()
+            results.append(await send_upload(url, request))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    return results, time.perf_counter() - started
+
+
+# ============================================================================
+# REPORT
+# ============================================================================
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile (q in 0-100) of unsorted values; None when empty"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def size_bucket(size_bytes: int) -> str:
+    for upper, label in SIZE_BUCKETS:
+        if size_bytes < upper:
+            return label
+    return SIZE_BUCKETS[-1][1]
+
+
+def summarize(results: List[UploadResult], wall_seconds: float, url: str,
+              concurrency: int) -> Dict[str, Any]:
+    """
+    Aggregates results overall and per SIZE_BUCKETS class
+
+    Latency percentiles cover successful requests only; failures are counted
+    under errors. Files the route rejected inside a successful response
+    (unknown header, over 50MB) are counted under rejected_files.
+    """
+    def stats(group: List[UploadResult]) -> Dict[str, Any]:
+        latencies = [r.seconds * 1000 for r in group if r.ok]
+        sent = sum(r.size_bytes for r in group)
+        busy = sum(r.seconds for r in group)
+        return {
+            'requests': len(group),
+            'errors': sum(not r.ok for r in group),
+            'rejected_files': sum(r.rejected_files for r in group),
+            'bytes': sent,
+            'p50_ms': _round(percentile(latencies, 50)),
+            'p95_ms': _round(percentile(latencies, 95)),
+            'p99_ms': _round(percentile(latencies, 99)),
+            'max_ms': _round(max(latencies, default=None)),
+            # Per-request transfer rate; overall throughput is below
+            'mb_per_second': round(sent / busy / 1024 / 1024, 2) if busy > 0 else None,
+        }
+
+    buckets = []
+    for _, label in SIZE_BUCKETS:
+        group = [r for r in results if size_bucket(r.size_bytes) == label]
+        if group:
+            buckets.append({'size': label, **stats(group)})
+
+    overall = stats(results)
+    overall['requests_per_second'] = round(len(results) / wall_seconds, 2) if wall_seconds > 0 else None
+    overall['mb_per_second'] = (round(overall['bytes'] / wall_seconds / 1024 / 1024, 2)
+                                if wall_seconds > 0 else None)
+    return {
+        'version': REPORT_VERSION,
+        'url': url,
+        'concurrency': concurrency,
+        'wall_seconds': round(wall_seconds, 4),
+        'overall': overall,
+        'by_size': buckets,
+        'failures': [asdict(r) for r in results if not r.ok][:20],
+    }
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 2) if value is not None else None
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    overall = report['overall']
+    print(f"✓ {overall['requests']} uploads in {report['wall_seconds']:.2f}s "
+          f"({overall['requests_per_second']} req/sec, {overall['mb_per_second']} MB/sec)")
+    for bucket in report['by_size']:
+        latency = "  ".join(f"{q} {bucket[f'{q}_ms']}ms" if bucket[f'{q}_ms'] is not None else f"{q} -"
+                            for q in ('p50', 'p95', 'p99'))
+        print(f"  {bucket['size']:>9}: {bucket['requests']:5d} req  {latency}  "
+              f"errors {bucket['errors']}  rejected files {bucket['rejected_files']}")
+    if overall['errors']:
+        print(f"✗ {overall['errors']} uploads failed")
+    if overall['rejected_files']:
+        print(f"✗ {overall['rejected_files']} files rejected by the route (see its per-file errors)")
+
+
+# ============================================================================
+# STAND-IN SERVER
+# ============================================================================
+
+def _detect_csv_type(headers: List[str]) -> str:
+    """Port of detectCSVType"""
+    if all(h in headers for h in EXPERIENCE_HEADERS):
+        return 'experience'
+    if all(h in headers for h in CLAIMANT_HEADERS):
+        return 'high-cost-claimant'
+    return 'unknown'
+
+
+def _parse_multipart(body: bytes, boundary: bytes) -> List[Tuple[str, memoryview]]:
+    """(filename, content) of every file part"""
+    view = memoryview(body)
+    delimiter = b"--" + boundary
+    files = []
+    position = body.find(delimiter)
+    while position != -1:
+        start = position + len(delimiter)
+        if body.startswith(b"--", start):
+            break
+        header_end = body.find(b"\r\n\r\n", start)
+        following = body.find(b"\r\n" + delimiter, header_end)
+        if header_end == -1 or following == -1:
+            break
+        filename = ''
+        for line in body[start:header_end].decode('utf-8', 'replace').split('\r\n'):
+            if not line.lower().startswith('content-disposition:'):
+                continue
+            for part in line.split(';'):
+                name, _, value = part.strip().partition('=')
+                if name == 'filename':
+                    filename = value.strip('"')
+        files.append((filename, view[header_end + 4:following]))
+        position = following + 2
+    return files
+
+
+def _route_results(files: List[Tuple[str, memoryview]]) -> Tuple[int, Dict[str, Any]]:
+    """Status and JSON body the upload route would return (without parsing rows)"""
+    if not files:
+        return 400, {'success': False, 'error': 'No files provided'}
+    if len(files) > UPLOAD_MAX_FILES:
+        return 400, {'success': False, 'error': f'Maximum {UPLOAD_MAX_FILES} files allowed'}
+
+    results = []
+    for name, content in files:
+        if len(content) > UPLOAD_MAX_BYTES:
+            results.append({'fileName': name, 'success': False, 'error': 'File size exceeds 50MB limit'})
+            continue
+        if not name.lower().endswith('.csv'):
+            results.append({'fileName': name, 'success': False, 'error': 'Only CSV files are allowed'})
+            continue
+        data = content.tobytes()
+        first_line = data.split(b'\n', 1)[0].decode('utf-8', 'replace')
+        file_type = _detect_csv_type([h.strip() for h in first_line.split(',')])
+        if file_type == 'unknown':
+            results.append({'fileName': name, 'success': False,
+                            'error': 'Unknown CSV format. Please use the provided templates.'})
+            continue
+        rows = data.count(b'\n') - 1 + (not data.endswith(b'\n'))
+        results.append({'fileName': name, 'fileType': file_type, 'success': True,
+                        'totalRows': rows, 'validRows': rows})
+
+    succeeded = sum(r['success'] for r in results)
+    return 200, {'success': succeeded > 0, 'data': results,
+                 'message': f"Processed {succeeded} of {len(results)} files"}
+
+
+async def _handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        request_line = await reader.readline()
+        headers: Dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        method = request_line.split()[0].decode('latin-1') if request_line else ''
+
+        if method != 'POST':
+            status, payload = 405, {'success': False, 'error': 'Method not allowed'}
+        else:
+            body = await reader.readexactly(int(headers.get('content-length', '0')))
+            _, _, boundary = headers.get('content-type', '').partition('boundary=')
+            status, payload = _route_results(_parse_multipart(body, boundary.strip('"').encode('latin-1')))
+
+        data = json.dumps(payload).encode('utf-8')
+        writer.write((f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                      f"Content-Type: application/json\r\n"
+                      f"Content-Length: {len(data)}\r\n"
+                      f"Connection: close\r\n\r\n").encode('latin-1') + data)
+        await writer.drain()
+    except (ConnectionError, asyncio.IncompleteReadError, ValueError, IndexError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(host: str = "127.0.0.1", port: int = 8765) -> None:
+    """Runs the stand-in upload route until cancelled"""
+    server = await asyncio.start_server(_handle, host, port)
+    bound = server.sockets[0].getsockname()
+    print(f"✓ Stand-in upload route listening on http://{bound[0]}:{bound[1]}/api/upload", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+def start_stand_in(port: int = 0) -> Tuple[subprocess.Popen, str]:
+    """
+    Starts the stand-in server in a child process
+
+    A separate process keeps its request handling off the driver's event
+    loop, so measured latencies include only the server's own work.
+
+    Returns:
+        (process, upload URL)
+    """
+    process = subprocess.Popen(
+        [sys.executable, str(Path(__file__).resolve()), "serve", "--port", str(port)],
+        stdout=subprocess.PIPE, text=True, env={**os.environ, "PYTHONUNBUFFERED": "1"}
+    )
+    line = process.stdout.readline().strip()
+    if "listening on" not in line:
+        process.kill()
+        raise RuntimeError(f"Stand-in server failed to start: {line or 'no output'}")
+    return process, line.rsplit(' ', 1)[1]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay generated CSVs against the upload route")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run = subparsers.add_parser("run", help="POST files concurrently and report latency")
+    run.add_argument("inputs", nargs="+", type=Path, help="CSV files, directories or *.shards.json manifests")
+    run.add_argument("--url", default=DEFAULT_URL, help="Upload endpoint")
+    run.add_argument("--serve", action="store_true", help="Start the stand-in server and replay against it")
+    run.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Requests in flight")
+    run.add_argument("--repeat", type=int, default=1, help="Times each request is sent")
+    run.add_argument("--files-per-request", type=int, default=1,
+                     help=f"Loose CSVs grouped per request (max {UPLOAD_MAX_FILES})")
+    run.add_argument("--output", type=Path, default=None, help="JSON report path")
+
+    stand_in = subparsers.add_parser("serve", help="Run the stand-in upload route")
+    stand_in.add_argument("--host", default="127.0.0.1", help="Bind address")
+    stand_in.add_argument("--port", type=int, default=8765, help="Port (0 picks a free one)")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        try:
+            asyncio.run(serve(args.host, args.port))
+        except KeyboardInterrupt:
+            pass
+        sys.exit(0)
+
+    try:
+        planned = plan_requests(args.inputs, args.files_per_request)
+    except ValueError as e:
+        parser.error(str(e))
+    if not planned:
+        parser.error("no CSV files found in the inputs")
+
+    server_process, url = start_stand_in() if args.serve else (None, args.url)
+    try:
+        results, wall = asyncio.run(replay(url, planned, args.concurrency, args.repeat))
+    finally:
+        if server_process is not None:
+            server_process.terminate()
+            server_process.wait()
+
+    report = summarize(results, wall, url, args.concurrency)
+    print_report(report)
+    if args.output is not None:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"✓ Report saved to: {args.output}")
+    sys.exit(1 if report['overall']['errors'] else 0)